@@ -0,0 +1,105 @@
+# backend/accounts/authentication.py
+"""
+JWT-аутентификация с коротким кешем пользователей в памяти процесса.
+
+Стандартный JWTAuthentication на каждый запрос читает строку User из БД, а фронт
+открывает страницу пачкой параллельных запросов — десятки одинаковых SELECT.
+CachedJWTAuthentication держит проверенных пользователей в LRU на AUTH_USER_CACHE_SIZE
+записей не дольше AUTH_USER_CACHE_TTL секунд; горячий запрос аутентифицируется без БД.
+Проверки ролей (is_engineer_scoped, IsManagerOrAdmin) читают request.user — то есть
+ту же запись из кеша.
+
+Ключ — id пользователя и «версия» токена: claim REVOKE_TOKEN_CLAIM (хеш пароля), если
+включён CHECK_REVOKE_TOKEN. В кеш попадает только пользователь, прошедший все проверки
+simplejwt (существует, активен, пароль не менялся), поэтому попадание даёт тот же
+результат, что и чтение из БД.
+
+Сброс: post_save / post_delete User (accounts/signals.py) — сразу и ещё раз после коммита.
+Изменения в обход сигналов (QuerySet.update) и записи из других процессов видны
+не позже чем через TTL.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+DEFAULT_TTL = 30
+DEFAULT_SIZE = 1024
+
+
+class UserCache:
+    """LRU {user_id: (истекает, версия токена, user)}; потокобезопасный."""
+
+    def __init__(self):
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version):
+        with self._lock:
+            entry = self._items.get(user_id)
+            if entry is None:
+                return None
+            expires, cached_version, user = entry
+            if expires <= time.monotonic() or cached_version != version:
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, version, user, ttl, size):
+        if ttl <= 0 or size <= 0:
+            return
+        with self._lock:
+            self._items[user_id] = (time.monotonic() + ttl, version, user)
+            self._items.move_to_end(user_id)
+            while len(self._items) > size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._items.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)  # InvalidToken, как у simplejwt
+        user_id = str(user_id)
+        version = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) if api_settings.CHECK_REVOKE_TOKEN else None
+
+        user = user_cache.get(user_id, version)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(
+                user_id, version, user,
+                ttl=getattr(settings, "AUTH_USER_CACHE_TTL", DEFAULT_TTL),
+                size=getattr(settings, "AUTH_USER_CACHE_SIZE", DEFAULT_SIZE),
+            )
+        # у каждого запроса свой экземпляр: правки request.user не должны утечь в соседние запросы
+        return _fresh(user)
+
+
+def _fresh(user):
+    """
+    Новый экземпляр из значений полей: своё _state (кеш связей, prefetch) и свои копии
+    изменяемых значений. copy.copy делил бы их с записью в кеше.
+    """
+    fields = user._meta.concrete_fields
+    return type(user).from_db(
+        user._state.db, [f.attname for f in fields], [copy.deepcopy(getattr(user, f.attname)) for f in fields],
+    )
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:56
+
+import core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_managers'),
+    ]
+
+    # default — только на стороне Python (колонка и данные те же): меняем лишь состояние
+    # миграций, иначе SQLite пересоздал бы таблицу целиком ради ALTER без изменений в БД
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='user',
+                name='id',
+                field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+            ),
+        ]),
+    ]
@@ -1,7 +1,8 @@
-import uuid
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 
+from core.ids import uuid7
+
 
 class Roles(models.TextChoices):
     ENGINEER = "engineer", "Инженер"
@@ -36,7 +37,7 @@ class UserManager(BaseUserManager):
 
 
 class User(AbstractUser):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     # отключаем username и используем email
     username = None
@@ -21,6 +21,18 @@ class UserShortSerializer(serializers.ModelSerializer):
         return obj.name or obj.email
 
 
+class UserWorkloadSerializer(UserShortSerializer):
+    """Инженер + счётчики дефектов (аннотации из UsersWorkloadView)."""
+    open = serializers.IntegerField(read_only=True)
+    new = serializers.IntegerField(read_only=True)
+    in_progress = serializers.IntegerField(read_only=True)
+    verify = serializers.IntegerField(read_only=True)
+    overdue = serializers.IntegerField(read_only=True)
+
+    class Meta(UserShortSerializer.Meta):
+        fields = UserShortSerializer.Meta.fields + ("open", "new", "in_progress", "verify", "overdue")
+
+
 class CreateUserSerializer(serializers.ModelSerializer):
     # пароль принимаем с фронта, но наружу не выдаём
     password = serializers.CharField(write_only=True, min_length=6)
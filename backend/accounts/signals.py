@@ -0,0 +1,16 @@
+# backend/accounts/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # сразу — для этого процесса; после коммита — на случай, если параллельный запрос
+    # успел положить в кеш ещё старую строку
+    user_cache.invalidate(instance.pk)
+    transaction.on_commit(lambda: user_cache.invalidate(instance.pk))
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import me, health, UsersView
+from .views import me, health, UsersView, UsersWorkloadView
 
 urlpatterns = [
     path("me/", me, name="me"),
     path("health/", health, name="auth-health"),
     path("users/", UsersView.as_view(), name="users"),
+    path("users/workload/", UsersWorkloadView.as_view(), name="users-workload"),
 ]
@@ -1,4 +1,6 @@
+from django.db.models import Count, Q
 from django.http import JsonResponse
+from django.utils import timezone
 from rest_framework import generics, filters, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -8,6 +10,7 @@ from .models import User, Roles
 from .serializers import (
     MeSerializer,
     UserShortSerializer,
+    UserWorkloadSerializer,
     CreateUserSerializer,
 )
 
@@ -71,3 +74,57 @@ class UsersView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         # Принудительно создаём инженера, чтобы никто не мог выдать себе роль
         serializer.save(role=Roles.ENGINEER)
+
+
+# ---- /api/auth/users/workload/  (нагрузка инженеров)
+class UsersWorkloadView(generics.ListAPIView):
+    """
+    GET /api/auth/users/workload/?project=<id>&search=...
+
+    Инженеры + количество их дефектов: open (всё незакрытое), new, in_progress,
+    verify, overdue. Все счётчики — по открытым дефектам (new / in_progress / verify —
+    тоже открытые статусы), поэтому считаются одним сгруппированным запросом по частичному
+    индексу defect_queue_idx (assignee, ..., due_date, status): условие «открыт» — литералами
+    (open_literal), иначе SQLite индекс не возьмёт. Сортировка по open — в Python:
+    инженеров немного, а ORDER BY по агрегату — сортировка во временном B-tree.
+    """
+    serializer_class = UserWorkloadSerializer
+    filter_backends = [filters.SearchFilter]
+    search_fields = ["email", "name"]
+    permission_classes = [IsAuthenticated]
+    counters = ("open", "new", "in_progress", "verify", "overdue")
+
+    def get_queryset(self):
+        return User.objects.filter(role=Roles.ENGINEER, is_active=True).order_by("email")
+
+    def list(self, request, *args, **kwargs):
+        users = list(self.filter_queryset(self.get_queryset()))
+        counts = self.get_counts([user.pk for user in users])
+        for user in users:
+            row = counts.get(user.pk, {})
+            for name in self.counters:
+                setattr(user, name, row.get(name, 0))
+        users.sort(key=lambda user: -user.open)  # сортировка устойчивая: при равенстве — по email
+
+        page = self.paginate_queryset(users)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(users, many=True).data)
+
+    def get_counts(self, user_ids):
+        """{id инженера: {счётчик: n}} по открытым дефектам."""
+        # импорт здесь: accounts не должен зависеть от defects при загрузке моделей
+        from defects.models import Defect, Status, open_literal
+
+        qs = Defect.objects.filter(open_literal(), assignee_id__in=user_ids)
+        project_id = self.request.query_params.get("project")
+        if project_id:
+            qs = qs.filter(project_id=project_id)
+        rows = qs.order_by().values("assignee_id").annotate(
+            open=Count("id"),
+            new=Count("id", filter=Q(status=Status.NEW)),
+            in_progress=Count("id", filter=Q(status=Status.IN_PROGRESS)),
+            verify=Count("id", filter=Q(status=Status.VERIFY)),
+            overdue=Count("id", filter=Q(due_date__lt=timezone.localdate())),
+        )
+        return {row.pop("assignee_id"): row for row in rows}
@@ -0,0 +1,42 @@
+# backend/benchmarks/bench_bulk_update.py
+"""
+Смена статуса у N дефектов: N x PATCH /api/defects/<id>/  против  1 x PATCH /api/defects/bulk/
+
+    python -m benchmarks.bench_bulk_update --rows 300
+"""
+import argparse
+
+from benchmarks.utils import setup_django, test_database, timer, make_fixtures, authed_client
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300)
+    args = parser.parse_args()
+
+    setup_django()
+    from defects.models import Defect, Status
+
+    with test_database():
+        manager, _, _ = make_fixtures(defects=args.rows)
+        client = authed_client(manager)
+        ids = [str(pk) for pk in Defect.objects.values_list("id", flat=True)]
+
+        with timer(f"per-row PATCH x{len(ids)}", rows=len(ids)):
+            for pk in ids:
+                resp = client.patch(f"/api/defects/{pk}/", {"status": Status.IN_PROGRESS}, format="json")
+                assert resp.status_code == 200, resp.data
+
+        with timer(f"bulk PATCH ({len(ids)} ids)", rows=len(ids)):
+            resp = client.patch(
+                "/api/defects/bulk/",
+                {"ids": ids, "changes": {"status": Status.RESOLVED}},
+                format="json",
+            )
+            assert resp.status_code == 200, resp.data
+
+        assert Defect.objects.exclude(status=Status.RESOLVED).count() == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# backend/benchmarks/bench_export.py
+"""
+Потоковая выгрузка /api/defects/export/: строк в секунду и пик памяти.
+
+    python -m benchmarks.bench_export --rows 100000
+    python -m benchmarks.bench_export --rows 100000 --format ndjson
+
+Пик памяти Python во время выгрузки — tracemalloc (не должен расти с --rows),
+ru_maxrss — пик RSS всего процесса (включая создание тестовых данных).
+"""
+import argparse
+import resource
+import time
+import tracemalloc
+
+from benchmarks.utils import setup_django, test_database, make_fixtures, authed_client
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        manager, _, _ = make_fixtures(defects=args.rows, projects=10, engineers=5)
+        client = authed_client(manager)
+
+        def consume():
+            resp = client.get("/api/defects/export/", {"format": args.format})
+            assert resp.status_code == 200
+            size = lines = 0
+            for chunk in resp.streaming_content:
+                size += len(chunk)
+                lines += chunk.count(b"\n")
+            return size, lines
+
+        # 1) скорость — без tracemalloc (он сильно замедляет)
+        started = time.perf_counter()
+        size, lines = consume()
+        elapsed = time.perf_counter() - started
+
+        # 2) память — отдельным проходом
+        tracemalloc.start()
+        consume()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        rows = lines - (1 if args.format == "csv" else 0)
+        assert rows == args.rows, rows
+        print(f"format={args.format} rows={rows:,} size={size / 2**20:.1f} MiB")
+        print(f"time={elapsed:.2f} s  ->  {rows / elapsed:,.0f} rows/s")
+        print(f"tracemalloc peak during export: {peak / 2**20:.1f} MiB")
+        print(f"process max RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
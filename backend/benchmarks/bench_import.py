@@ -0,0 +1,48 @@
+# backend/benchmarks/bench_import.py
+"""
+Пакетный импорт дефектов (importing.DefectImporter): строк в секунду.
+
+    python -m benchmarks.bench_import --rows 50000
+    python -m benchmarks.bench_import --rows 50000 --chunk-size 5000
+
+Файл CSV генерируется в памяти; каждая 50-я строка — с ошибкой (неизвестный проект).
+"""
+import argparse
+import io
+
+from benchmarks.utils import setup_django, test_database, timer, make_fixtures
+
+
+def build_csv(rows, projects, engineers):
+    out = io.StringIO()
+    out.write("﻿title;description;project;priority;status;assignee;due_date\n")
+    for i in range(rows):
+        project = "Нет такого объекта" if i % 50 == 49 else projects[i % len(projects)].name
+        out.write(
+            f"Дефект {i};Описание дефекта {i};{project};high;new;"
+            f"{engineers[i % len(engineers)].email};2025-10-{i % 28 + 1:02d}\n"
+        )
+    return io.BytesIO(out.getvalue().encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    setup_django()
+    from defects.importing import DEFAULT_CHUNK_SIZE, DefectImporter, read_rows
+
+    with test_database():
+        manager, engineers, projects = make_fixtures(defects=0, projects=10, engineers=5)
+        data = build_csv(args.rows, projects, engineers)
+
+        importer = DefectImporter(manager, chunk_size=args.chunk_size or DEFAULT_CHUNK_SIZE)
+        with timer(f"import {args.rows:,} rows", rows=args.rows):
+            result = importer.run(read_rows(data, "bench.csv"))
+        print(f"created={result['created']:,} errors={result['error_count']:,}")
+
+
+if __name__ == "__main__":
+    main()
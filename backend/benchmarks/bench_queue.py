@@ -0,0 +1,81 @@
+# backend/benchmarks/bench_queue.py
+"""
+«Моя очередь» инженера (GET /api/defects/queue/): top-N открытых дефектов по срочности.
+
+    python -m benchmarks.bench_queue
+    python -m benchmarks.bench_queue --defects 100000 --engineers 5 --limit 20
+
+Сравниваются выборки id:
+  covering — как в DefectViewSet.queue: условие «открыт» литералами (models.open_literal),
+             только индекс defect_queue_idx, без сортировки;
+  params   — то же через exclude(status__in=...): SQLite не может применить частичный индекс
+             и сортирует все открытые дефекты инженера во временном B-tree;
+и эндпоинт целиком (id + строки по первичному ключу, через тестовый клиент).
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from benchmarks.utils import setup_django, test_database, make_fixtures, authed_client
+
+
+def best_of(fn, repeat):
+    """Лучшее время из repeat запусков, мс."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--defects", type=int, default=50000)
+    parser.add_argument("--engineers", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.utils import timezone
+
+    from defects.models import CLOSED_STATUSES, URGENCY_ORDERING, Defect, Priority, Status, open_literal
+
+    with test_database():
+        _, engineers, _ = make_fixtures(defects=args.defects, projects=10, engineers=args.engineers)
+        # приоритеты, статусы и сроки вразброс; bulk_update — priority_rank пересчитает pre_save
+        rnd, today = random.Random(1), timezone.localdate()
+        defects = list(Defect.objects.only("id"))
+        for d in defects:
+            d.priority = rnd.choice(Priority.values)
+            d.status = rnd.choice(Status.values)
+            d.due_date = today + timedelta(days=rnd.randint(-30, 60)) if rnd.random() < 0.7 else None
+        Defect.objects.bulk_update(defects, ["priority", "priority_rank", "status", "due_date"], batch_size=1000)
+        with connection.cursor() as cur:
+            cur.execute("ANALYZE")
+
+        engineer = engineers[0]
+        variants = {
+            "covering": Defect.objects.filter(open_literal(), assignee=engineer),
+            "params": Defect.objects.filter(assignee=engineer).exclude(status__in=CLOSED_STATUSES),
+        }
+        print(f"{args.defects:,} defects, {args.engineers} engineers, top {args.limit}")
+        for name, qs in variants.items():
+            qs = qs.order_by(*URGENCY_ORDERING).values_list("id", flat=True)[:args.limit]
+            sql, params = qs.query.sql_with_params()
+            with connection.cursor() as cur:
+                cur.execute("EXPLAIN QUERY PLAN " + sql, params)
+                plan = "; ".join(row[-1] for row in cur.fetchall())
+            elapsed = best_of(lambda: list(qs.all()), args.repeat)
+            print(f"{name:<10} {elapsed:8.2f} ms  {plan}")
+
+        client = authed_client(engineer)
+        elapsed = best_of(lambda: client.get("/api/defects/queue/", {"limit": args.limit}), args.repeat)
+        print(f"{'endpoint':<10} {elapsed:8.2f} ms  GET /api/defects/queue/?limit={args.limit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# backend/benchmarks/bench_serialize.py
+"""
+Сериализация списка дефектов: DefectSerializer (модели + поля DRF) против
+values()-строк с готовыми преобразователями (defects/representation.py).
+
+    python -m benchmarks.bench_serialize
+    python -m benchmarks.bench_serialize --sizes 20 100 1000 10000 --repeat 5
+
+Время — выборка + сериализация + JSONRenderer, лучшее из --repeat прогонов.
+Перед замером проверяется, что JSON у обоих путей совпадает байт в байт.
+"""
+import argparse
+import time
+
+from benchmarks.utils import setup_django, test_database, make_fixtures
+
+
+def best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from defects import representation
+    from defects.models import Defect
+    from defects.serializers import DefectSerializer
+
+    renderer = JSONRenderer()
+    with test_database():
+        make_fixtures(defects=max(args.sizes), projects=10, engineers=5)
+        base = Defect.objects.select_related("project", "assignee", "created_by").order_by("-created_at", "-id")
+
+        print(f"{'rows':>8} {'serializer, ms':>16} {'values(), ms':>14} {'speedup':>9}")
+        for size in args.sizes:
+            # каждый прогон — новый queryset, иначе второй раз строки берутся из его кеша
+            def old():
+                return renderer.render(DefectSerializer(list(base[:size]), many=True).data)
+
+            def new():
+                return renderer.render(representation.to_dicts(representation.values(base[:size])))
+
+            assert old() == new(), f"JSON differs for {size} rows"
+            t_old = best_of(args.repeat, old)
+            t_new = best_of(args.repeat, new)
+            print(f"{size:>8,} {t_old * 1000:>16.1f} {t_new * 1000:>14.1f} {t_old / t_new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# backend/benchmarks/bench_stream.py
+"""
+Нагрузка на поток изменений (defects/stream.py): N простаивающих SSE-подключений к ASGI-
+приложению в одном процессе, затем M событий из потока-«вьюхи».
+
+    python -m benchmarks.bench_stream --connections 5000 --events 50
+
+Сервер (uvicorn/daphne) не участвует: клиенты — корутины с ASGI receive/send, поэтому
+меряется именно наша часть — подписка, фильтр, раздача по очередям и запись в send.
+Печатает время подключения, память Python на соединение (tracemalloc) и задержку
+publish -> send: p50 / p99 / max по всем доставкам и время раздачи одного события всем.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.utils import setup_django, test_database, make_fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from core.asgi import application
+    from defects import events
+
+    with test_database():
+        manager, _, _ = make_fixtures(defects=0)
+        scope = {"type": "http", "path": "/api/stream/", "headers": [],
+                 "query_string": f"token={AccessToken.for_user(manager)}".encode()}
+        published = {}  # номер события -> perf_counter() перед publish
+        delivered = []  # (номер события, секунд от publish до send)
+
+        async def run():
+            gone = asyncio.Event()
+
+            async def receive():
+                await gone.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                body = message.get("body") or b""
+                if body.startswith(b"id: "):
+                    now = time.perf_counter()
+                    start = body.index(b'"defect":"bench-') + 16
+                    i = int(body[start:body.index(b'"', start)])
+                    delivered.append((i, now - published[i]))
+
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            started = time.perf_counter()
+            tasks = [asyncio.create_task(application(dict(scope), receive, send)) for _ in range(args.connections)]
+            while len(events.broadcaster) < args.connections:
+                await asyncio.sleep(0.01)
+            connect_time = time.perf_counter() - started
+            per_conn = (tracemalloc.get_traced_memory()[0] - before) / args.connections
+            tracemalloc.stop()
+
+            loop = asyncio.get_running_loop()
+
+            def publish(i):
+                # как вьюха после коммита: из потока, не из цикла событий
+                event = events.Event({"type": "defect.updated", "defect": f"bench-{i}"}, {"p"}, {None})
+                published[i] = time.perf_counter()
+                events.broadcaster.publish(event)
+
+            for i in range(args.events):
+                await loop.run_in_executor(None, publish, i)
+                await asyncio.sleep(0.02)  # даём раздать, события не слипаются в пачку
+            expected = args.connections * args.events
+            while len(delivered) < expected:
+                await asyncio.sleep(0.01)
+
+            gone.set()
+            await asyncio.gather(*tasks)
+            return connect_time, per_conn
+
+        connect_time, per_conn = asyncio.run(run())
+
+        latencies = sorted(d for _, d in delivered)
+        fanout = {}
+        for seq, d in delivered:
+            fanout[seq] = max(fanout.get(seq, 0), d)
+        q = statistics.quantiles(latencies, n=100)
+        print(f"connections={args.connections:,} events={args.events} deliveries={len(delivered):,}")
+        print(f"connect all: {connect_time:.2f} s  ({args.connections / connect_time:,.0f} conn/s)")
+        print(f"python memory per idle connection: {per_conn / 1024:.1f} KiB")
+        print(f"publish->send latency: p50={q[49] * 1000:.1f} ms  p99={q[98] * 1000:.1f} ms  "
+              f"max={latencies[-1] * 1000:.1f} ms")
+        print(f"full fan-out per event: median={statistics.median(fanout.values()) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
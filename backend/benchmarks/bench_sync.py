@@ -0,0 +1,67 @@
+# backend/benchmarks/bench_sync.py
+"""
+Переподключение полевого клиента: полная выгрузка против дельта-синхронизации
+(GET /api/sync/, defects/sync.py) после --changes правок.
+
+    python -m benchmarks.bench_sync
+    python -m benchmarks.bench_sync --defects 20000 --changes 10 100 1000
+
+«Полная» — все страницы /api/sync/ без since (как первый запуск или reset);
+«дельта» — с токеном, полученным до правок. Время — все запросы до has_more=false
+через тестовый клиент (без сети), размер — сумма тел ответов.
+"""
+import argparse
+import time
+from importlib import import_module
+
+from benchmarks.utils import setup_django, test_database, make_fixtures, authed_client
+
+
+def download(client, token=None, limit=1000):
+    """(секунды, запросов, байт, токен) — все страницы до has_more=false."""
+    started, requests, size = time.perf_counter(), 0, 0
+    while True:
+        resp = client.get("/api/sync/", {"since": token, "limit": limit} if token else {"limit": limit})
+        requests, size = requests + 1, size + len(resp.content)
+        token = resp.json()["next"]
+        if not resp.json()["has_more"]:
+            return time.perf_counter() - started, requests, size, token
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--defects", type=int, default=10000)
+    parser.add_argument("--changes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    setup_django()
+    from django.apps import apps
+
+    from defects.models import Comment, Defect
+
+    with test_database():
+        manager, _, _ = make_fixtures(defects=args.defects, projects=10, engineers=5)
+        # make_fixtures — bulk_create, журнал заводим миграцией
+        import_module("defects.migrations.0011_change_log").fill_change_log(apps, None)
+        client = authed_client(manager)
+
+        full_time, full_requests, full_size, _ = download(client)
+        print(f"full: {args.defects:,} defects  {full_time * 1000:8.1f} ms  "
+              f"{full_requests} requests  {full_size / 1024:,.0f} KiB")
+        print(f"{'changes':>8} {'delta, ms':>10} {'requests':>9} {'KiB':>8} {'vs full':>8}")
+        for count in args.changes:
+            *_, token = download(client)
+            defects = list(Defect.objects.order_by("?")[:count])
+            for i, defect in enumerate(defects):
+                if i % 2:
+                    Comment.objects.create(defect=defect, author=manager, text="Проверено")
+                else:
+                    defect.title += " (уточнено)"
+                    defect.save()
+            elapsed, requests, size, _ = download(client, token)
+            print(f"{count:>8,} {elapsed * 1000:>10.1f} {requests:>9} {size / 1024:>8,.0f} "
+                  f"{full_time / elapsed:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# backend/benchmarks/bench_uuid_keys.py
+"""
+Первичные ключи uuid4 против UUIDv7 (core/ids.py): скорость вставки и размер индекса.
+
+    python -m benchmarks.bench_uuid_keys
+    python -m benchmarks.bench_uuid_keys --rows 200000 --batch 5000
+
+Таблица — как у моделей с UUIDField в SQLite: id char(32) PRIMARY KEY (hex без дефисов,
+отдельный индекс sqlite_autoindex_*) + created_at и текст. Файл БД — временный на диске,
+кеш страниц SQLite по умолчанию: когда индекс перерастает кеш, случайные uuid4 начинают
+читать и писать страницы по всему дереву, а v7 дописываются в правый край.
+
+Колонки: ключи — время генерации в Python; rows/s — вся вставка и последние 10% строк
+(на полном индексе); индекс — страницы и заполненность из dbstat; файл — размер БД.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+from core.ids import uuid7
+
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+def run(name, generate, rows, batch):
+    fd, path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(fd)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE bench (id char(32) NOT NULL PRIMARY KEY, created_at datetime NOT NULL, "
+                     "title varchar(200) NOT NULL)")
+        started = time.perf_counter()
+        keys = [generate().hex for _ in range(rows)]
+        keys_time = time.perf_counter() - started
+
+        now = datetime.now(timezone.utc).isoformat()
+        tail_from = rows - rows // 10
+        started, tail_started, tail_rows = time.perf_counter(), None, 0
+        for i in range(0, rows, batch):
+            # хвост меряем с пачки, в которую попал tail_from: batch не обязан делить rows
+            if tail_started is None and i + batch > tail_from:
+                tail_started, tail_rows = time.perf_counter(), rows - i
+            with conn:
+                conn.executemany("INSERT INTO bench VALUES (?, ?, ?)",
+                                 ((key, now, "Дефект") for key in keys[i:i + batch]))
+        finished = time.perf_counter()
+
+        pages, used, size = conn.execute(
+            "SELECT count(*), sum(pgsize - unused), sum(pgsize) FROM dbstat WHERE name = 'sqlite_autoindex_bench_1'"
+        ).fetchone()
+        print(f"{name:<6} {keys_time * 1000:>9.0f} {rows / (finished - started):>11,.0f} "
+              f"{tail_rows / (finished - tail_started):>11,.0f} {pages:>10,} "
+              f"{size / 2 ** 20:>8.1f} {used / size:>6.0%} {os.path.getsize(path) / 2 ** 20:>8.1f}")
+    finally:
+        conn.close()
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{args.rows:,} rows, {args.batch:,} per transaction, SQLite {sqlite3.sqlite_version}")
+    print(f"{'key':<6} {'keys, ms':>9} {'rows/s':>11} {'tail rows/s':>11} {'idx pages':>10} "
+          f"{'idx MiB':>8} {'fill':>6} {'file MiB':>8}")
+    for name, generate in GENERATORS.items():
+        run(name, generate, args.rows, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# backend/benchmarks/utils.py
+"""
+Общие хелперы для бенчмарков.
+
+Запуск из backend/:  python -m benchmarks.bench_<name> [--rows N]
+Каждый бенчмарк поднимает отдельную тестовую БД (как pytest-django) и удаляет её по окончании.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Временная тестовая БД на время бенчмарка."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timer(label, rows=None):
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    rate = f"  ({rows / elapsed:,.0f} rows/s)" if rows and elapsed else ""
+    print(f"{label:<40} {elapsed * 1000:10.1f} ms{rate}")
+
+
+def make_fixtures(defects=0, projects=1, engineers=1):
+    """Менеджер, инженеры, проекты и N дефектов (bulk_create)."""
+    from accounts.models import User, Roles
+    from defects.models import Defect
+    from projects.models import Project
+
+    manager = User.objects.create_user(email="bench-manager@example.com", password="x", role=Roles.MANAGER)
+    engineer_list = [
+        User.objects.create_user(email=f"bench-eng{i}@example.com", password="x", role=Roles.ENGINEER)
+        for i in range(engineers)
+    ]
+    project_list = Project.objects.bulk_create(
+        [Project(name=f"Объект {i}") for i in range(projects)]
+    )
+    Defect.objects.bulk_create(
+        [
+            Defect(
+                project=project_list[i % projects],
+                title=f"Дефект {i}",
+                description="Описание дефекта " * 8,
+                assignee=engineer_list[i % engineers] if engineer_list else None,
+                created_by=manager,
+            )
+            for i in range(defects)
+        ],
+        batch_size=1000,
+    )
+    return manager, engineer_list, project_list
+
+
+def authed_client(user):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# поток изменений (SSE /api/stream/, WebSocket /ws/stream/) — поверх Django, см. defects/stream.py
+from defects.stream import router  # noqa: E402  (после инициализации Django)
+
+application = router(django_application)
@@ -0,0 +1,133 @@
+# backend/core/conditional.py
+"""
+Условные GET (ETag / Last-Modified / 304) для list и retrieve ViewSet'ов.
+
+Валидатор считается не по телу ответа, а по метаданным:
+  list     — по умолчанию один агрегирующий запрос по отфильтрованному queryset: Max(updated_at)
+             и Count (Count ловит удаления, Max — любые правки: updated_at — auto_now).
+             Для больших таблиц (conditional_list_from_page, см. DefectViewSet) — по самой
+             странице: сначала пагинация, потом get_page_validators по её строкам; 304
+             экономит сериализацию и передачу, а весь набор не сканируется;
+  retrieve — updated_at самого объекта (get_object — один запрос).
+Плюс путь с query string (фильтры, страница, сортировка), пользователь и класс сериализатора.
+If-None-Match совпал -> 304 без пагинации и сериализации.
+
+Что именно пагинируется и как сериализуется список — хуки get_list_rows / get_list_data
+(по умолчанию модели и get_serializer; DefectViewSet отдаёт values()-строки, см.
+defects/representation.py).
+
+If-Modified-Since не используем для 304: у HTTP-даты точность — секунда, а удаление
+строки не сдвигает Max(updated_at). Last-Modified отдаём как справочный.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    conditional_timestamp_field = "updated_at"
+    # True — ETag списка по строкам страницы (get_page_validators), без агрегата по всему набору
+    conditional_list_from_page = False
+
+    # ---------- валидаторы (переопределяются во вьюхах) ----------
+
+    def get_list_validators(self, queryset):
+        """(last_modified, [части ETag]) для списка."""
+        agg = queryset.order_by().aggregate(last=Max(self.conditional_timestamp_field), n=Count("pk"))
+        return agg["last"], [agg["last"], agg["n"]]
+
+    def get_page_validators(self, rows):
+        """(last_modified, [части ETag]) по строкам уже выбранной страницы."""
+        raise NotImplementedError
+
+    def get_object_validators(self, instance):
+        last = getattr(instance, self.conditional_timestamp_field)
+        return last, [instance.pk, last]
+
+    # ---------- сериализация списка (переопределяется во вьюхах) ----------
+
+    def get_list_rows(self, queryset):
+        """Что пагинировать: по умолчанию сам queryset моделей."""
+        return queryset
+
+    def get_list_data(self, rows):
+        """Страница (или вся выборка) -> данные ответа."""
+        return self.get_serializer(rows, many=True).data
+
+    def list_response(self, queryset):
+        """Пагинация + сериализация отфильтрованного queryset (без условного GET)."""
+        rows = self.get_list_rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.get_list_data(page))
+        return Response(self.get_list_data(rows))
+
+    # ---------- list / retrieve ----------
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.conditional_list_from_page:
+            return self._list_from_page(request, queryset)
+        last, parts = self.get_list_validators(queryset)
+        etag = self._conditional_etag("list", parts)
+        if self._etag_matches(request, etag):
+            return self._not_modified(etag, last)
+
+        response = self.list_response(queryset)
+        return self._with_validators(response, etag, last)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last, parts = self.get_object_validators(instance)
+        etag = self._conditional_etag("detail", parts)
+        if self._etag_matches(request, etag):
+            return self._not_modified(etag, last)
+        response = Response(self.get_serializer(instance).data)
+        return self._with_validators(response, etag, last)
+
+    # ---------- helpers ----------
+
+    def _list_from_page(self, request, queryset):
+        rows = self.get_list_rows(queryset)
+        page = self.paginate_queryset(rows)
+        rows = list(rows if page is None else page)
+        last, parts = self.get_page_validators(rows)
+        etag = self._conditional_etag("list", parts)
+        if self._etag_matches(request, etag):
+            return self._not_modified(etag, last)
+        data = self.get_list_data(rows)
+        response = Response(data) if page is None else self.get_paginated_response(data)
+        return self._with_validators(response, etag, last)
+
+    def _conditional_etag(self, kind, parts):
+        raw = "|".join(str(p) for p in [
+            kind,
+            self.request.get_full_path(),
+            getattr(self.request.user, "pk", None),
+            self.get_serializer_class().__name__,
+            *parts,
+        ])
+        return f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+    @staticmethod
+    def _etag_matches(request, etag):
+        header = request.headers.get("If-None-Match")
+        if not header:
+            return False
+        plain = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == plain for tag in header.split(","))
+
+    @staticmethod
+    def _with_validators(response, etag, last):
+        response["ETag"] = etag
+        if last is not None:
+            response["Last-Modified"] = http_date(last.timestamp())
+        # ответ зависит от пользователя; браузер может хранить, но обязан перепроверять
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def _not_modified(self, etag, last):
+        return self._with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last)
@@ -0,0 +1,49 @@
+# backend/core/ids.py
+"""
+UUIDv7 (RFC 9562) для первичных ключей: старшие 48 бит — время в миллисекундах, поэтому
+новые ключи растут и вставка идёт в правый край B-tree индекса, а не в случайную страницу
+(как с uuid4): меньше расщеплений страниц, индекс плотнее, свежие строки рядом.
+
+Колонка та же (UUIDField), формат в API тот же — строка UUID; старые uuid4 остаются как есть.
+
+Внутри процесса ключи строго возрастают: в одной миллисекунде 12 бит rand_a — счётчик
+(RFC 9562, 6.2, метод 1), начинается со случайного значения; переполнился или часы пошли
+назад — берём следующую миллисекунду от последней выданной. Остальные 62 бита случайные.
+"""
+import secrets
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+COUNTER_MAX = 0xFFF
+
+
+def uuid7():
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            # старший бит счётчика — 0: запас на инкременты в той же миллисекунде
+            _last_ms, _counter = ms, secrets.randbits(11)
+        elif _counter < COUNTER_MAX:
+            _counter += 1
+        else:
+            _last_ms, _counter = _last_ms + 1, 0
+        ms, counter = _last_ms, _counter
+    value = (
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76  # версия
+        | counter << 64
+        | 0b10 << 62  # вариант RFC 4122 / 9562
+        | secrets.randbits(62)
+    )
+    return uuid.UUID(int=value)
+
+
+def uuid7_millis(value):
+    """Время (unix, мс) из UUIDv7."""
+    return value.int >> 80
@@ -103,9 +103,24 @@ USE_TZ = True
 STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# превью фото-вложений (defects/media.py): строятся в фоне, в пуле из N потоков
+ATTACHMENT_VARIANTS_ASYNC = True
+ATTACHMENT_VARIANT_WORKERS = int(os.getenv("ATTACHMENT_VARIANT_WORKERS", "2"))
+# отдача вложений через прокси (defects/downloads.py): "" | "x-accel-redirect" | "x-sendfile"
+ATTACHMENT_SENDFILE = os.getenv("ATTACHMENT_SENDFILE", "")
+ATTACHMENT_ACCEL_PREFIX = os.getenv("ATTACHMENT_ACCEL_PREFIX", "/protected-media/")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# --- КЕШ (отчёты, счётчики пагинации) ---
+# В проде можно заменить на Redis/Memcached — ключи и сброс работают так же.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "building-app",
+    }
+}
+
 # --- CORS/CSRF для фронтенда ---
 # Разрешить любой порт на localhost/127.0.0.1 (удобно для Vite)
 CORS_ALLOWED_ORIGIN_REGEXES = [
@@ -119,7 +134,7 @@ CORS_ALLOWED_ORIGIN_REGEXES = [
 # --- DRF / JWT / Фильтры / Пагинация ---
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",  # JWT + кеш пользователей в памяти
         "rest_framework.authentication.SessionAuthentication",  # ← добавить
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
@@ -138,3 +153,19 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=6),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
+
+# Поток изменений дефектов (ASGI: defects/stream.py, defects/events.py)
+DEFECT_STREAM_BACKEND = os.getenv("DEFECT_STREAM_BACKEND", "defects.events.LocalBackend")
+STREAM_HEARTBEAT = int(os.getenv("STREAM_HEARTBEAT", "20"))  # сек между «: ping» в SSE
+STREAM_QUEUE_SIZE = 256  # событий в очереди клиента, дальше — overflow и переподключение
+
+# Дельта-синхронизация (defects/sync.py): сколько дней хранится история журнала изменений;
+# токены старше получают reset (полная выгрузка)
+SYNC_RETENTION_DAYS = int(os.getenv("SYNC_RETENTION_DAYS", "30"))
+# окно (сек), за которое токен не заходит: номера журнала на PostgreSQL коммитятся не по порядку;
+# не задано — 0 на SQLite, 60 на остальных БД
+SYNC_SETTLE_SECONDS = int(os.environ["SYNC_SETTLE_SECONDS"]) if os.getenv("SYNC_SETTLE_SECONDS") else None
+
+# Кеш пользователей для JWT (accounts/authentication.py): сколько секунд и записей держим
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
@@ -1,5 +1,29 @@
 from django.contrib import admin
-from .models import Defect, Comment, Attachment
-admin.site.register(Defect)
+from .models import Defect, Comment, Attachment, DefectTransition
+
+
+@admin.register(Defect)
+class DefectAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        obj._changed_by = request.user  # для истории (history.py)
+        super().save_model(request, obj, form, change)
+
+
 admin.site.register(Comment)
 admin.site.register(Attachment)
+
+
+@admin.register(DefectTransition)
+class DefectTransitionAdmin(admin.ModelAdmin):
+    """История только для чтения: строки пишутся при изменениях дефектов."""
+    list_display = ("defect", "previous_status", "status", "priority", "assignee", "changed_by", "changed_at")
+    list_filter = ("status",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,124 @@
+# backend/defects/blobs.py
+"""
+Хранилище вложений по содержимому (AttachmentBlob).
+
+Файл кладётся в MEDIA_ROOT/blobs/<ab>/<cd>/<sha256><.ext> (ext — от первого загруженного имени,
+чтобы /media/ отдавал правильный Content-Type). Одинаковое содержимое хранится один раз:
+store_*() либо создаёт blob (ref_count=1), либо удаляет новую копию и увеличивает ref_count.
+release() уменьшает ref_count и удаляет файл (и превью, см. media.py) вместе с последней
+ссылкой (после коммита).
+
+Вызывать внутри той же транзакции, что создаёт / удаляет Attachment: тогда счётчик
+ссылок всегда совпадает с числом вложений. Перемещение файлов не транзакционно —
+при откате создания нового blob'а файл остаётся «сиротой» (безвредно, повторная
+загрузка того же содержимого его перезапишет).
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import AttachmentBlob
+
+BLOB_DIR = "blobs"
+HASH_BLOCK = 1024 * 1024
+MAX_EXT_LENGTH = 10
+
+
+def blob_name(sha256, filename=""):
+    ext = os.path.splitext(filename or "")[1].lower()
+    if len(ext) > MAX_EXT_LENGTH or not ext[1:].isalnum():
+        ext = ""
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def hash_file(path):
+    """(sha256 hex, размер) — файл читается блоками по HASH_BLOCK."""
+    digest, size = hashlib.sha256(), 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def store_path(path, filename=""):
+    """
+    Забрать локальный файл path в хранилище (файл перемещается или удаляется как дубликат).
+    Возвращает (blob, created).
+    """
+    sha256, size = hash_file(path)
+    return _adopt(path, sha256, size, filename)
+
+
+def store_upload(upload):
+    """То же для загруженного файла Django (UploadedFile). Возвращает (blob, created)."""
+    if hasattr(upload, "temporary_file_path"):
+        # большой файл уже лежит на диске у upload handler'а — просто забираем его
+        return store_path(upload.temporary_file_path(), upload.name)
+
+    tmp_dir = default_storage.path(f"{BLOB_DIR}/tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest, size = hashlib.sha256(), 0
+    with tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False) as tmp:
+        for block in upload.chunks(HASH_BLOCK):
+            digest.update(block)
+            size += len(block)
+            tmp.write(block)
+    try:
+        return _adopt(tmp.name, digest.hexdigest(), size, upload.name)
+    except Exception:
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+        raise
+
+
+def _move_into_storage(path, name):
+    """
+    Переместить файл в MEDIA_ROOT/name. Временные файлы загрузки лежат в системном temp,
+    а MEDIA_ROOT может быть на другом томе (infra/docker-compose.yml) — тогда rename падает
+    с EXDEV и file_move_safe копирует. Права — FILE_UPLOAD_PERMISSIONS, как у файлов,
+    сохранённых через storage: у NamedTemporaryFile / TemporaryUploadedFile они 0600,
+    и nginx не отдал бы такой файл по X-Accel-Redirect (downloads.py).
+    """
+    target = default_storage.path(name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    file_move_safe(path, target, allow_overwrite=True)
+    if settings.FILE_UPLOAD_PERMISSIONS is not None:
+        os.chmod(target, settings.FILE_UPLOAD_PERMISSIONS)
+
+
+def _adopt(path, sha256, size, filename):
+    with transaction.atomic():
+        blob = AttachmentBlob.objects.select_for_update().filter(pk=sha256).first()
+        if blob is None:
+            name = blob_name(sha256, filename)
+            _move_into_storage(path, name)
+            try:
+                with transaction.atomic():
+                    return AttachmentBlob.objects.create(
+                        sha256=sha256, file=name, size_bytes=size, ref_count=1,
+                    ), True
+            except IntegrityError:
+                # тот же файл параллельно сохранил другой запрос — содержимое идентично
+                pass
+        else:
+            os.remove(path)
+        AttachmentBlob.objects.filter(pk=sha256).update(ref_count=F("ref_count") + 1)
+        return AttachmentBlob.objects.get(pk=sha256), False
+
+
+def release(sha256):
+    """Минус одна ссылка; на последней — удалить запись и (после коммита) файл."""
+    with transaction.atomic():
+        AttachmentBlob.objects.filter(pk=sha256).update(ref_count=F("ref_count") - 1)
+        blob = AttachmentBlob.objects.select_for_update().filter(pk=sha256, ref_count__lte=0).first()
+        if blob is not None:
+            names = [f.name for f in (blob.file, blob.thumbnail, blob.preview) if f]
+            blob.delete()
+            transaction.on_commit(lambda: [default_storage.delete(name) for name in names])
@@ -0,0 +1,154 @@
+# backend/defects/downloads.py
+"""
+Отдача файлов вложений: GET /api/attachments/<id>/download/ (AttachmentViewSet.download).
+
+- ETag — из SHA-256 и размера blob'а (для старых вложений вне blob-хранилища — слабый,
+  из размера и mtime); If-None-Match -> 304 без чтения файла.
+- Range: bytes=a-b / a- / -n (один диапазон) -> 206 + Content-Range; If-Range учитывается;
+  несколько диапазонов не поддерживаем — отдаём файл целиком (RFC 9110 это разрешает).
+- ATTACHMENT_SENDFILE = "x-accel-redirect" | "x-sendfile": сам файл отдаёт фронтовой прокси
+  (nginx / Apache), Python-воркер только проверяет доступ и сразу освобождается. Range
+  и кеширование прокси тоже делает сам. Пример для nginx:
+
+      location /protected-media/ {
+          internal;
+          alias /app/media/;
+      }
+
+Без прокси файл отдаётся FileResponse (wsgi.file_wrapper / sendfile, если сервер умеет),
+диапазон — потоком блоками по STREAM_BLOCK.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date
+from rest_framework.negotiation import BaseContentNegotiation
+
+STREAM_BLOCK = 256 * 1024
+SENDFILE_ACCEL = "x-accel-redirect"
+SENDFILE_APACHE = "x-sendfile"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class IgnoreAcceptNegotiation(BaseContentNegotiation):
+    """Тело — файл, а не JSON: Accept у <img>/<video> (image/*, video/*) не должен давать 406."""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def etag_for(attachment, stat):
+    if attachment.blob_id:
+        return f'"{attachment.blob_id}-{stat.st_size:x}"'
+    return f'W/"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # сравнение для If-None-Match — слабое: W/ не учитываем
+    plain = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == plain for tag in header.split(","))
+
+
+def parse_range(header, size):
+    """
+    (start, end) включительно; None — заголовка нет / формат не поддерживаем или он
+    синтаксически неверен, как bytes=5-3 (отдать целиком); False — диапазон вне файла (416).
+    """
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m or m.group(1) == m.group(2) == "":
+        return None
+    first, last = m.groups()
+    if first == "":
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        # RFC 9110 14.1.1: last-pos < first-pos — диапазон недействителен, заголовок игнорируем
+        return None
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(STREAM_BLOCK, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def serve(request, attachment, as_attachment=True):
+    path = attachment.file.path
+    stat = os.stat(path)
+    etag = etag_for(attachment, stat)
+    filename = attachment.filename or os.path.basename(attachment.file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Accept-Ranges": "bytes",
+        # файл приватный: кешировать может только браузер пользователя
+        "Cache-Control": "private, max-age=0, must-revalidate",
+        "Content-Disposition": content_disposition_header(as_attachment, filename),
+    }
+
+    if _etag_matches(request.headers.get("If-None-Match"), etag):
+        response = HttpResponse(status=304)
+        for key in ("ETag", "Last-Modified", "Cache-Control"):
+            response[key] = headers[key]
+        return response
+
+    mode = getattr(settings, "ATTACHMENT_SENDFILE", None)
+    if mode in {SENDFILE_ACCEL, SENDFILE_APACHE}:
+        response = HttpResponse(content_type=content_type)
+        if mode == SENDFILE_ACCEL:
+            prefix = getattr(settings, "ATTACHMENT_ACCEL_PREFIX", "/protected-media/")
+            # заголовок — URI: имена старых вложений могут быть не ASCII, с пробелами, '#' и '?'
+            response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(attachment.file.name)
+        else:
+            response["X-Sendfile"] = path
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    byte_range = parse_range(request.headers.get("Range"), stat.st_size)
+    if byte_range and request.headers.get("If-Range") and request.headers["If-Range"] != etag:
+        byte_range = None  # файл поменялся — отдаём целиком
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{stat.st_size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(path, start, end - start + 1),
+                                         status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        response["Content-Length"] = str(end - start + 1)
+    for key, value in headers.items():
+        response[key] = value
+    return response
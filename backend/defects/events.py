@@ -0,0 +1,275 @@
+# backend/defects/events.py
+"""
+Поток изменений дефектов, комментариев и вложений для открытых вкладок (defects/stream.py).
+
+Событие — компактный JSON, без полей, которые клиент не показывает в списке:
+
+    {"seq": 41, "type": "defect.updated", "defect": "<uuid>", "project": "<uuid>",
+     "assignee": "<uuid>|null", "status": "in_progress", "priority": "high",
+     "updated_at": "..."}
+
+    типы: defect.created | defect.updated | defect.deleted
+          comment.created | comment.deleted | attachment.created | attachment.deleted
+
+Публикуются после коммита (signals.py, массовая правка, импорт) и только если в процессе
+есть подписчики — без открытых потоков запись не платит ничего.
+
+Broadcaster раздаёт событие подписчикам своего процесса по их asyncio.Queue: публикуют
+синхронные вьюхи из потоков, поэтому в цикл событий уходит один call_soon_threadsafe на
+событие (а не на подписчика), и уже там — put_nowait по очередям. JSON кодируется один раз
+на событие, а не на подписчика. Фильтр подписчика: проекты (?project=) и
+видимость — инженер получает только события дефектов, назначенных на него (сейчас или
+до этой правки, чтобы увидеть, что дефект у него забрали).
+
+Как событие попадает в dispatch — решает бэкенд (settings.DEFECT_STREAM_BACKEND):
+LocalBackend — сразу в этом же процессе (один ASGI-воркер или dev-сервер). Для нескольких
+воркеров бэкенд публикует во внешнюю шину (Redis pub/sub и т.п.), а его слушатель в каждом
+процессе вызывает broadcaster.dispatch().
+
+seq — номер события в процессе; последние STREAM_REPLAY событий хранятся, и переподключение
+с Last-Event-ID их дочитывает. Если пропущено больше (или процесс перезапущен) — подписчик
+первым получает reset: клиенту нужно перечитать список.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict, deque
+from functools import cached_property
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import Defect
+
+DEFAULT_BACKEND = "defects.events.LocalBackend"
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_REPLAY = 1000
+
+# служебные элементы очереди подписчика
+RESET = "reset"      # пропущены события — клиенту перечитать данные
+OVERFLOW = "overflow"  # клиент не успевает читать — закрываем поток, он переподключится
+CLOSE = "close"      # клиент отключился
+PING = "ping"        # пора отправить heartbeat (SSE)
+
+
+class Event:
+    """Событие + кому оно видно (проекты и инженеры до и после правки)."""
+
+    def __init__(self, payload, projects, assignees):
+        self.payload = payload
+        self.projects = frozenset(str(p) for p in projects if p)
+        self.assignees = frozenset(str(a) for a in assignees if a)
+        self.seq = None
+
+    @property
+    def type(self):
+        return self.payload["type"]
+
+    @cached_property
+    def json(self):
+        return json.dumps({"seq": self.seq, **self.payload}, ensure_ascii=False, separators=(",", ":"))
+
+    @cached_property
+    def sse(self):
+        return f"id: {self.seq}\nevent: {self.type}\ndata: {self.json}\n\n".encode()
+
+
+class Subscription:
+    def __init__(self, loop, user_id, scoped, projects=(), queue_size=DEFAULT_QUEUE_SIZE):
+        self.loop = loop
+        self.user_id = str(user_id)
+        self.scoped = scoped
+        self.projects = frozenset(str(p) for p in projects)
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def matches(self, event):
+        if self.projects and not self.projects & event.projects:
+            return False
+        return not self.scoped or self.user_id in event.assignees
+
+    def put(self, item):
+        """В потоке цикла подписчика."""
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # медленный клиент: не копим события без предела — сбрасываем и закрываем поток
+            self.close(OVERFLOW)
+
+    def close(self, reason=CLOSE):
+        """В потоке цикла: очередь больше не принимает событий, последним в ней — reason."""
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(reason)
+
+
+class Broadcaster:
+    def __init__(self, replay=DEFAULT_REPLAY):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self._recent = deque(maxlen=replay)
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            path = getattr(settings, "DEFECT_STREAM_BACKEND", DEFAULT_BACKEND)
+            self._backend = import_string(path)(self)
+        return self._backend
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def publish(self, event):
+        self.backend.publish(event)
+
+    def dispatch(self, event):
+        """Номер, кодирование (один раз) и раздача подходящим подписчикам."""
+        with self._lock:
+            event.seq = next(self._seq)
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        event.sse  # noqa: B018  (кодируем здесь, а не в каждом соединении)
+        by_loop = defaultdict(list)
+        for sub in subscribers:
+            if not sub.closed and sub.matches(event):
+                by_loop[sub.loop].append(sub)
+        for loop, subs in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_fan_out, subs, event)
+            except RuntimeError:  # цикл уже закрыт
+                for sub in subs:
+                    sub.closed = True
+
+    def subscribe(self, loop, user_id, scoped, projects=(), last_seq=None, queue_size=None):
+        sub = Subscription(loop, user_id, scoped, projects,
+                           queue_size or getattr(settings, "STREAM_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+        with self._lock:
+            self._subscribers.add(sub)
+            missed = self._missed(last_seq)
+        if missed is None:
+            sub.queue.put_nowait(RESET)
+        else:
+            for event in missed:
+                if sub.matches(event) and not sub.queue.full():
+                    sub.queue.put_nowait(event)
+        return sub
+
+    def _missed(self, last_seq):
+        """События после last_seq из буфера; None — часть уже вытеснена (или чужой seq)."""
+        if last_seq is None:
+            return []
+        if not self._recent:
+            return [] if last_seq == 0 else None
+        first, last = self._recent[0].seq, self._recent[-1].seq
+        if last_seq > last or last_seq < first - 1:
+            return None
+        return [e for e in self._recent if e.seq > last_seq]
+
+    def unsubscribe(self, sub):
+        sub.closed = True
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def reset(self):
+        """Для тестов и бенчмарков."""
+        with self._lock:
+            self._subscribers.clear()
+            self._recent.clear()
+            self._seq = itertools.count(1)
+            self._backend = None
+
+
+def _fan_out(subs, item):
+    for sub in subs:
+        sub.put(item)
+
+
+class LocalBackend:
+    """Раздача внутри процесса."""
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+
+    def publish(self, event):
+        self.broadcaster.dispatch(event)
+
+
+broadcaster = Broadcaster()
+
+
+# ---------- события из моделей ----------
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _str(value):
+    return str(value) if value else None
+
+
+def defect_event(kind, defect, old_project=None, old_assignee=None):
+    payload = {
+        "type": f"defect.{kind}",
+        "defect": str(defect.pk),
+        "project": _str(defect.project_id),
+        "assignee": _str(defect.assignee_id),
+        "status": defect.status,
+        "priority": defect.priority,
+        "updated_at": _iso(defect.updated_at),
+    }
+    return Event(payload, {defect.project_id, old_project}, {defect.assignee_id, old_assignee})
+
+
+def defect_row_event(kind, row, changes):
+    """Для массовой правки: row — values() до изменения, changes — что записали."""
+    if "assignee" in changes:
+        assignee = changes["assignee"].pk if changes["assignee"] else None
+    else:
+        assignee = row["assignee_id"]
+    payload = {
+        "type": f"defect.{kind}",
+        "defect": str(row["id"]),
+        "project": _str(row["project_id"]),
+        "assignee": _str(assignee),
+        "status": changes.get("status", row["status"]),
+        "priority": changes.get("priority", row["priority"]),
+        "updated_at": _iso(changes.get("updated_at")),
+    }
+    return Event(payload, {row["project_id"]}, {assignee, row["assignee_id"]})
+
+
+def child_event(kind, pk, defect_id, **extra):
+    """
+    comment.* / attachment.* — видимость берётся от дефекта (один запрос; вызывается уже
+    после коммита и только при подписчиках). Дефекта нет (удалён каскадом) — None.
+    """
+    row = Defect.objects.filter(pk=defect_id).values("project_id", "assignee_id").first()
+    if row is None:
+        return None
+    payload = {"type": kind, "id": str(pk), "defect": str(defect_id), "project": _str(row["project_id"]), **extra}
+    return Event(payload, {row["project_id"]}, {row["assignee_id"]})
+
+
+def publish_on_commit(build):
+    """
+    build() -> Event | [Event] | None вызывается после коммита и только при наличии подписчиков
+    (иначе не тратим даже запрос за проектом дефекта).
+    """
+    def _publish():
+        if not broadcaster.has_subscribers():
+            return
+        built = build()
+        for event in built if isinstance(built, list) else [built] if built else []:
+            broadcaster.publish(event)
+
+    transaction.on_commit(_publish)
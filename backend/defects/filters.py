@@ -0,0 +1,67 @@
+# backend/defects/filters.py
+from django.db.models import Case, IntegerField, OrderBy, Value, When
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.settings import api_settings
+
+from . import search
+from .models import URGENCY_ORDERING
+
+
+class DefectOrderingFilter(OrderingFilter):
+    """
+    ?ordering= с двумя особыми полями:
+      priority — по рангу (priority_rank: low < medium < high < critical), а не по строке;
+      urgency  — по срочности (models.URGENCY_ORDERING, индекс defect_urgency_idx),
+                 -urgency — в обратном порядке.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        expanded = []
+        for term in ordering:
+            desc, field = term.startswith("-"), term.lstrip("-")
+            if field == "priority":
+                expanded.append(f"{'-' if desc else ''}priority_rank")
+            elif field == "urgency":
+                exprs = [e.copy() if isinstance(e, OrderBy) else e.asc() for e in URGENCY_ORDERING]
+                expanded += [e.reverse_ordering() for e in exprs] if desc else exprs
+            else:
+                expanded.append(term)
+        return expanded
+
+
+class DefectSearchFilter(SearchFilter):
+    """
+    ?search= по полнотекстовому индексу (см. search.py) вместо OR из icontains.
+
+    Подходящие дефекты отбираются подзапросом к FTS/GIN-индексу. Если ?ordering= не задан,
+    сортируем по релевантности: первые RANKED_LIMIT совпадений — по рангу, остальные — после них.
+    На неподдерживаемых БД — обычный SearchFilter по search_fields.
+    """
+    RANKED_LIMIT = 200
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not search.supported():
+            return super().filter_queryset(request, queryset, view)
+        query = search.build_query(terms)
+        if query is None:
+            return super().filter_queryset(request, queryset, view)
+
+        sql, params = search.matching_sql(query)
+        queryset = queryset.filter(pk__in=RawSQL(sql, params))
+
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            top = search.ranked_ids(query, self.RANKED_LIMIT)
+            if top:
+                queryset = queryset.annotate(
+                    search_rank=Case(
+                        *[When(pk=pk, then=Value(i)) for i, pk in enumerate(top)],
+                        default=Value(len(top)),
+                        output_field=IntegerField(),
+                    )
+                ).order_by("search_rank", "-created_at")
+        return queryset
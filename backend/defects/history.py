@@ -0,0 +1,111 @@
+# backend/defects/history.py
+"""
+История дефектов (модель DefectTransition), только добавление.
+
+Строка пишется при создании дефекта и при каждой смене статуса, приоритета или исполнителя:
+- signals.py — save() из API, админки, assign (record_created / record_change);
+- массовая правка (views.bulk) и импорт (importing.py) — без сигналов, одним bulk_create
+  на пачку в их транзакции (record_bulk / record_created).
+
+Кто изменил (changed_by): при создании — created_by, при правке — defect._changed_by,
+который ставят вьюхи и админка (сигналу запрос недоступен); иначе null.
+
+status_since / status_seconds / age_seconds считаются здесь же, при записи: отчёты по
+времени в статусах и циклу (reports.py) агрегируют готовые числа, а не восстанавливают
+интервалы из соседних строк.
+"""
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import DefectTransition
+
+# поля состояния, смена которых пишет строку истории
+TRACKED = ("status", "priority", "assignee_id")
+CHUNK = 500
+
+
+def _seconds(delta):
+    return max(int(delta.total_seconds()), 0)
+
+
+def state_of(defect):
+    return {field: getattr(defect, field) for field in TRACKED}
+
+
+def _transition(defect_id, project_id, created_at, state, previous=None, since=None,
+                changed_by=None, changed_at=None):
+    """
+    state / previous — {status, priority, assignee_id} после и до изменения (previous=None — создание);
+    since — status_since предыдущей строки.
+    """
+    changed_at = changed_at or timezone.now()
+    status_changed = previous is None or previous["status"] != state["status"]
+    since = since or created_at
+    return DefectTransition(
+        defect_id=defect_id,
+        project_id=project_id,
+        status=state["status"],
+        priority=state["priority"],
+        assignee_id=state["assignee_id"],
+        previous_status=previous and previous["status"],
+        previous_priority=previous and previous["priority"],
+        previous_assignee_id=previous and previous["assignee_id"],
+        changed_by_id=changed_by,
+        changed_at=changed_at,
+        status_since=changed_at if status_changed else since,
+        status_seconds=_seconds(changed_at - since) if previous and status_changed else None,
+        age_seconds=_seconds(changed_at - created_at),
+    )
+
+
+def _last_since(defect_ids):
+    """{defect_id: status_since последней строки} — одним GROUP BY (status_since не убывает)."""
+    return dict(
+        DefectTransition.objects.filter(defect_id__in=defect_ids).order_by()
+        .values("defect_id").annotate(since=Max("status_since"))
+        .values_list("defect_id", "since")
+    )
+
+
+def record_created(defects, changed_by=None):
+    DefectTransition.objects.bulk_create([
+        _transition(d.pk, d.project_id, d.created_at, state_of(d),
+                    changed_by=changed_by or d.created_by_id, changed_at=d.created_at)
+        for d in defects
+    ], batch_size=CHUNK)
+
+
+def record_change(defect, previous, changed_by=None):
+    """save() существующего дефекта; previous — состояние до него. Без изменений — ничего."""
+    state = state_of(defect)
+    if state == previous:
+        return
+    since = _last_since([defect.pk]).get(defect.pk)
+    _transition(defect.pk, defect.project_id, defect.created_at, state, previous, since, changed_by).save()
+
+
+def record_bulk(rows, changes, changed_by=None):
+    """
+    Массовая правка: rows — values() до update (id, project_id, created_at, status, priority,
+    assignee_id), changes — то, что передано в update() (как в rollups.bulk_change).
+    """
+    new = {field: changes[field] for field in ("status", "priority") if field in changes}
+    if "assignee" in changes:
+        new["assignee_id"] = changes["assignee"].pk if changes["assignee"] else None
+    todo = []
+    for row in rows:
+        previous = {field: row[field] for field in TRACKED}
+        state = {**previous, **new}
+        if state != previous:
+            todo.append((row, previous, state))
+    if not todo:
+        return
+    since = {}
+    for i in range(0, len(todo), CHUNK):
+        since.update(_last_since([row["id"] for row, *_ in todo[i:i + CHUNK]]))
+    changed_at = changes.get("updated_at") or timezone.now()
+    DefectTransition.objects.bulk_create([
+        _transition(row["id"], row["project_id"], row["created_at"], state, previous,
+                    since.get(row["id"]), changed_by, changed_at)
+        for row, previous, state in todo
+    ], batch_size=CHUNK)
@@ -0,0 +1,299 @@
+# backend/defects/importing.py
+"""
+Пакетный импорт дефектов из CSV / XLSX (punch-list от подрядчиков).
+
+Файл читается потоково и обрабатывается пачками по chunk_size строк:
+  - проекты и исполнители пачки ищутся одним запросом на каждый вид (с кешем между пачками);
+  - строки проверяются без DRF-сериализатора, ошибки копятся по номерам строк;
+  - валидные строки вставляются bulk_create в отдельной транзакции на пачку,
+    после чего обновляются rollup, полнотекстовый индекс и кеш отчётов
+    (bulk_create не шлёт post_save).
+Ошибка в строке не прерывает импорт остального файла.
+
+Колонки — как в выгрузке (/api/defects/export/): title, description, project, priority,
+status, assignee, due_date. Также понимаются русские заголовки выгрузки с фронта.
+project — UUID или название проекта, assignee — UUID или e-mail инженера.
+"""
+import csv
+import io
+import uuid
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from zipfile import BadZipFile
+
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from accounts.models import User, Roles
+from projects.models import Project
+from . import events, history, reports, rollups, search, sync
+from .models import Defect, Priority, Status, CLOSED_STATUSES
+
+try:  # XLSX — опционально (pip install openpyxl)
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
+except ImportError:  # pragma: no cover
+    openpyxl = None
+else:
+    # битый / не-XLSX файл: openpyxl падает на zip-архиве, его частях или значениях ячеек
+    XLSX_ERRORS = (BadZipFile, InvalidFileException, KeyError, ValueError)
+
+DEFAULT_CHUNK_SIZE = 2000
+# сколько ошибок отдаём в ответе (остальные только считаем)
+MAX_REPORTED_ERRORS = 1000
+
+COLUMN_ALIASES = {
+    "title": "title", "название": "title",
+    "description": "description", "описание": "description",
+    "project": "project", "проект": "project",
+    "priority": "priority", "приоритет": "priority",
+    "status": "status", "статус": "status",
+    "assignee": "assignee", "исполнитель": "assignee", "инженер": "assignee",
+    "due_date": "due_date", "срок": "due_date",
+}
+_PRIORITIES = {**{v: v for v in Priority.values}, **{str(l).lower(): v for v, l in Priority.choices}}
+_STATUSES = {**{v: v for v in Status.values}, **{str(l).lower(): v for v, l in Status.choices}}
+_DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y")
+_TITLE_MAX = Defect._meta.get_field("title").max_length
+# ключ подходит к нескольким записям (одноимённые проекты) — строку не импортируем
+_AMBIGUOUS = object()
+
+
+class ImportFormatError(ValueError):
+    """Файл целиком не читается (формат, заголовки)."""
+
+
+# ----------------------  ЧТЕНИЕ ФАЙЛОВ  ----------------------
+
+def read_rows(fileobj, filename=""):
+    """Итератор словарей {поле: значение} по строкам файла (CSV или XLSX)."""
+    if filename.lower().endswith(".xlsx"):
+        return _read_xlsx(fileobj)
+    return _read_csv(fileobj)
+
+
+def _normalize_header(header):
+    columns = [COLUMN_ALIASES.get((h or "").strip().lower()) for h in header]
+    if "title" not in columns:
+        raise ImportFormatError("В файле нет колонки title (название).")
+    return columns
+
+
+def _read_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    first = text.readline()
+    if not first:
+        raise ImportFormatError("Пустой файл.")
+    delimiter = ";" if first.count(";") > first.count(",") else ","
+    reader = csv.reader(text, delimiter=delimiter)
+    columns = _normalize_header(next(csv.reader([first], delimiter=delimiter)))
+    for values in reader:
+        yield {c: v.strip() for c, v in zip(columns, values) if c}
+
+
+def _read_xlsx(fileobj):
+    if openpyxl is None:
+        raise ImportFormatError("Для импорта XLSX нужен пакет openpyxl.")
+    try:
+        book = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+        rows = book.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ImportFormatError("Пустой файл.")
+        columns = _normalize_header([str(h) if h is not None else "" for h in header])
+        for values in rows:
+            yield {c: ("" if v is None else v) for c, v in zip(columns, values) if c}
+    except ImportFormatError:
+        raise
+    except XLSX_ERRORS as exc:
+        raise ImportFormatError("Файл не читается как XLSX.") from exc
+
+
+# ----------------------  ИМПОРТ  ----------------------
+
+class DefectImporter:
+    def __init__(self, user, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+        self.error_count = 0
+        self._projects = {}   # ключ из файла -> project_id | None
+        self._assignees = {}  # ключ из файла -> user_id | None
+
+    def run(self, rows):
+        numbered = enumerate(rows, start=2)  # строка 1 — заголовок
+        while True:
+            chunk = list(islice(numbered, self.chunk_size))
+            if not chunk:
+                break
+            self._process(chunk)
+        return self.result()
+
+    def result(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "dry_run": self.dry_run,
+        }
+
+    def _process(self, chunk):
+        self.rows += len(chunk)
+        self._resolve(chunk)
+        now = timezone.now()
+        objs = []
+        for line, row in chunk:
+            obj, errors = self._build(row, now)
+            if errors:
+                self.error_count += 1
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append({"row": line, "errors": errors})
+            else:
+                objs.append(obj)
+        if objs and not self.dry_run:
+            self._insert(objs)
+
+    def _resolve(self, chunk):
+        """Проекты и исполнители пачки — по одному запросу на вид (уже известные ключи не ищем)."""
+        keys = {_key(r.get("project")) for _, r in chunk} - self._projects.keys() - {""}
+        if keys:
+            ids, names = _split_uuid_keys(keys)
+            found = list(
+                (Project.objects.filter(id__in=ids.values()) | Project.objects.filter(name__in=names))
+                .values_list("id", "name")
+            )
+            found_ids, by_name = {pk for pk, _ in found}, _group(found)
+            for key in keys:
+                self._projects[key] = ids[key] if ids.get(key) in found_ids else _unique(by_name.get(key))
+
+        keys = {_key(r.get("assignee")).lower() for _, r in chunk} - self._assignees.keys() - {""}
+        if keys:
+            ids, emails = _split_uuid_keys(keys)
+            # ключи уже в нижнем регистре, а email в БД — как ввели (email__in — точное сравнение)
+            engineers = User.objects.filter(role=Roles.ENGINEER, is_active=True).annotate(email_lower=Lower("email"))
+            found = list(
+                (engineers.filter(id__in=ids.values()) | engineers.filter(email_lower__in=emails))
+                .values_list("id", "email_lower")
+            )
+            found_ids, by_email = {pk for pk, _ in found}, _group(found)
+            for key in keys:
+                self._assignees[key] = ids[key] if ids.get(key) in found_ids else _unique(by_email.get(key))
+
+    def _build(self, row, now):
+        errors = {}
+        title = _key(row.get("title"))
+        if not title:
+            errors["title"] = "Обязательное поле."
+        elif len(title) > _TITLE_MAX:
+            errors["title"] = f"Не длиннее {_TITLE_MAX} символов."
+
+        project_key = _key(row.get("project"))
+        project_id = self._projects.get(project_key)
+        if not project_key:
+            errors["project"] = "Обязательное поле."
+        elif project_id is None:
+            errors["project"] = f"Проект «{project_key}» не найден."
+        elif project_id is _AMBIGUOUS:
+            errors["project"] = f"Проектов с именем «{project_key}» несколько — укажите id проекта."
+
+        priority = _choice(row.get("priority"), _PRIORITIES, Priority.MEDIUM)
+        if priority is None:
+            errors["priority"] = f"Недопустимый приоритет «{row.get('priority')}»."
+        status = _choice(row.get("status"), _STATUSES, Status.NEW)
+        if status is None:
+            errors["status"] = f"Недопустимый статус «{row.get('status')}»."
+
+        assignee_key = _key(row.get("assignee")).lower()
+        assignee_id = self._assignees.get(assignee_key) if assignee_key else None
+        if assignee_key and assignee_id is None:
+            errors["assignee"] = f"Инженер «{row.get('assignee')}» не найден."
+        elif assignee_id is _AMBIGUOUS:
+            errors["assignee"] = f"Инженеров с email «{row.get('assignee')}» несколько — укажите id."
+
+        due_date = _date(row.get("due_date"))
+        if due_date is False:
+            errors["due_date"] = "Дата в формате ГГГГ-ММ-ДД или ДД.ММ.ГГГГ."
+
+        if errors:
+            return None, errors
+        return Defect(
+            project_id=project_id,
+            title=title,
+            description=str(row.get("description", "") or ""),
+            priority=priority,
+            status=status,
+            assignee_id=assignee_id,
+            due_date=due_date,
+            created_by_id=self.user.pk,
+            closed_at=now if status in CLOSED_STATUSES else None,
+        ), None
+
+    def _insert(self, objs):
+        with transaction.atomic():
+            Defect.objects.bulk_create(objs, batch_size=500)
+            # bulk_create не шлёт post_save — rollup, индекс, история, журнал синхронизации,
+            # кеш отчётов и поток изменений — сами
+            rollups.apply_deltas(Counter(rollups.key_for(d) for d in objs))
+            history.record_created(objs)
+            search.index_defects([d.pk for d in objs])
+            sync.record_defects(objs)
+            transaction.on_commit(reports.invalidate)
+            events.publish_on_commit(lambda: [events.defect_event("created", d) for d in objs])
+        self.created += len(objs)
+
+
+def _key(value):
+    return "" if value is None else str(value).strip()
+
+
+def _group(rows):
+    """[(pk, ключ), ...] -> {ключ: {pk, ...}}."""
+    groups = {}
+    for pk, key in rows:
+        groups.setdefault(key, set()).add(pk)
+    return groups
+
+
+def _unique(pks):
+    """pk единственной записи, None — нет ни одной, _AMBIGUOUS — несколько."""
+    if not pks:
+        return None
+    return next(iter(pks)) if len(pks) == 1 else _AMBIGUOUS
+
+
+def _split_uuid_keys(keys):
+    """({ключ: UUID} для ключей-UUID, [остальные ключи])."""
+    ids, other = {}, []
+    for key in keys:
+        try:
+            ids[key] = uuid.UUID(key)
+        except ValueError:
+            other.append(key)
+    return ids, other
+
+
+def _choice(value, mapping, default):
+    value = str(value or "").strip().lower()
+    if not value:
+        return default
+    return mapping.get(value)
+
+
+def _date(value):
+    """date | None (пусто) | False (не разобрали)."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    return False
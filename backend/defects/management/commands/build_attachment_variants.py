@@ -0,0 +1,72 @@
+# backend/defects/management/commands/build_attachment_variants.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from defects import media
+from defects.models import AttachmentBlob, VariantStatus
+
+
+class Command(BaseCommand):
+    help = (
+        "Построить превью (миниатюра + WebP для веба) для уже загруженных фото-вложений, "
+        "параллельно на всех ядрах. Старые вложения вне blob-хранилища сначала переложите "
+        "командой dedupe_attachments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Число процессов (по умолчанию — по числу ядер).")
+        parser.add_argument("--retry-failed", action="store_true", help="Повторить и те, что упали с ошибкой.")
+        parser.add_argument("--force", action="store_true", help="Перестроить все превью заново.")
+
+    def handle(self, *args, workers, retry_failed=False, force=False, **options):
+        if not media.available():
+            raise CommandError("Для превью нужен пакет Pillow.")
+
+        qs = AttachmentBlob.objects.all()
+        if not force:
+            statuses = [VariantStatus.PENDING] + ([VariantStatus.FAILED] if retry_failed else [])
+            qs = qs.filter(variants_status__in=statuses)
+
+        jobs, skipped = [], 0
+        for sha256, name in qs.values_list("sha256", "file").iterator():
+            if media.is_image(name):
+                jobs.append((sha256, name, *media.variant_names(name)))
+            else:
+                AttachmentBlob.objects.filter(pk=sha256).update(variants_status=VariantStatus.SKIPPED)
+                skipped += 1
+        self.stdout.write(f"К обработке: {len(jobs)} изображений (не изображений: {skipped}).")
+        if not jobs:
+            return
+
+        # дочерние процессы не должны унаследовать открытые соединения с БД
+        connections.close_all()
+        started, ready, failed = time.perf_counter(), 0, 0
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {
+                pool.submit(media.render, default_storage.path(name),
+                            default_storage.path(thumbnail), default_storage.path(preview)):
+                    (sha256, thumbnail, preview)
+                for sha256, name, thumbnail, preview in jobs
+            }
+            for future in as_completed(futures):
+                sha256, thumbnail, preview = futures[future]
+                try:
+                    future.result()
+                except Exception as exc:
+                    failed += 1
+                    AttachmentBlob.objects.filter(pk=sha256).update(variants_status=VariantStatus.FAILED)
+                    self.stdout.write(f"  {sha256}: {exc}")
+                    continue
+                media.save_result(sha256, thumbnail, preview)
+                ready += 1
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово: {ready}, ошибок: {failed} за {elapsed:.1f} с ({workers} процессов)."
+        ))
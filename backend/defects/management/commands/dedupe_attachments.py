@@ -0,0 +1,54 @@
+# backend/defects/management/commands/dedupe_attachments.py
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from defects import blobs
+from defects.models import Attachment, AttachmentBlob
+
+
+class Command(BaseCommand):
+    help = (
+        "Переложить старые вложения (attachments/...) в хранилище по SHA-256: "
+        "одинаковые файлы остаются в одном экземпляре. Выводит, сколько места освобождено."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Только посчитать дубликаты, файлы не трогать.")
+
+    def handle(self, *args, dry_run=False, **options):
+        known = set(AttachmentBlob.objects.values_list("sha256", flat=True))
+        processed = duplicates = missing = saved = 0
+
+        pending = Attachment.objects.filter(blob__isnull=True).exclude(file="").order_by("uploaded_at")
+        for attachment in pending.iterator():
+            try:
+                path = attachment.file.path
+                size = os.path.getsize(path)
+            except (FileNotFoundError, ValueError):
+                missing += 1
+                self.stdout.write(f"  нет файла: {attachment.file.name} (вложение {attachment.pk})")
+                continue
+
+            if dry_run:
+                sha256, _ = blobs.hash_file(path)
+                created = sha256 not in known
+                known.add(sha256)
+            else:
+                with transaction.atomic():
+                    blob, created = blobs.store_path(path, attachment.filename or attachment.file.name)
+                    Attachment.objects.filter(pk=attachment.pk).update(
+                        blob=blob, file=blob.file.name, size_bytes=blob.size_bytes,
+                    )
+            processed += 1
+            if not created:
+                duplicates += 1
+                saved += size
+
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Вложений обработано: {processed}, дубликатов: {duplicates}, "
+            f"без файла: {missing}, освобождено: {saved} байт ({saved / 2**20:.1f} МиБ)."
+        ))
@@ -0,0 +1,45 @@
+# backend/defects/management/commands/import_defects.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from defects.importing import DEFAULT_CHUNK_SIZE, DefectImporter, ImportFormatError, read_rows
+
+
+class Command(BaseCommand):
+    help = "Импортировать дефекты из CSV / XLSX (колонки как в /api/defects/export/)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу .csv или .xlsx.")
+        parser.add_argument("--user", required=True, help="E-mail пользователя — автора дефектов.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f"Строк в пачке (по умолчанию {DEFAULT_CHUNK_SIZE}).")
+        parser.add_argument("--dry-run", action="store_true", help="Только проверить файл, ничего не создавать.")
+        parser.add_argument("--show", type=int, default=20, help="Сколько ошибок вывести (по умолчанию 20).")
+
+    def handle(self, *args, path, user, chunk_size, dry_run=False, show=20, **options):
+        try:
+            author = User.objects.get(email__iexact=user)
+        except User.DoesNotExist:
+            raise CommandError(f"Пользователь {user} не найден.")
+
+        importer = DefectImporter(author, chunk_size=chunk_size, dry_run=dry_run)
+        started = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                result = importer.run(read_rows(f, path))
+        except (OSError, ImportFormatError, UnicodeDecodeError) as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        for error in result["errors"][:show]:
+            self.stdout.write(f"  строка {error['row']}: {error['errors']}")
+        self.stdout.write(
+            f"Строк: {result['rows']}, создано: {result['created']}, с ошибками: {result['error_count']}"
+            f" ({elapsed:.1f} с{', dry-run' if dry_run else ''})."
+        )
+        if result["error_count"]:
+            self.stdout.write(self.style.WARNING("Строки с ошибками пропущены."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Готово."))
@@ -0,0 +1,13 @@
+# backend/defects/management/commands/prune_sync_log.py
+from django.core.management.base import BaseCommand
+
+from defects import sync
+
+
+class Command(BaseCommand):
+    help = ("Сжать журнал синхронизации: удалить записи старше SYNC_RETENTION_DAYS, "
+            "заменённые более новыми, и старые tombstones.")
+
+    def handle(self, *args, **options):
+        count = sync.prune()
+        self.stdout.write(self.style.SUCCESS(f"Удалено записей журнала: {count}."))
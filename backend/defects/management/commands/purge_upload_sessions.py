@@ -0,0 +1,24 @@
+# backend/defects/management/commands/purge_upload_sessions.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from defects import uploads
+from defects.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = "Удалить брошенные загрузки вложений по частям (сессии и временные файлы)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24,
+                            help="Сколько часов без новых частей считать загрузку брошенной (по умолчанию 24).")
+
+    def handle(self, *args, hours=24, **options):
+        stale = UploadSession.objects.filter(updated_at__lt=timezone.now() - timedelta(hours=hours))
+        count = 0
+        for session in stale.iterator():
+            uploads.discard(session)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Удалено загрузок: {count}."))
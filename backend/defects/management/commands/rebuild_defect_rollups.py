@@ -0,0 +1,33 @@
+# backend/defects/management/commands/rebuild_defect_rollups.py
+from django.core.management.base import BaseCommand, CommandError
+
+from defects import reports, rollups
+from defects.models import Defect, DefectRollup
+
+
+class Command(BaseCommand):
+    help = "Пересобрать rollup-таблицу дефектов (DefectRollup) или проверить её на расхождения (--check)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true",
+                            help="Только сверить rollup с дефектами; код выхода 1 при расхождениях.")
+        parser.add_argument("--show", type=int, default=20,
+                            help="Сколько расхождений вывести (по умолчанию 20).")
+
+    def handle(self, *args, check=False, show=20, **options):
+        diff = rollups.drift(Defect, DefectRollup)
+        if diff:
+            self.stdout.write(f"Расхождений: {len(diff)}")
+            for key, (expected, stored) in sorted(diff.items(), key=str)[:show]:
+                self.stdout.write(f"  {key}: ожидается {expected}, в rollup {stored}")
+        else:
+            self.stdout.write("Расхождений нет.")
+
+        if check:
+            if diff:
+                raise CommandError("Rollup расходится с таблицей дефектов.")
+            return
+
+        buckets = rollups.rebuild(Defect, DefectRollup)
+        reports.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Rollup пересобран: {buckets} бакетов."))
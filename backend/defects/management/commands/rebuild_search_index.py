@@ -0,0 +1,18 @@
+# backend/defects/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from defects import search
+
+
+class Command(BaseCommand):
+    help = "Пересобрать полнотекстовый индекс дефектов (FTS5 / tsvector)."
+
+    def handle(self, *args, **options):
+        if not search.supported(connection):
+            self.stdout.write(f"Полнотекстовый поиск для БД «{connection.vendor}» не поддерживается.")
+            return
+        with transaction.atomic():
+            search.create_tables(connection)
+            count = search.rebuild(connection)
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано дефектов: {count}."))
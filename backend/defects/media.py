@@ -0,0 +1,146 @@
+# backend/defects/media.py
+"""
+Превью для фото-вложений: миниатюра (THUMBNAIL_SIZE) и копия для веба (PREVIEW_SIZE), обе WebP.
+
+Варианты строятся для AttachmentBlob, т.е. один раз на содержимое, и кладутся рядом с ним:
+blobs/<ab>/<cd>/<sha256>.thumb.webp и .preview.webp. EXIF (в т.ч. GPS) не переносится,
+ориентация из EXIF применяется к пикселям заранее.
+
+schedule() вызывается после создания вложения (signals.py) и после коммита отдаёт работу
+в локальный пул потоков (Pillow отпускает GIL на декодировании/кодировании) —
+запрос не ждёт. Заполнить пропущенное — manage.py build_attachment_variants (пул процессов).
+
+render() — чистая функция над путями к файлам, без обращения к БД: её можно вызывать
+в отдельных процессах.
+
+Pillow — опциональная зависимость: без него варианты не строятся, вложения отдаются как есть.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = 320
+PREVIEW_SIZE = 1600
+WEBP_QUALITY = 80
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+# защита от «декомпрессионных бомб»: 12 Мп с телефона — норма, 100 Мп — уже нет
+MAX_PIXELS = 100_000_000
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def available():
+    return Image is not None
+
+
+def is_image(name):
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def variant_names(blob_name):
+    base = os.path.splitext(blob_name)[0]
+    return f"{base}.thumb.webp", f"{base}.preview.webp"
+
+
+def render(src_path, thumbnail_path, preview_path):
+    """Построить оба варианта из src_path. Бросает исключение, если файл не читается как картинка."""
+    with Image.open(src_path) as img:
+        if img.width * img.height > MAX_PIXELS:
+            raise ValueError(f"слишком большое изображение: {img.width}x{img.height}")
+        # JPEG: декодируем сразу в уменьшенном масштабе (в разы быстрее полного декодирования)
+        img.draft("RGB", (PREVIEW_SIZE, PREVIEW_SIZE))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if img.mode in {"RGBA", "LA", "P"} else "RGB")
+        img.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE), Image.LANCZOS)
+        _save_webp(img, preview_path)
+        img.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.LANCZOS)
+        _save_webp(img, thumbnail_path)
+
+
+def _save_webp(img, path):
+    # пишем во временный файл и переименовываем — читатель не увидит недописанный вариант
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    img.save(tmp, "WEBP", quality=WEBP_QUALITY, method=4)  # exif не передаём — метаданные не пишутся
+    os.replace(tmp, path)
+
+
+# ----------------------  БЛОБЫ  ----------------------
+
+def build_for_blob(sha256):
+    """Построить варианты для blob'а и записать результат в БД. Возвращает итоговый статус."""
+    from django.core.files.storage import default_storage
+    from .models import AttachmentBlob, VariantStatus
+
+    blob = AttachmentBlob.objects.filter(pk=sha256).first()
+    if blob is None:
+        return None
+    if not is_image(blob.file.name) or not available():
+        status = VariantStatus.SKIPPED
+        AttachmentBlob.objects.filter(pk=sha256).update(variants_status=status)
+        return status
+
+    thumbnail, preview = variant_names(blob.file.name)
+    try:
+        render(blob.file.path, default_storage.path(thumbnail), default_storage.path(preview))
+    except Exception:
+        logger.warning("Не удалось построить превью для blob %s", sha256, exc_info=True)
+        AttachmentBlob.objects.filter(pk=sha256).update(variants_status=VariantStatus.FAILED)
+        return VariantStatus.FAILED
+    return save_result(sha256, thumbnail, preview)
+
+
+def save_result(sha256, thumbnail, preview):
+    from django.core.files.storage import default_storage
+    from .models import AttachmentBlob, VariantStatus
+
+    updated = AttachmentBlob.objects.filter(pk=sha256).update(
+        variants_status=VariantStatus.READY, thumbnail=thumbnail, preview=preview,
+    )
+    if not updated:
+        # blob успели удалить, пока строили превью
+        for name in (thumbnail, preview):
+            default_storage.delete(name)
+        return None
+    # у вложений появились thumbnail / preview — офлайн-клиентам их надо дозагрузить
+    from .sync import record_blob_attachments
+    record_blob_attachments(sha256)
+    return VariantStatus.READY
+
+
+def schedule(sha256):
+    """После коммита поставить blob в очередь на построение превью."""
+    if getattr(settings, "ATTACHMENT_VARIANTS_ASYNC", True):
+        transaction.on_commit(lambda: _get_executor().submit(_run, sha256))
+    else:
+        transaction.on_commit(lambda: build_for_blob(sha256))
+
+
+def _run(sha256):
+    try:
+        build_for_blob(sha256)
+    except Exception:
+        logger.exception("Ошибка пайплайна превью для blob %s", sha256)
+    finally:
+        close_old_connections()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, "ATTACHMENT_VARIANT_WORKERS", 2)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="attachment-variants")
+        return _executor
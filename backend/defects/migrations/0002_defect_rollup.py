@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def fill_rollup(apps, schema_editor):
+    # бакеты как в rollups.expected_buckets(): день — локальная дата created_at
+    DefectRollup = apps.get_model("defects", "DefectRollup")
+    rows = (
+        apps.get_model("defects", "Defect").objects
+        .annotate(day=TruncDate("created_at", tzinfo=timezone.get_current_timezone()))
+        .order_by()
+        .values("project_id", "day", "status", "priority", "assignee_id")
+        .annotate(defect_count=Count("*"))
+    )
+    DefectRollup.objects.bulk_create([DefectRollup(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0001_initial'),
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DefectRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('new', 'Новая'), ('in_progress', 'В работе'), ('verify', 'На проверке'), ('resolved', 'Закрыта'), ('canceled', 'Отменена')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Низкий'), ('medium', 'Средний'), ('high', 'Высокий'), ('critical', 'Критический')], max_length=10)),
+                ('defect_count', models.IntegerField(default=0)),
+                ('assignee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'day'], name='defects_def_project_cca247_idx'), models.Index(fields=['day'], name='defects_def_day_d9996e_idx')],
+            },
+        ),
+        migrations.RunPython(fill_rollup, migrations.RunPython.noop),
+    ]
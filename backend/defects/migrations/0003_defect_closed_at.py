@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:36
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_closed_at(apps, schema_editor):
+    # точного момента закрытия у старых строк нет — берём updated_at
+    Defect = apps.get_model("defects", "Defect")
+    Defect.objects.filter(status__in=["resolved", "canceled"], closed_at__isnull=True).update(
+        closed_at=F("updated_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0002_defect_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='defect',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_closed_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,130 @@
+# Полнотекстовый индекс дефектов (см. defects/search.py):
+# FTS5 на SQLite, tsvector + GIN на PostgreSQL, на остальных БД — ничего.
+# Схема и первичное заполнение — здесь же, без импорта кода приложения: search.py будет меняться,
+# а миграция должна работать так, как на момент её написания.
+
+import re
+
+from django.db import migrations
+
+TS_CONFIG = "russian"
+BATCH = 500
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_CYRILLIC_RE = re.compile(r"[а-я]")
+# стеммер — копия search.stem() на момент миграции
+_ENDINGS = sorted(
+    {
+        "ейшими", "ующими", "ившись", "ывшись",
+        "ейшая", "ейшее", "ейший", "ующая", "ующее", "ующий", "ующих", "ающий", "яющий",
+        "ости", "остью", "ость", "иями", "ями", "ами", "ией", "иям", "ием", "иях",
+        "ими", "ыми", "его", "ого", "ему", "ому", "ешь", "ете", "ите", "ить", "ать", "ять",
+        "ее", "ие", "ые", "ое", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом", "их", "ых",
+        "ую", "юю", "ая", "яя", "ою", "ею", "ах", "ях", "ам", "ям", "ов", "ев", "ию", "ия",
+        "ья", "ье", "ьи", "ью", "ет", "ут", "ют", "ит", "ат", "ят", "ть",
+        "а", "е", "и", "о", "у", "ы", "ь", "ю", "я", "й",
+    },
+    key=len,
+    reverse=True,
+)
+
+
+def stem(word):
+    word = word.lower().replace("ё", "е")
+    if not _CYRILLIC_RE.search(word):
+        return word
+    if len(word) > 5 and word.endswith(("ся", "сь")):
+        word = word[:-2]
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[: -len(ending)]
+    return word
+
+
+def stem_text(text):
+    return " ".join(stem(w) for w in _WORD_RE.findall(text or ""))
+
+
+def fill_sqlite(apps, schema_editor):
+    Defect = apps.get_model("defects", "Defect")
+    Comment = apps.get_model("defects", "Comment")
+    rows = Defect.objects.order_by().values_list("pk", "title", "description")
+    with schema_editor.connection.cursor() as cur:
+        batch = []
+        for row in rows.iterator(chunk_size=BATCH):
+            batch.append(row)
+            if len(batch) >= BATCH:
+                _index_sqlite(cur, Comment, batch)
+                batch = []
+        _index_sqlite(cur, Comment, batch)
+
+
+def _index_sqlite(cur, Comment, batch):
+    if not batch:
+        return
+    docs = {pk: [title, description or ""] for pk, title, description in batch}
+    for defect_id, text in Comment.objects.filter(defect_id__in=docs).values_list("defect_id", "text"):
+        docs[defect_id].append(text)
+    for pk, (title, *body) in docs.items():
+        # rowid в FTS — id строки соответствия, как в search._index_sqlite()
+        cur.execute("INSERT INTO defects_defect_search (defect_id) VALUES (%s)", [pk.hex])
+        cur.execute(
+            "INSERT INTO defects_defect_fts (rowid, title, body) VALUES (%s, %s, %s)",
+            [cur.lastrowid, stem_text(title), stem_text(" ".join(body))],
+        )
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS defects_defect_search ("
+            " id INTEGER PRIMARY KEY, defect_id char(32) NOT NULL UNIQUE)"
+        )
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS defects_defect_fts"
+            " USING fts5(title, body, tokenize='unicode61 remove_diacritics 2')"
+        )
+        fill_sqlite(apps, schema_editor)
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS defects_defect_search ("
+            " defect_id uuid PRIMARY KEY REFERENCES defects_defect(id) ON DELETE CASCADE,"
+            " document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS defects_defect_search_document_gin"
+            " ON defects_defect_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            """
+            INSERT INTO defects_defect_search (defect_id, document)
+            SELECT d.id,
+                   setweight(to_tsvector(%s::regconfig, coalesce(d.title, '')), 'A')
+                   || setweight(to_tsvector(%s::regconfig,
+                        coalesce(d.description, '') || ' ' || coalesce(string_agg(c.text, ' '), '')), 'B')
+            FROM defects_defect d
+            LEFT JOIN defects_comment c ON c.defect_id = d.id
+            GROUP BY d.id
+            """,
+            [TS_CONFIG, TS_CONFIG],
+        )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS defects_defect_fts")
+    if vendor in {"sqlite", "postgresql"}:
+        schema_editor.execute("DROP TABLE IF EXISTS defects_defect_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0003_defect_closed_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0004_defect_search'),
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attachment',
+            index=models.Index(fields=['defect', 'uploaded_at'], name='attachment_defect_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attachment',
+            index=models.Index(fields=['uploaded_at'], name='attachment_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['defect', 'created_at'], name='comment_defect_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at'], name='comment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(fields=['created_at', 'id'], name='defect_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(fields=['project', 'created_at', 'id'], name='defect_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='defect_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(fields=['assignee', 'created_at', 'id'], name='defect_assignee_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(fields=['due_date', 'id'], name='defect_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(fields=['closed_at'], name='defect_closed_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(condition=models.Q(('status__in', ('resolved', 'canceled')), _negated=True), fields=['assignee', 'created_at'], name='defect_open_assignee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(condition=models.Q(('status__in', ('resolved', 'canceled')), _negated=True), fields=['due_date'], name='defect_open_due_idx'),
+        ),
+    ]
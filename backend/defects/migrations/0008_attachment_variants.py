@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0007_attachment_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachmentblob',
+            name='preview',
+            field=models.FileField(blank=True, max_length=255, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='attachmentblob',
+            name='thumbnail',
+            field=models.FileField(blank=True, max_length=255, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='attachmentblob',
+            name='variants_status',
+            field=models.CharField(choices=[('pending', 'В очереди'), ('ready', 'Готово'), ('skipped', 'Не изображение'), ('failed', 'Ошибка')], default='pending', max_length=10),
+        ),
+    ]
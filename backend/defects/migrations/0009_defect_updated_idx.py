@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0008_attachment_variants'),
+        ('projects', '0002_project_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(fields=['updated_at'], name='defect_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0009_defect_updated_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attachment',
+            name='attachment_defect_uploaded_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_defect_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='attachment',
+            index=models.Index(fields=['defect', 'uploaded_at', 'id'], name='attachment_defect_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['defect', 'created_at', 'id'], name='comment_defect_created_idx'),
+        ),
+    ]
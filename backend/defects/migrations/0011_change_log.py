@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+BATCH = 1000
+
+
+def fill_change_log(apps, schema_editor):
+    """По строке журнала на каждый существующий объект (как sync._change(), без кода приложения)."""
+    Change = apps.get_model("defects", "Change")
+
+    def fill(kind, rows):
+        batch = []
+        for pk, defect_id, project_id, assignee_id in rows:
+            batch.append(Change(kind=kind, object_id=pk, defect_id=defect_id, project_id=project_id,
+                                assignee_id=assignee_id, previous_assignee_id=assignee_id))
+            if len(batch) >= BATCH:
+                Change.objects.bulk_create(batch)
+                batch = []
+        Change.objects.bulk_create(batch)
+
+    projects = apps.get_model("projects", "Project").objects.values_list("pk", flat=True)
+    fill("project", ((pk, None, pk, None) for pk in projects.iterator(chunk_size=BATCH)))
+    defects = apps.get_model("defects", "Defect").objects.values_list("pk", "project_id", "assignee_id")
+    fill("defect", ((pk, pk, project_id, assignee_id)
+                    for pk, project_id, assignee_id in defects.iterator(chunk_size=BATCH)))
+    for kind, model_name in (("comment", "Comment"), ("attachment", "Attachment")):
+        rows = apps.get_model("defects", model_name).objects.values_list(
+            "pk", "defect_id", "defect__project_id", "defect__assignee_id",
+        )
+        fill(kind, rows.iterator(chunk_size=BATCH))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0010_thread_cursor_indexes'),
+        ('projects', '0002_project_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('defect', 'Дефект'), ('comment', 'Комментарий'), ('attachment', 'Вложение'), ('project', 'Проект')], max_length=10)),
+                ('object_id', models.UUIDField()),
+                ('defect_id', models.UUIDField(blank=True, null=True)),
+                ('project_id', models.UUIDField(blank=True, null=True)),
+                ('assignee_id', models.UUIDField(blank=True, null=True)),
+                ('previous_assignee_id', models.UUIDField(blank=True, null=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['object_id', 'id'], name='change_object_idx'), models.Index(fields=['changed_at'], name='change_changed_idx')],
+            },
+        ),
+        migrations.RunPython(fill_change_log, migrations.RunPython.noop),
+    ]
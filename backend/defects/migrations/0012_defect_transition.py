@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+BATCH = 1000
+
+
+def fill_history(apps, schema_editor):
+    """
+    Начальная строка (previous_* = null) для каждого существующего дефекта — его текущее
+    состояние. Когда он вошёл в статус, неизвестно: для закрытых — closed_at,
+    для новых — created_at, для остальных — updated_at (оценка снизу).
+    """
+    Defect = apps.get_model("defects", "Defect")
+    DefectTransition = apps.get_model("defects", "DefectTransition")
+    rows = Defect.objects.order_by().values_list(
+        "pk", "project_id", "created_at", "updated_at", "closed_at", "status", "priority", "assignee_id",
+    )
+    batch = []
+    for pk, project_id, created_at, updated_at, closed_at, status, priority, assignee_id in rows.iterator(BATCH):
+        since = closed_at or (created_at if status == "new" else updated_at)
+        batch.append(DefectTransition(
+            defect_id=pk, project_id=project_id, status=status, priority=priority, assignee_id=assignee_id,
+            changed_at=since, status_since=since,
+            age_seconds=max(int((since - created_at).total_seconds()), 0),
+        ))
+        if len(batch) >= BATCH:
+            DefectTransition.objects.bulk_create(batch)
+            batch = []
+    DefectTransition.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0011_change_log'),
+        ('projects', '0002_project_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DefectTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('new', 'Новая'), ('in_progress', 'В работе'), ('verify', 'На проверке'), ('resolved', 'Закрыта'), ('canceled', 'Отменена')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Низкий'), ('medium', 'Средний'), ('high', 'Высокий'), ('critical', 'Критический')], max_length=10)),
+                ('previous_status', models.CharField(blank=True, choices=[('new', 'Новая'), ('in_progress', 'В работе'), ('verify', 'На проверке'), ('resolved', 'Закрыта'), ('canceled', 'Отменена')], max_length=20, null=True)),
+                ('previous_priority', models.CharField(blank=True, choices=[('low', 'Низкий'), ('medium', 'Средний'), ('high', 'Высокий'), ('critical', 'Критический')], max_length=10, null=True)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('status_since', models.DateTimeField()),
+                ('status_seconds', models.BigIntegerField(blank=True, null=True)),
+                ('age_seconds', models.BigIntegerField(default=0)),
+                ('assignee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('defect', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='defects.defect')),
+                ('previous_assignee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['defect', 'changed_at', 'id'], name='transition_defect_idx'), models.Index(fields=['status', 'changed_at'], name='transition_status_changed_idx'), models.Index(fields=['changed_at'], name='transition_changed_idx')],
+            },
+        ),
+        migrations.RunPython(fill_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:49
+
+import defects.models
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+BATCH_SIZE = 1000
+# копия models.PRIORITY_RANK на момент миграции
+PRIORITY_RANK = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+
+
+def fill_priority_rank(apps, schema_editor):
+    """
+    Дозаполнить priority_rank пачками по BATCH_SIZE строк в порядке pk: миграция не атомарная,
+    каждый UPDATE коммитится сам, и таблица не блокируется на всё время заполнения.
+    Прерванную миграцию можно просто запустить снова — берутся только строки с NULL.
+    """
+    defect_model = apps.get_model("defects", "Defect")
+    rank = Case(
+        *[When(priority=priority, then=Value(value)) for priority, value in PRIORITY_RANK.items()],
+        default=Value(PRIORITY_RANK["medium"]),
+    )
+    todo = defect_model.objects.filter(priority_rank__isnull=True).order_by("pk")
+    last = None
+    while True:
+        batch = todo.filter(pk__gt=last) if last else todo
+        ids = list(batch.values_list("pk", flat=True)[:BATCH_SIZE])
+        if not ids:
+            return
+        defect_model.objects.filter(pk__in=ids, priority_rank__isnull=True).update(priority_rank=rank)
+        last = ids[-1]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('defects', '0012_defect_transition'),
+        ('projects', '0002_project_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='defect',
+            name='priority_rank',
+            field=defects.models.PriorityRankField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_priority_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(models.OrderBy(models.F('priority_rank'), descending=True), models.ExpressionWrapper(models.Q(('due_date__isnull', True)), output_field=models.BooleanField()), models.F('due_date'), models.F('created_at'), models.F('id'), name='defect_urgency_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='defect',
+            index=models.Index(models.F('assignee'), models.OrderBy(models.F('priority_rank'), descending=True), models.ExpressionWrapper(models.Q(('due_date__isnull', True)), output_field=models.BooleanField()), models.F('due_date'), models.F('created_at'), models.F('id'), models.F('status'), condition=models.Q(('status__in', ('resolved', 'canceled')), _negated=True), name='defect_queue_idx'),
+        ),
+    ]
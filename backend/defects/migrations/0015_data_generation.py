@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:07
+
+import time
+
+from django.db import migrations, models
+
+
+def create_generation(apps, schema_editor):
+    # начальное значение — время в нс: не совпадёт с номерами прежнего поколения из кеша
+    apps.get_model("defects", "DataGeneration").objects.create(name="defects", value=time.time_ns())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0014_uuid7_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataGeneration',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(create_generation, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:16
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+KEY_FIELDS = ("project_id", "day", "status", "priority", "assignee_id")
+
+
+def merge_duplicate_buckets(apps, schema_editor):
+    # до ограничения: задвоенные бакеты (после SET_NULL исполнителя) сливаем в одну строку
+    DefectRollup = apps.get_model("defects", "DefectRollup")
+    duplicates = (
+        DefectRollup.objects.order_by().values(*KEY_FIELDS)
+        .annotate(rows=Count("*"), keep=Min("pk"), total=Sum("defect_count")).filter(rows__gt=1)
+    )
+    for bucket in duplicates:
+        lookup = {f: bucket[f] for f in KEY_FIELDS}
+        DefectRollup.objects.filter(**lookup).exclude(pk=bucket["keep"]).delete()
+        DefectRollup.objects.filter(pk=bucket["keep"]).update(defect_count=bucket["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0015_data_generation'),
+        ('projects', '0003_uuid7_ids'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='defectrollup',
+            constraint=models.UniqueConstraint(models.F('project'), models.F('day'), models.F('status'), models.F('priority'), django.db.models.functions.comparison.Coalesce('assignee', 'project'), name='defect_rollup_bucket_uniq'),
+        ),
+    ]
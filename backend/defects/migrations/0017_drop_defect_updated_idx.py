@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0016_rollup_bucket_unique'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='defect',
+            name='defect_updated_idx',
+        ),
+    ]
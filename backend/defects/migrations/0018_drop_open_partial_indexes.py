@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:50
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defects', '0017_drop_defect_updated_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='defect',
+            name='defect_open_assignee_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='defect',
+            name='defect_open_due_idx',
+        ),
+    ]
@@ -1,6 +1,11 @@
 import uuid
 from django.conf import settings
 from django.db import models
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.ids import uuid7
 from projects.models import Project
 
 class Priority(models.TextChoices):
@@ -16,8 +21,38 @@ class Status(models.TextChoices):
     RESOLVED="resolved","Закрыта"
     CANCELED="canceled","Отменена"
 
+# Статусы, в которых дефект считается закрытым (не «открыт» и не просрочен)
+CLOSED_STATUSES = (Status.RESOLVED, Status.CANCELED)
+
+# Числовой ранг приоритета (Defect.priority_rank): больше — срочнее
+PRIORITY_RANK = {Priority.LOW: 1, Priority.MEDIUM: 2, Priority.HIGH: 3, Priority.CRITICAL: 4}
+
+# Порядок «по срочности»: ранг приоритета, затем срок (без срока — в конце), затем давность.
+# «Без срока в конце» — выражением due_date IS NULL, а не NULLS LAST: то же выражение стоит
+# в индексах defect_urgency_idx / defect_queue_idx, и SQLite берёт порядок из них без сортировки.
+URGENCY_ORDERING = (
+    models.F("priority_rank").desc(),
+    models.ExpressionWrapper(models.Q(due_date__isnull=True), output_field=models.BooleanField()),
+    models.F("due_date"),
+    models.F("created_at"),
+    models.F("id"),
+)
+
+
+class PriorityRankField(models.PositiveSmallIntegerField):
+    """
+    PRIORITY_RANK[priority] — пересчитывается при каждом save() и bulk_create(), руками
+    не заполняется. QuerySet.update(priority=...) его не трогает — передавайте и priority_rank.
+    """
+
+    def pre_save(self, model_instance, add):
+        value = PRIORITY_RANK.get(model_instance.priority)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
 class Defect(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="defects")
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -26,30 +61,243 @@ class Defect(models.Model):
     assignee = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True,
                                  on_delete=models.SET_NULL, related_name="assigned_defects")
     due_date = models.DateField(null=True, blank=True)
+    # null только у строк, которые миграция 0013 ещё не дозаполнила
+    priority_rank = PriorityRankField(null=True, editable=False)
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT,
                                    related_name="created_defects")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # когда дефект перешёл в закрытый статус (CLOSED_STATUSES); None — открыт
+    closed_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        # Индексы под горячие запросы списка (фильтр + ORDER BY created_at, id для курсора),
+        # очередь открытых дефектов инженера, закрытия за период
+        # и порядок по срочности (URGENCY_ORDERING).
+        # Проверяются tests/test_query_plans.py.
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="defect_created_idx"),
+            models.Index(fields=["project", "created_at", "id"], name="defect_project_created_idx"),
+            models.Index(fields=["status", "created_at", "id"], name="defect_status_created_idx"),
+            models.Index(fields=["assignee", "created_at", "id"], name="defect_assignee_created_idx"),
+            models.Index(fields=["due_date", "id"], name="defect_due_idx"),
+            models.Index(fields=["closed_at"], name="defect_closed_at_idx"),
+            models.Index(*URGENCY_ORDERING, name="defect_urgency_idx"),
+            # «моя очередь» (DefectViewSet.queue) и нагрузка инженеров (UsersWorkloadView):
+            # status в конце — чтобы выборка читалась только из индекса, без обращения к таблице
+            models.Index(
+                models.F("assignee"), *URGENCY_ORDERING, models.F("status"),
+                name="defect_queue_idx",
+                condition=~models.Q(status__in=CLOSED_STATUSES),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "priority" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "priority_rank"}
+        super().save(*args, **kwargs)
+
+
+def open_literal():
+    """
+    Условие «дефект открыт» (не в CLOSED_STATUSES) с литералами вместо параметров — для
+    запросов по частичным индексам: SQLite берёт индекс с WHERE NOT (status IN ('resolved', ...)),
+    только если может вывести это условие из запроса, а про ?-параметры он этого не знает.
+    """
+    statuses = ", ".join(f"'{status}'" for status in CLOSED_STATUSES)
+    return RawSQL(f'NOT ("{Defect._meta.db_table}"."status" IN ({statuses}))', (),
+                  output_field=models.BooleanField())
 
 class Comment(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     defect = models.ForeignKey(Defect, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # лента дефекта: курсор по (created_at, id) внутри defect (ThreadPagination)
+            models.Index(fields=["defect", "created_at", "id"], name="comment_defect_created_idx"),
+            models.Index(fields=["created_at"], name="comment_created_idx"),
+        ]
+
+class VariantStatus(models.TextChoices):
+    PENDING = "pending", "В очереди"
+    READY = "ready", "Готово"
+    SKIPPED = "skipped", "Не изображение"
+    FAILED = "failed", "Ошибка"
+
+
+class AttachmentBlob(models.Model):
+    """
+    Содержимое вложения, адресуемое SHA-256 (blobs.py): одинаковые файлы хранятся один раз,
+    ref_count — сколько Attachment на него ссылаются. Файл удаляется с последней ссылкой.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file = models.FileField(max_length=255)
+    size_bytes = models.BigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # превью для фото (media.py): миниатюра и уменьшенная копия для веба, WebP без EXIF
+    variants_status = models.CharField(max_length=10, choices=VariantStatus.choices,
+                                       default=VariantStatus.PENDING)
+    thumbnail = models.FileField(max_length=255, blank=True)
+    preview = models.FileField(max_length=255, blank=True)
+
+
 class Attachment(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     defect = models.ForeignKey(Defect, on_delete=models.CASCADE, related_name="attachments")
     file = models.FileField(upload_to="attachments/")
+    # None — старое вложение, ещё не переложенное в blob-хранилище (manage.py dedupe_attachments)
+    blob = models.ForeignKey(AttachmentBlob, null=True, blank=True, editable=False,
+                             on_delete=models.PROTECT, related_name="attachments")
     filename = models.CharField(max_length=255, blank=True)
     size_bytes = models.IntegerField(null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["defect", "uploaded_at", "id"], name="attachment_defect_uploaded_idx"),
+            models.Index(fields=["uploaded_at"], name="attachment_uploaded_idx"),
+        ]
+
     def save(self,*a,**kw):
         if self.file and not self.filename: self.filename = self.file.name
         if self.file and not self.size_bytes: self.size_bytes = getattr(self.file,"size",None)
         super().save(*a,**kw)
+
+
+
+class UploadSession(models.Model):
+    """
+    Возобновляемая загрузка вложения по частям (см. uploads.py).
+    Части пишутся подряд во временный файл в MEDIA_ROOT; received_bytes / next_chunk / crc32 —
+    сколько уже принято и контрольная сумма принятого. На finalize создаётся Attachment.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    defect = models.ForeignKey(Defect, on_delete=models.CASCADE, related_name="+")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    filename = models.CharField(max_length=255)
+    size_bytes = models.BigIntegerField()
+    chunk_size = models.IntegerField()
+    received_bytes = models.BigIntegerField(default=0)
+    next_chunk = models.IntegerField(default=0)
+    crc32 = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["updated_at"], name="upload_session_updated_idx")]
+
+class DefectRollup(models.Model):
+    """
+    Счётчик дефектов в разрезе (проект, день создания, статус, приоритет, исполнитель).
+    Поддерживается инкрементально (signals.py / bulk), пересобирается командой
+    manage.py rebuild_defect_rollups. Из него по умолчанию строится отчёт summary.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="+")
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=Status.choices)
+    priority = models.CharField(max_length=10, choices=Priority.choices)
+    assignee = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True,
+                                 on_delete=models.SET_NULL, related_name="+")
+    defect_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "day"]),
+            models.Index(fields=["day"]),
+        ]
+        constraints = [
+            # один бакет на ключ; NULL в unique-индексе не совпадает сам с собой, поэтому
+            # исполнителя подменяем id проекта (тот же тип колонки, с id пользователя не совпадёт)
+            models.UniqueConstraint(
+                "project", "day", "status", "priority", Coalesce("assignee", "project"),
+                name="defect_rollup_bucket_uniq",
+            ),
+        ]
+
+
+class DefectTransition(models.Model):
+    """
+    История дефекта (history.py), только добавление: строка при создании и при каждой смене
+    статуса, приоритета или исполнителя — состояние после изменения и до него.
+    Длительности считаются при записи, чтобы отчёты (reports.py) не восстанавливали их
+    сканированием истории: status_since — с какого момента дефект в текущем статусе,
+    status_seconds — сколько длился закончившийся статус (только при смене статуса),
+    age_seconds — возраст дефекта в момент изменения.
+    """
+    defect = models.ForeignKey(Defect, on_delete=models.CASCADE, related_name="transitions")
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="+")
+    status = models.CharField(max_length=20, choices=Status.choices)
+    priority = models.CharField(max_length=10, choices=Priority.choices)
+    assignee = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True,
+                                 on_delete=models.SET_NULL, related_name="+")
+    # null — строка создания (или начальная, заведённая миграцией для старых дефектов)
+    previous_status = models.CharField(max_length=20, choices=Status.choices, null=True, blank=True)
+    previous_priority = models.CharField(max_length=10, choices=Priority.choices, null=True, blank=True)
+    previous_assignee = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True,
+                                          on_delete=models.SET_NULL, related_name="+")
+    changed_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True,
+                                   on_delete=models.SET_NULL, related_name="+")
+    changed_at = models.DateTimeField(default=timezone.now)
+    status_since = models.DateTimeField()
+    status_seconds = models.BigIntegerField(null=True, blank=True)
+    age_seconds = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # история дефекта и последняя строка для status_since
+            models.Index(fields=["defect", "changed_at", "id"], name="transition_defect_idx"),
+            # отчёты: закрытия и смены статуса за период
+            models.Index(fields=["status", "changed_at"], name="transition_status_changed_idx"),
+            models.Index(fields=["changed_at"], name="transition_changed_idx"),
+        ]
+
+
+class ChangeKind(models.TextChoices):
+    DEFECT = "defect", "Дефект"
+    COMMENT = "comment", "Комментарий"
+    ATTACHMENT = "attachment", "Вложение"
+    PROJECT = "project", "Проект"
+
+
+class Change(models.Model):
+    """
+    Журнал изменений для дельта-синхронизации (sync.py, GET /api/sync/).
+    id — монотонный номер изменения; строка на каждое создание / правку / удаление.
+    Ссылки — просто UUID, без FK: объекта может уже не быть (tombstone).
+    project_id / assignee_id — дефекта (для комментария и вложения — их дефекта) после
+    изменения; previous_assignee_id — исполнитель дефекта до изменения (у нового — null):
+    по нему инженер, у которого дефект забрали, получает tombstone.
+    """
+    kind = models.CharField(max_length=10, choices=ChangeKind.choices)
+    object_id = models.UUIDField()
+    defect_id = models.UUIDField(null=True, blank=True)
+    project_id = models.UUIDField(null=True, blank=True)
+    assignee_id = models.UUIDField(null=True, blank=True)
+    previous_assignee_id = models.UUIDField(null=True, blank=True)
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # сжатие журнала (manage.py prune_sync_log): есть ли у объекта строка новее
+            models.Index(fields=["object_id", "id"], name="change_object_idx"),
+            models.Index(fields=["changed_at"], name="change_changed_idx"),
+        ]
+
+
+class DataGeneration(models.Model):
+    """
+    Поколение данных (reports.generation / invalidate): число, которое растёт при каждой
+    записи дефектов, проектов и пользователей. На нём — ключи кеша отчётов и часть ETag.
+    Хранится в БД, а не в кеше: кеш по умолчанию (LocMemCache) у каждого процесса свой,
+    и сброс в одном воркере остальные бы не увидели.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField()
@@ -0,0 +1,206 @@
+# backend/defects/pagination.py
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Сколько секунд кешируем COUNT(*) для ?with_count=1 в режиме курсора
+COUNT_CACHE_SECONDS = 60
+
+
+class DefectPagination(PageNumberPagination):
+    """
+    Пагинация списка дефектов.
+
+    По умолчанию — обычная постраничная (?page=N, с count).
+    Опционально — keyset/курсор: ?pagination=cursor (первая страница), дальше ?cursor=<...>
+    из ссылок next/previous. В этом режиме:
+      - нет OFFSET: следующая страница берётся условием WHERE (поле, id) > (последняя строка),
+        поэтому время не зависит от глубины и строки не «съезжают» при вставках;
+      - сортировка — одно из CURSOR_ORDERINGS (+ id как тай-брейкер);
+      - count не считается, только по ?with_count=1 (и кешируется на COUNT_CACHE_SECONDS).
+    """
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    count_query_param = "with_count"
+    ordering_query_param = "ordering"
+    default_ordering = "-created_at"
+    CURSOR_ORDERINGS = ("created_at", "due_date", "priority")
+    # ?ordering= -> колонка, по которой идёт курсор (приоритет — по рангу, не по строке)
+    ordering_columns = {"priority": "priority_rank"}
+    nullable_fields = ("due_date",)
+    # как восстанавливать значение поля из курсора (остальные — строкой как есть)
+    datetime_fields = ("created_at",)
+    date_fields = ("due_date",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == "cursor"
+        )
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        return self._paginate_cursor(queryset, request)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        payload = {"next": self.next_link, "previous": self.previous_link}
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+    def page_state(self):
+        """Что, кроме строк, входит в ответ страницы (для ETag): count и ссылки."""
+        if self.cursor_mode:
+            return [self.count, self.next_link, self.previous_link]
+        return [self.page.paginator.count, self.get_next_link(), self.get_previous_link()]
+
+    # ---------- курсор ----------
+
+    def _paginate_cursor(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        field, desc = self._parse_ordering(request)
+        cursor = self._decode_cursor(request, field, desc)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in {"1", "true", "True"}:
+            self.count = self._cached_count(queryset)
+
+        reverse = bool(cursor and cursor["r"])
+        # при движении назад идём в обратном порядке и потом разворачиваем страницу
+        qs = queryset.order_by(*self._order_by(field, desc, reverse))
+        if cursor:
+            qs = qs.filter(self._after(field, desc, reverse, cursor["v"], cursor["id"]))
+
+        rows = list(qs[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else cursor is not None
+        self.next_link = self._link(rows[-1], field, desc, False) if rows and has_next else None
+        self.previous_link = self._link(rows[0], field, desc, True) if rows and has_previous else None
+        return rows
+
+    def _parse_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param) or self.default_ordering
+        field = ordering.lstrip("-")
+        if field not in self.CURSOR_ORDERINGS:
+            raise ValidationError({
+                self.ordering_query_param: [
+                    f"В режиме курсора доступна сортировка только по: {', '.join(self.CURSOR_ORDERINGS)}"
+                ]
+            })
+        return field, ordering.startswith("-")
+
+    @classmethod
+    def cursor_columns(cls):
+        """Колонки, которые нужны строке страницы для ссылок next/previous."""
+        return ("id", *(cls.ordering_columns.get(field, field) for field in cls.CURSOR_ORDERINGS))
+
+    def _order_by(self, field, desc, reverse=False):
+        # прямой порядок: поле (NULL в конце), затем id в ту же сторону;
+        # для NOT NULL колонок NULLS LAST не пишем — чтобы сортировку брал индекс (field, id)
+        nulls = {}
+        if field in self.nullable_fields:
+            nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        column = self.ordering_columns.get(field, field)
+        expr = F(column).desc(**nulls) if desc != reverse else F(column).asc(**nulls)
+        return [expr, "-id" if desc != reverse else "id"]
+
+    def _after(self, field, desc, reverse, value, pk):
+        """
+        Строки строго после (value, pk) в порядке сортировки (NULL — в конце),
+        а при reverse — строго перед ней.
+        """
+        op = "lt" if desc != reverse else "gt"
+        nullable = field in self.nullable_fields
+        field = self.ordering_columns.get(field, field)
+        if value is None:
+            cond = Q(**{f"{field}__isnull": True, f"id__{op}": pk})
+            if reverse:
+                cond |= Q(**{f"{field}__isnull": False})
+            return cond
+        cond = Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{op}": pk})
+        if nullable and not reverse:
+            cond |= Q(**{f"{field}__isnull": True})
+        return cond
+
+    def _link(self, obj, field, desc, reverse):
+        # строка страницы — модель или dict из values() (быстрый список, defects/representation.py)
+        column = self.ordering_columns.get(field, field)
+        if isinstance(obj, dict):
+            value, pk = obj[column], obj["id"]
+        else:
+            value, pk = getattr(obj, column), obj.pk
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        raw = json.dumps({"o": field, "d": desc, "v": value, "id": str(pk), "r": reverse})
+        token = base64.urlsafe_b64encode(raw.encode()).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def _decode_cursor(self, request, field, desc):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            if cursor["o"] != field or cursor["d"] != desc:
+                raise ValueError("ordering changed")
+            value = cursor["v"]
+            if value is not None and field in self.datetime_fields:
+                value = datetime.fromisoformat(value)
+            elif value is not None and field in self.date_fields:
+                value = date.fromisoformat(value)
+            return {"v": value, "id": cursor["id"], "r": bool(cursor.get("r"))}
+        except (ValueError, KeyError, TypeError):
+            raise NotFound("Некорректный курсор.")
+
+    @staticmethod
+    def _cached_count(queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        key = "defects:count:" + hashlib.sha1(f"{sql}|{params}".encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, COUNT_CACHE_SECONDS)
+        return count
+
+
+class ThreadPagination(DefectPagination):
+    """
+    Лента комментариев дефекта (/defects/<id>/comments/): всегда курсор, новые сверху;
+    ?ordering=created_at — по возрастанию. Страница — индекс (defect, created_at, id),
+    без OFFSET и без сортировки всей таблицы.
+    """
+    page_size = 20
+    default_ordering = "-created_at"
+    CURSOR_ORDERINGS = ("created_at",)
+    nullable_fields = ()
+    datetime_fields = ("created_at",)
+    date_fields = ()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = True
+        return self._paginate_cursor(queryset, request)
+
+
+class AttachmentThreadPagination(ThreadPagination):
+    """То же для /defects/<id>/attachments/ — по uploaded_at."""
+    default_ordering = "-uploaded_at"
+    CURSOR_ORDERINGS = ("uploaded_at",)
+    datetime_fields = ("uploaded_at",)
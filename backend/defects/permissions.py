@@ -1,5 +1,17 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from accounts.models import Roles
+
+
+def is_engineer_scoped(user):
+    """Инженер (не staff/superuser) видит только дефекты, назначенные на него."""
+    return (
+        getattr(user, "role", None) == Roles.ENGINEER
+        and not user.is_staff
+        and not user.is_superuser
+    )
+
+
 class DefectPermission(BasePermission):
     def has_permission(self, request, view):
         # чтение всем аутентифицированным, запись — тоже (упростим на старте)
@@ -0,0 +1,431 @@
+# backend/defects/reports.py
+"""
+Отчёты по дефектам.
+
+summary() считает все разрезы (total / by_status / by_priority / by_project) за один проход:
+один GROUP BY project с условными Count(filter=Q(...)) по статусам и приоритетам,
+остальное досчитывается в Python из этих строк.
+
+Фильтр по датам — диапазон по created_at в текущем часовом поясе (TIME_ZONE)
+(created_at >= начало date_from, created_at < начало дня после date_to),
+без приведения колонки к дате, поэтому индекс по created_at применим.
+
+По умолчанию summary() читает не дефекты, а rollup-таблицу DefectRollup
+(бакеты по проекту/дню/статусу/приоритету/исполнителю) — время отчёта зависит
+от числа бакетов, а не дефектов. source="live" — прямой подсчёт по дефектам.
+
+timeseries() — ряды created / resolved / closed / backlog по дням, неделям или месяцам:
+усечение дат делает БД (Trunc), пропуски заполняются в Python без запросов на каждый бакет.
+created берётся из rollup'а (или live), закрытия — из Defect.closed_at.
+
+cycle_time() / time_in_status() — по истории (DefectTransition, history.py): длительности
+там уже посчитаны при записи, среднее и процентили (p50 / p90 / p95) — окнами в SQL
+(distribution()); из БД приходят только строки процентилей, а не все значения.
+
+Результаты кешируются по ключу (поколение данных, project, date_from, date_to, ...);
+любая запись в дефекты сдвигает поколение (см. signals.py и invalidate()). Поколение —
+строка DataGeneration в БД, общая для всех воркеров: у каждого процесса свой кеш.
+"""
+import time as _time
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, DateField, F, Q, Sum, Window
+from django.db.models.functions import Coalesce, RowNumber, Trunc
+from django.utils import timezone
+
+from accounts.models import User
+from projects.models import Project
+
+from .models import DataGeneration, Defect, DefectRollup, DefectTransition, Priority, Status
+
+REPORT_CACHE_SECONDS = 300
+SOURCE_ROLLUP = "rollup"
+SOURCE_LIVE = "live"
+BUCKETS = ("day", "week", "month")
+# период по умолчанию для timeseries (если не задан date_from), в бакетах
+DEFAULT_BUCKET_SPAN = {"day": 30, "week": 12, "month": 12}
+MAX_BUCKETS = 1000
+GENERATION = "defects"
+
+
+def parse_date(s):
+    try:
+        return datetime.strptime(s, "%Y-%m-%d").date()
+    except Exception:
+        return None
+
+
+def local_midnight(d):
+    return timezone.make_aware(datetime.combine(d, time.min))
+
+
+def created_at_range(date_from=None, date_to=None, field="created_at"):
+    """Q по created_at (или field) для локальных дат [date_from, date_to] включительно."""
+    q = Q()
+    if date_from:
+        q &= Q(**{f"{field}__gte": local_midnight(date_from)})
+    if date_to:
+        q &= Q(**{f"{field}__lt": local_midnight(date_to + timedelta(days=1))})
+    return q
+
+
+def invalidate():
+    """Сбросить все закешированные отчёты (вызывается при записи дефектов, после коммита)."""
+    if not DataGeneration.objects.filter(pk=GENERATION).update(value=F("value") + 1):
+        _create_generation()
+
+
+def generation():
+    """
+    Поколение данных дефектов: растёт при каждой записи (invalidate()). На нём же — ETag
+    дефектов с ?expand= (DefectViewSet). Один запрос по первичному ключу.
+    """
+    value = DataGeneration.objects.filter(pk=GENERATION).values_list("value", flat=True).first()
+    return value if value is not None else _create_generation()
+
+
+def _create_generation():
+    # строку создаёт миграция; если её удалили — заводим заново со временем в нс, а не с 0,
+    # чтобы номера не повторились
+    try:
+        with transaction.atomic():
+            return DataGeneration.objects.create(pk=GENERATION, value=_time.time_ns()).value
+    except IntegrityError:
+        return DataGeneration.objects.get(pk=GENERATION).value
+
+
+def _cache_key(*parts):
+    return ":".join(["reports", str(generation())] + [str(p or "") for p in parts])
+
+
+def summary(project_id=None, date_from=None, date_to=None, source=SOURCE_ROLLUP):
+    if source != SOURCE_LIVE:
+        source = SOURCE_ROLLUP
+    key = _cache_key("summary", source, project_id, date_from, date_to)
+    data = cache.get(key)
+    if data is None:
+        compute = compute_summary if source == SOURCE_LIVE else compute_summary_from_rollup
+        data = compute(project_id, date_from, date_to)
+        cache.set(key, data, REPORT_CACHE_SECONDS)
+    return data
+
+
+def compute_summary(project_id=None, date_from=None, date_to=None):
+    if date_from and not date_to:
+        # открытый сверху диапазон SQLite читает полным обходом индекса проекта (ради GROUP BY);
+        # с верхней границей — поиск по диапазону defect_created_idx. Будущих created_at не бывает.
+        date_to = timezone.localdate()
+    qs = Defect.objects.filter(created_at_range(date_from, date_to))
+    if project_id:
+        qs = qs.filter(project_id=project_id)
+
+    annotations = {"count": Count("id")}
+    for value in Status.values:
+        annotations[f"status_{value}"] = Count("id", filter=Q(status=value))
+    for value in Priority.values:
+        annotations[f"priority_{value}"] = Count("id", filter=Q(priority=value))
+
+    rows = list(
+        qs.order_by()
+          .values("project_id", "project__name")
+          .annotate(**annotations)
+    )
+    return build_summary(rows)
+
+
+def compute_summary_from_rollup(project_id=None, date_from=None, date_to=None):
+    qs = DefectRollup.objects.all()
+    if project_id:
+        qs = qs.filter(project_id=project_id)
+    if date_from:
+        qs = qs.filter(day__gte=date_from)
+    if date_to:
+        qs = qs.filter(day__lte=date_to)
+
+    annotations = {"count": Coalesce(Sum("defect_count"), 0)}
+    for value in Status.values:
+        annotations[f"status_{value}"] = Coalesce(Sum("defect_count", filter=Q(status=value)), 0)
+    for value in Priority.values:
+        annotations[f"priority_{value}"] = Coalesce(Sum("defect_count", filter=Q(priority=value)), 0)
+
+    rows = list(
+        qs.order_by()
+          .values("project_id", "project__name")
+          .annotate(**annotations)
+    )
+    return build_summary(rows)
+
+
+def build_summary(rows):
+    """
+    Ответ отчёта из строк «по проекту» c полями project_id, project__name, count,
+    status_<value>, priority_<value>. Формат — как у прежнего ReportsSummaryView.
+    """
+    def breakdown(name, values):
+        counts = {value: sum(r[f"{name}_{value}"] for r in rows) for value in values}
+        return [{name: value, "count": counts[value]} for value in sorted(values) if counts[value]]
+
+    # проектов немного — сортируем группы здесь, а не ORDER BY поверх агрегата
+    rows = sorted(rows, key=lambda r: r["project__name"])
+    return {
+        "total": sum(r["count"] for r in rows),
+        "by_status": breakdown("status", Status.values),
+        "by_priority": breakdown("priority", Priority.values),
+        "by_project": [
+            {
+                "project_id": r["project_id"],
+                "project_name": r["project__name"],
+                "count": r["count"],
+            }
+            for r in rows
+            if r["count"]
+        ],
+    }
+
+
+# ----------------------  ВРЕМЕННЫЕ РЯДЫ  ----------------------
+
+def bucket_start(d, bucket):
+    if bucket == "week":
+        return d - timedelta(days=d.weekday())
+    if bucket == "month":
+        return d.replace(day=1)
+    return d
+
+
+def next_bucket(d, bucket):
+    if bucket == "week":
+        return d + timedelta(days=7)
+    if bucket == "month":
+        return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return d + timedelta(days=1)
+
+
+def bucket_periods(date_from, date_to, bucket):
+    periods, cur = [], bucket_start(date_from, bucket)
+    while cur <= date_to:
+        periods.append(cur)
+        cur = next_bucket(cur, bucket)
+    return periods
+
+
+def default_date_from(date_to, bucket):
+    d = date_to
+    for _ in range(DEFAULT_BUCKET_SPAN[bucket] - 1):
+        d = bucket_start(d, bucket) - timedelta(days=1)
+    return bucket_start(d, bucket)
+
+
+def timeseries(project_id=None, date_from=None, date_to=None, bucket="day", source=SOURCE_ROLLUP):
+    if source != SOURCE_LIVE:
+        source = SOURCE_ROLLUP
+    key = _cache_key("timeseries", source, bucket, project_id, date_from, date_to)
+    data = cache.get(key)
+    if data is None:
+        data = compute_timeseries(project_id, date_from, date_to, bucket, source)
+        cache.set(key, data, REPORT_CACHE_SECONDS)
+    return data
+
+
+def compute_timeseries(project_id, date_from, date_to, bucket, source=SOURCE_ROLLUP):
+    """
+    Плотный ряд по периодам [bucket_start(date_from) .. date_to]:
+      created  — создано за период,
+      resolved — закрыто со статусом resolved,
+      closed   — закрыто всего (resolved + canceled),
+      backlog  — открытых на конец периода (создано минус закрыто нарастающим итогом).
+    Закрытия считаются по текущему closed_at: переоткрытый дефект снова считается открытым.
+    """
+    periods = bucket_periods(date_from, date_to, bucket)
+    start, end = local_midnight(periods[0]), local_midnight(date_to + timedelta(days=1))
+    tz = timezone.get_current_timezone()
+
+    defects = Defect.objects.order_by()
+    rollup = DefectRollup.objects.order_by()
+    if project_id:
+        defects = defects.filter(project_id=project_id)
+        rollup = rollup.filter(project_id=project_id)
+
+    if source == SOURCE_LIVE:
+        created_rows = (
+            defects.filter(created_at__gte=start, created_at__lt=end)
+            .annotate(period=Trunc("created_at", bucket, output_field=DateField(), tzinfo=tz))
+            .values("period")
+            .annotate(n=Count("id"))
+        )
+        created_before = defects.filter(created_at__lt=start).count()
+    else:
+        created_rows = (
+            rollup.filter(day__gte=periods[0], day__lte=date_to)
+            .annotate(period=Trunc("day", bucket, output_field=DateField()))
+            .values("period")
+            .annotate(n=Sum("defect_count"))
+        )
+        created_before = rollup.filter(day__lt=periods[0]).aggregate(n=Coalesce(Sum("defect_count"), 0))["n"]
+
+    closed_rows = (
+        defects.filter(closed_at__gte=start, closed_at__lt=end)
+        .annotate(period=Trunc("closed_at", bucket, output_field=DateField(), tzinfo=tz))
+        .values("period")
+        .annotate(closed=Count("id"), resolved=Count("id", filter=Q(status=Status.RESOLVED)))
+    )
+    closed_before = defects.filter(closed_at__lt=start).count()
+
+    created = {r["period"]: r["n"] for r in created_rows}
+    closed = {r["period"]: r for r in closed_rows}
+
+    backlog = created_before - closed_before
+    series = []
+    for period in periods:
+        c = closed.get(period, {})
+        backlog += created.get(period, 0) - c.get("closed", 0)
+        series.append({
+            "period": period.isoformat(),
+            "created": created.get(period, 0),
+            "resolved": c.get("resolved", 0),
+            "closed": c.get("closed", 0),
+            "backlog": backlog,
+        })
+    return {
+        "bucket": bucket,
+        "date_from": periods[0].isoformat(),
+        "date_to": date_to.isoformat(),
+        "series": series,
+    }
+
+
+# ----------------------  ЦИКЛ И ВРЕМЯ В СТАТУСАХ  ----------------------
+
+PERCENTILES = (50, 90, 95)
+CYCLE_GROUPS = ("project", "assignee")
+# целевое время закрытия по приоритету, часов; переопределяется settings.DEFECT_SLA_HOURS
+DEFAULT_SLA_HOURS = {"critical": 24, "high": 72, "medium": 168, "low": 336}
+
+
+def sla_hours():
+    return {**DEFAULT_SLA_HOURS, **getattr(settings, "DEFECT_SLA_HOURS", {})}
+
+
+def _hours(seconds):
+    return None if seconds is None else round(seconds / 3600, 1)
+
+
+def distribution(queryset, group, value):
+    """
+    {значение group: {"count", "avg", "p50", "p90", "p95"}} по колонке value одним запросом:
+    COUNT / AVG / ROW_NUMBER() OVER (PARTITION BY group ORDER BY value) и фильтр по номерам
+    строк ceil(n * p / 100) (nearest-rank).
+    """
+    partition = [F(group)]
+    ranked = queryset.order_by().annotate(
+        n=Window(Count("id"), partition_by=partition),
+        mean=Window(Avg(value), partition_by=partition),
+        rn=Window(RowNumber(), partition_by=partition, order_by=[F(value).asc(), F("id").asc()]),
+    )
+    wanted = Q()
+    for p in PERCENTILES:
+        wanted |= Q(rn=(F("n") * p + 99) / 100)
+    result = {}
+    for row in ranked.filter(wanted).values(group, "n", "mean", "rn", value):
+        stats = result.setdefault(row[group], {"count": row["n"], "avg": row["mean"]})
+        for p in PERCENTILES:
+            if row["rn"] == (row["n"] * p + 99) // 100:
+                stats[f"p{p}"] = row[value]
+    return result
+
+
+def _stats_hours(stats):
+    return {
+        "avg_hours": _hours(stats["avg"]),
+        **{f"p{p}_hours": _hours(stats.get(f"p{p}")) for p in PERCENTILES},
+    }
+
+
+def _group_names(group_by, keys):
+    keys = [key for key in keys if key]
+    if group_by == "project":
+        rows = Project.objects.filter(pk__in=keys).values_list("pk", "name")
+        return {pk: {"id": str(pk), "name": name} for pk, name in rows}
+    rows = User.objects.filter(pk__in=keys).values_list("pk", "email", "name")
+    return {pk: {"id": str(pk), "email": email, "full_name": name or email} for pk, email, name in rows}
+
+
+def cycle_time(group_by="project", project_id=None, date_from=None, date_to=None):
+    key = _cache_key("cycle_time", group_by, project_id, date_from, date_to)
+    data = cache.get(key)
+    if data is None:
+        data = compute_cycle_time(group_by, project_id, date_from, date_to)
+        cache.set(key, data, REPORT_CACHE_SECONDS)
+    return data
+
+
+def compute_cycle_time(group_by="project", project_id=None, date_from=None, date_to=None):
+    """
+    Время от создания до закрытия по проектам или исполнителям (на момент закрытия):
+    строки истории с переходом в resolved за период (переоткрытый и снова закрытый дефект —
+    ещё одно закрытие). SLA нарушен, если закрытие дольше sla_hours() для его приоритета.
+    """
+    qs = DefectTransition.objects.filter(
+        created_at_range(date_from, date_to, field="changed_at"),
+        status=Status.RESOLVED,
+        previous_status__in=[value for value in Status.values if value != Status.RESOLVED],
+    )
+    if project_id:
+        qs = qs.filter(project_id=project_id)
+    group = f"{group_by}_id"
+    targets = sla_hours()
+
+    breach = Q()
+    for priority, hours in targets.items():
+        breach |= Q(priority=priority, age_seconds__gt=hours * 3600)
+    breached = dict(
+        qs.order_by().values(group).annotate(n=Count("id", filter=breach)).values_list(group, "n")
+    )
+    stats = distribution(qs, group, "age_seconds")
+    names = _group_names(group_by, stats)
+    results = [
+        {
+            group_by: names.get(key),
+            "resolved": s["count"],
+            **_stats_hours(s),
+            "sla_breached": breached.get(key, 0),
+            "sla_breach_rate": round(breached.get(key, 0) / s["count"], 3),
+        }
+        for key, s in stats.items()
+    ]
+    results.sort(key=lambda r: -r["resolved"])
+    return {"group_by": group_by, "sla_hours": targets, "results": results}
+
+
+def time_in_status(project_id=None, assignee_id=None, date_from=None, date_to=None):
+    key = _cache_key("time_in_status", project_id, assignee_id, date_from, date_to)
+    data = cache.get(key)
+    if data is None:
+        data = compute_time_in_status(project_id, assignee_id, date_from, date_to)
+        cache.set(key, data, REPORT_CACHE_SECONDS)
+    return data
+
+
+def compute_time_in_status(project_id=None, assignee_id=None, date_from=None, date_to=None):
+    """
+    Сколько дефекты находятся в каждом статусе: закончившиеся пребывания (status_seconds),
+    период — по моменту выхода из статуса; assignee — исполнитель на этот момент.
+    """
+    qs = DefectTransition.objects.filter(
+        created_at_range(date_from, date_to, field="changed_at"),
+        status_seconds__isnull=False,
+    )
+    if project_id:
+        qs = qs.filter(project_id=project_id)
+    if assignee_id:
+        qs = qs.filter(previous_assignee_id=assignee_id)
+    stats = distribution(qs, "previous_status", "status_seconds")
+    return {
+        "statuses": [
+            {"status": value, "count": stats[value]["count"], **_stats_hours(stats[value])}
+            for value in Status.values if value in stats
+        ],
+    }
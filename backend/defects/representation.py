@@ -0,0 +1,195 @@
+# backend/defects/representation.py
+"""
+Быстрое чтение дефектов для list / resolved и выгрузки — без моделей и без DRF-полей.
+
+DefectSerializer на каждую строку создаёт модель, прогоняет 11 полей через
+to_representation и потом ещё раз переписывает четыре UUID. Здесь строки берутся
+через values(...) ровно нужными колонками и превращаются в dict заранее собранными
+преобразователями (часовой пояс берётся один раз на ответ).
+
+Вывод совпадает с DefectSerializer байт в байт (tests/test_defects_fast_list.py):
+UUID -> str, дата -> isoformat, дата-время -> isoformat в текущем поясе с «Z» вместо
+«+00:00» (как DateTimeField в DRF), остальное — как есть.
+
+Разреженные ответы (list / resolved / retrieve):
+  ?fields=id,title,status    — только эти поля (id — всегда); остальные колонки не читаются
+                               вовсе: values() в списке, only() в карточке;
+  ?expand=assignee,project   — вместо UUID связи — короткий объект (EXPANSIONS); колонки
+                               берутся тем же запросом через JOIN, без отдельных запросов.
+  ?embed=comments,attachments — только карточка: последние EMBED_LIMIT комментариев / вложений
+                               (новые сверху), остальное — /defects/<id>/comments|attachments/.
+"""
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+# те же поля и в том же порядке, что в DefectSerializer
+DEFECT_FIELDS = (
+    "id",
+    "project",
+    "title",
+    "description",
+    "priority",
+    "status",
+    "assignee",
+    "created_by",
+    "due_date",
+    "created_at",
+    "updated_at",
+)
+FK_FIELDS = frozenset({"project", "assignee", "created_by"})
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+EMBED_PARAM = "embed"
+EMBEDDABLE = ("comments", "attachments")
+EMBED_LIMIT = 5
+
+
+def _user(pk, email, name, role):
+    # как UserShortSerializer
+    return {"id": str(pk), "email": email, "name": name, "full_name": name or email, "role": role}
+
+
+def _project(pk, name, customer):
+    return {"id": str(pk), "name": name, "customer": customer}
+
+
+# связь -> (колонки связанной модели, сборщик объекта из (pk, *колонки))
+EXPANSIONS = {
+    "project": (("name", "customer"), _project),
+    "assignee": (("email", "name", "role"), _user),
+    "created_by": (("email", "name", "role"), _user),
+}
+
+
+def _split(raw):
+    return [part.strip() for part in (raw or "").split(",") if part.strip()]
+
+
+def parse_params(query_params):
+    """
+    ?fields= / ?expand= -> (fields, expand): fields — кортеж в порядке DEFECT_FIELDS,
+    expand — кортеж связей. Неизвестные имена — 400.
+    """
+    requested = _split(query_params.get(FIELDS_PARAM))
+    expand = _split(query_params.get(EXPAND_PARAM))
+    errors = {}
+    unknown = [f for f in requested if f not in DEFECT_FIELDS]
+    if unknown:
+        errors[FIELDS_PARAM] = [f"Неизвестные поля: {', '.join(unknown)}. Доступны: {', '.join(DEFECT_FIELDS)}."]
+    unknown = [f for f in expand if f not in EXPANSIONS]
+    if unknown:
+        errors[EXPAND_PARAM] = [f"Нельзя раскрыть: {', '.join(unknown)}. Доступны: {', '.join(EXPANSIONS)}."]
+    if errors:
+        raise ValidationError(errors)
+
+    # раскрытая связь попадает в ответ, даже если её нет в ?fields=
+    wanted = {"id", *requested, *expand} if requested else set(DEFECT_FIELDS)
+    fields = tuple(f for f in DEFECT_FIELDS if f in wanted)
+    return fields, tuple(f for f in EXPANSIONS if f in expand)
+
+
+def parse_embed(query_params):
+    """?embed= -> кортеж в порядке EMBEDDABLE; неизвестные имена — 400."""
+    embed = _split(query_params.get(EMBED_PARAM))
+    unknown = [f for f in embed if f not in EMBEDDABLE]
+    if unknown:
+        raise ValidationError({
+            EMBED_PARAM: [f"Нельзя встроить: {', '.join(unknown)}. Доступны: {', '.join(EMBEDDABLE)}."]
+        })
+    return tuple(f for f in EMBEDDABLE if f in embed)
+
+
+def column(field):
+    """Колонка в values()/values_list() для поля ответа (FK — без JOIN, по *_id)."""
+    return f"{field}_id" if field in FK_FIELDS else field
+
+
+def columns(fields=DEFECT_FIELDS, expand=(), extra=()):
+    """Колонки для values(): поля, колонки раскрываемых связей и extra (без повторов)."""
+    cols = [column(f) for f in fields]
+    for f in expand:
+        cols += [f"{f}__{attr}" for attr in EXPANSIONS[f][0]]
+    cols += [c for c in extra if c not in cols]
+    return tuple(cols)
+
+
+def converters(fields=DEFECT_FIELDS):
+    """Преобразователи по полям (None — значение отдаётся как есть)."""
+    tz = timezone.get_current_timezone()
+
+    def uuid_(v):
+        return None if v is None else str(v)
+
+    def date_(v):
+        return None if v is None else v.isoformat()
+
+    def datetime_(v):
+        if v is None:
+            return None
+        v = v.astimezone(tz).isoformat()
+        return v[:-6] + "Z" if v.endswith("+00:00") else v
+
+    by_field = {
+        "id": uuid_, "project": uuid_, "assignee": uuid_, "created_by": uuid_,
+        "due_date": date_, "created_at": datetime_, "updated_at": datetime_,
+    }
+    return [by_field.get(f) for f in fields]
+
+
+def values(queryset, fields=DEFECT_FIELDS, expand=(), extra=()):
+    """
+    queryset -> values()-queryset (dict по колонкам). select_related здесь не действует,
+    раскрываемые связи подтягиваются JOIN'ом по колонкам вида assignee__email.
+    extra — колонки, нужные не в ответе, а, например, для ссылок курсорной пагинации.
+    """
+    return queryset.values(*columns(fields, expand, extra))
+
+
+def to_dicts(rows, fields=DEFECT_FIELDS, expand=()):
+    """dict-строки из values() -> список dict в формате DefectSerializer."""
+    expanded = [
+        (f, column(f), tuple(f"{f}__{attr}" for attr in EXPANSIONS[f][0]), EXPANSIONS[f][1])
+        for f in expand if f in fields
+    ]
+    skip = {f for f, *_ in expanded}
+    plan = [(f, column(f), conv) for f, conv in zip(fields, converters(fields)) if f not in skip]
+    plain = [(f, col) for f, col, conv in plan if conv is None]
+    converted = [(f, col, conv) for f, col, conv in plan if conv is not None]
+    order = list(fields)
+
+    result = []
+    for row in rows:
+        item = dict.fromkeys(order)
+        for f, col in plain:
+            item[f] = row[col]
+        for f, col, conv in converted:
+            item[f] = conv(row[col])
+        for f, col, attrs, build in expanded:
+            pk = row[col]
+            item[f] = None if pk is None else build(pk, *(row[a] for a in attrs))
+        result.append(item)
+    return result
+
+
+def expand_instance(instance, field):
+    """Раскрытая связь для модели (карточка, ответы на запись) — тот же формат, что в to_dicts."""
+    related = getattr(instance, field)
+    if related is None:
+        return None
+    attrs, build = EXPANSIONS[field]
+    return build(related.pk, *(getattr(related, a) for a in attrs))
+
+
+def restrict(queryset, fields=DEFECT_FIELDS, expand=()):
+    """
+    Модельный путь (retrieve): only() нужных колонок и select_related только раскрываемых
+    связей. updated_at читается всегда — на нём ETag карточки (core/conditional.py).
+    """
+    names = ["id", "updated_at", *fields]
+    for f in expand:
+        names += [f"{f}__{attr}" for attr in EXPANSIONS[f][0]]
+    queryset = queryset.select_related(None)
+    if expand:  # select_related() без аргументов — это «все FK», а не «ни одного»
+        queryset = queryset.select_related(*expand)
+    return queryset.only(*names)
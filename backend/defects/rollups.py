@@ -0,0 +1,126 @@
+# backend/defects/rollups.py
+"""
+Инкрементальный rollup дефектов (модель DefectRollup).
+
+Ключ бакета: (project_id, day, status, priority, assignee_id), где day — локальная дата created_at.
+- apply_deltas(): +1/-1 по ключам при создании / изменении / удалении дефекта
+  (update, а если бакета нет — вставка; ключ уникален, гонку вставок ловим по IntegrityError);
+- bulk_change(): то же для массового UPDATE (сигналы там не шлются);
+- release_assignee(): бакеты удаляемого пользователя — в бакеты без исполнителя;
+- expected_buckets() / rebuild() / drift(): пересборка и сверка с таблицей дефектов.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+KEY_FIELDS = ("project_id", "day", "status", "priority", "assignee_id")
+
+
+def bucket_key(project_id, created_at, status, priority, assignee_id):
+    return (project_id, timezone.localdate(created_at), status, priority, assignee_id)
+
+
+def key_for(defect):
+    return bucket_key(defect.project_id, defect.created_at, defect.status, defect.priority, defect.assignee_id)
+
+
+def apply_deltas(deltas, rollup_model=None):
+    """deltas: {key: +n/-n}. Нулевые изменения пропускаем."""
+    if rollup_model is None:
+        from .models import DefectRollup as rollup_model
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        bucket = rollup_model.objects.filter(**dict(zip(KEY_FIELDS, key)))
+        if bucket.update(defect_count=F("defect_count") + delta) or delta < 0:
+            continue
+        try:
+            # точка сохранения: при гонке откатываем только эту вставку, не всю транзакцию
+            with transaction.atomic():
+                rollup_model.objects.create(defect_count=delta, **dict(zip(KEY_FIELDS, key)))
+        except IntegrityError:
+            # параллельная транзакция создала бакет первой (defect_rollup_bucket_uniq) — прибавляем к нему
+            bucket.update(defect_count=F("defect_count") + delta)
+
+
+def release_assignee(user_id, rollup_model=None):
+    """
+    Перед удалением пользователя: его бакеты переносим в бакеты без исполнителя.
+    Иначе SET_NULL превратил бы их в дубли ключа и упёрся в defect_rollup_bucket_uniq.
+    """
+    if rollup_model is None:
+        from .models import DefectRollup as rollup_model
+    rows = rollup_model.objects.filter(assignee_id=user_id)
+    deltas = Counter()
+    for row in rows.values(*KEY_FIELDS, "defect_count"):
+        deltas[tuple(row[f] for f in KEY_FIELDS[:-1]) + (None,)] += row["defect_count"]
+    rows.delete()
+    apply_deltas(deltas, rollup_model)
+
+
+def bulk_change(rows, changes):
+    """
+    rows — значения дефектов ДО массового update (project_id, created_at, status, priority, assignee_id),
+    changes — то, что передаём в update(). Учитываем только поля ключа.
+    """
+    change = {
+        "status": changes.get("status"),
+        "priority": changes.get("priority"),
+        "assignee_id": changes["assignee"].pk if changes.get("assignee") else None,
+    }
+    deltas = Counter()
+    for row in rows:
+        old = bucket_key(row["project_id"], row["created_at"], row["status"], row["priority"], row["assignee_id"])
+        new = bucket_key(
+            row["project_id"],
+            row["created_at"],
+            change["status"] if "status" in changes else row["status"],
+            change["priority"] if "priority" in changes else row["priority"],
+            change["assignee_id"] if "assignee" in changes else row["assignee_id"],
+        )
+        if old != new:
+            deltas[old] -= 1
+            deltas[new] += 1
+    apply_deltas(deltas)
+
+
+def expected_buckets(defect_model):
+    """Бакеты, посчитанные заново по таблице дефектов: {key: count}."""
+    rows = (
+        defect_model.objects
+        .annotate(day=TruncDate("created_at", tzinfo=timezone.get_current_timezone()))
+        .order_by()
+        .values("project_id", "day", "status", "priority", "assignee_id")
+        .annotate(n=Count("id"))
+    )
+    return {tuple(r[f] for f in KEY_FIELDS): r["n"] for r in rows}
+
+
+def stored_buckets(rollup_model):
+    rows = rollup_model.objects.order_by().values(*KEY_FIELDS).annotate(n=Sum("defect_count"))
+    return {tuple(r[f] for f in KEY_FIELDS): r["n"] for r in rows if r["n"]}
+
+
+def drift(defect_model, rollup_model):
+    """Расхождения: {key: (ожидается, в rollup)}."""
+    expected, stored = expected_buckets(defect_model), stored_buckets(rollup_model)
+    return {
+        key: (expected.get(key, 0), stored.get(key, 0))
+        for key in expected.keys() | stored.keys()
+        if expected.get(key, 0) != stored.get(key, 0)
+    }
+
+
+def rebuild(defect_model, rollup_model, batch_size=1000):
+    """Полная пересборка rollup'а в одной транзакции. Возвращает число бакетов."""
+    buckets = expected_buckets(defect_model)
+    with transaction.atomic():
+        rollup_model.objects.all().delete()
+        rollup_model.objects.bulk_create(
+            [rollup_model(defect_count=n, **dict(zip(KEY_FIELDS, key))) for key, n in buckets.items()],
+            batch_size=batch_size,
+        )
+    return len(buckets)
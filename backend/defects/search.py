@@ -0,0 +1,270 @@
+# backend/defects/search.py
+"""
+Полнотекстовый поиск по дефектам: заголовок, описание и тексты комментариев.
+
+SQLite     — FTS5: виртуальная таблица defects_defect_fts и таблица соответствия
+             defects_defect_search (rowid в FTS <-> id дефекта). Русская морфология —
+             лёгкий стеммер stem(), он применяется и к документу, и к запросу.
+PostgreSQL — таблица defects_defect_search (defect_id, document tsvector) с GIN-индексом,
+             конфигурация 'russian'.
+Другие БД  — не поддерживается, DefectSearchFilter работает как обычный SearchFilter (icontains).
+
+Индекс обновляется сигналами при записи дефектов и комментариев (signals.py).
+Полная пересборка — manage.py rebuild_search_index.
+Всё на «сыром» SQL, чтобы код можно было вызывать и из миграций.
+"""
+import re
+import uuid
+from functools import lru_cache
+
+from django.db import connection as default_connection
+
+TS_CONFIG = "russian"
+# вес заголовка относительно описания/комментариев в bm25 (SQLite)
+TITLE_WEIGHT = 10.0
+CHUNK = 500
+MAX_TERMS = 8
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_CYRILLIC_RE = re.compile(r"[а-я]")
+
+# Окончания (прилагательные, существительные, глаголы, причастия) — от длинных к коротким.
+_ENDINGS = sorted(
+    {
+        "ейшими", "ующими", "ившись", "ывшись",
+        "ейшая", "ейшее", "ейший", "ующая", "ующее", "ующий", "ующих", "ающий", "яющий",
+        "ости", "остью", "ость", "иями", "ями", "ами", "ией", "иям", "ием", "иях",
+        "ими", "ыми", "его", "ого", "ему", "ому", "ешь", "ете", "ите", "ить", "ать", "ять",
+        "ее", "ие", "ые", "ое", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом", "их", "ых",
+        "ую", "юю", "ая", "яя", "ою", "ею", "ах", "ях", "ам", "ям", "ов", "ев", "ию", "ия",
+        "ья", "ье", "ьи", "ью", "ет", "ут", "ют", "ит", "ат", "ят", "ть",
+        "а", "е", "и", "о", "у", "ы", "ь", "ю", "я", "й",
+    },
+    key=len,
+    reverse=True,
+)
+
+
+@lru_cache(maxsize=50_000)
+def stem(word):
+    """Грубый стеммер для русского: убрать возвратную частицу и одно окончание (основа ≥ 3 букв)."""
+    word = word.lower().replace("ё", "е")
+    if not _CYRILLIC_RE.search(word):
+        return word
+    if len(word) > 5 and word.endswith(("ся", "сь")):
+        word = word[:-2]
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[: -len(ending)]
+    return word
+
+
+def words(text):
+    return _WORD_RE.findall(text or "")
+
+
+def stem_text(text):
+    return " ".join(stem(w) for w in words(text))
+
+
+def supported(connection=None):
+    return (connection or default_connection).vendor in {"sqlite", "postgresql"}
+
+
+# ----------------------  СХЕМА  ----------------------
+
+def create_tables(connection):
+    with connection.cursor() as cur:
+        if connection.vendor == "sqlite":
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS defects_defect_search ("
+                " id INTEGER PRIMARY KEY, defect_id char(32) NOT NULL UNIQUE)"
+            )
+            cur.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS defects_defect_fts"
+                " USING fts5(title, body, tokenize='unicode61 remove_diacritics 2')"
+            )
+        elif connection.vendor == "postgresql":
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS defects_defect_search ("
+                " defect_id uuid PRIMARY KEY REFERENCES defects_defect(id) ON DELETE CASCADE,"
+                " document tsvector NOT NULL)"
+            )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS defects_defect_search_document_gin"
+                " ON defects_defect_search USING GIN (document)"
+            )
+
+
+def drop_tables(connection):
+    with connection.cursor() as cur:
+        if connection.vendor == "sqlite":
+            cur.execute("DROP TABLE IF EXISTS defects_defect_fts")
+        if supported(connection):
+            cur.execute("DROP TABLE IF EXISTS defects_defect_search")
+
+
+# ----------------------  ИНДЕКСАЦИЯ  ----------------------
+
+def _db_ids(connection, ids):
+    # SQLite хранит UUID как 32 hex-символа, PostgreSQL — нативный uuid
+    ids = [pk if isinstance(pk, uuid.UUID) else uuid.UUID(str(pk)) for pk in ids]
+    return [pk.hex for pk in ids] if connection.vendor == "sqlite" else ids
+
+
+def _placeholders(n):
+    return ", ".join(["%s"] * n)
+
+
+def index_defects(ids, connection=None):
+    """(Пере)индексировать дефекты с указанными id. Несуществующие — просто удаляются из индекса."""
+    connection = connection or default_connection
+    if not supported(connection):
+        return
+    ids = _db_ids(connection, ids)
+    for i in range(0, len(ids), CHUNK):
+        chunk = ids[i:i + CHUNK]
+        if connection.vendor == "sqlite":
+            _index_sqlite(connection, chunk)
+        else:
+            _index_postgres(connection, chunk)
+
+
+def remove_defects(ids, connection=None):
+    connection = connection or default_connection
+    if not supported(connection):
+        return
+    ids = _db_ids(connection, ids)
+    with connection.cursor() as cur:
+        for i in range(0, len(ids), CHUNK):
+            chunk = ids[i:i + CHUNK]
+            if connection.vendor == "sqlite":
+                _remove_sqlite(cur, chunk)
+            else:
+                cur.execute("DELETE FROM defects_defect_search WHERE defect_id = ANY(%s)", [chunk])
+
+
+def rebuild(connection=None):
+    """Полная пересборка индекса. Возвращает число проиндексированных дефектов."""
+    connection = connection or default_connection
+    if not supported(connection):
+        return 0
+    with connection.cursor() as cur:
+        if connection.vendor == "sqlite":
+            cur.execute("DELETE FROM defects_defect_fts")
+        cur.execute("DELETE FROM defects_defect_search")
+        cur.execute("SELECT id FROM defects_defect")
+        ids = [row[0] for row in cur.fetchall()]
+    index_defects(ids, connection)
+    return len(ids)
+
+
+def _remove_sqlite(cur, chunk):
+    marks = _placeholders(len(chunk))
+    cur.execute(
+        f"DELETE FROM defects_defect_fts WHERE rowid IN"
+        f" (SELECT id FROM defects_defect_search WHERE defect_id IN ({marks}))",
+        chunk,
+    )
+    cur.execute(f"DELETE FROM defects_defect_search WHERE defect_id IN ({marks})", chunk)
+
+
+def _index_sqlite(connection, chunk):
+    marks = _placeholders(len(chunk))
+    with connection.cursor() as cur:
+        cur.execute(f"SELECT id, title, description FROM defects_defect WHERE id IN ({marks})", chunk)
+        docs = {pk: [title, description or ""] for pk, title, description in cur.fetchall()}
+        cur.execute(f"SELECT defect_id, text FROM defects_comment WHERE defect_id IN ({marks})", chunk)
+        for defect_id, text in cur.fetchall():
+            if defect_id in docs:
+                docs[defect_id].append(text)
+
+        _remove_sqlite(cur, chunk)
+        if not docs:
+            return
+        cur.executemany("INSERT INTO defects_defect_search (defect_id) VALUES (%s)", [[pk] for pk in docs])
+        cur.execute(
+            f"SELECT id, defect_id FROM defects_defect_search WHERE defect_id IN ({_placeholders(len(docs))})",
+            list(docs),
+        )
+        cur.executemany(
+            "INSERT INTO defects_defect_fts (rowid, title, body) VALUES (%s, %s, %s)",
+            [
+                [rowid, stem_text(docs[pk][0]), stem_text(" ".join(docs[pk][1:]))]
+                for rowid, pk in cur.fetchall()
+            ],
+        )
+
+
+def _index_postgres(connection, chunk):
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO defects_defect_search (defect_id, document)
+            SELECT d.id,
+                   setweight(to_tsvector(%s::regconfig, coalesce(d.title, '')), 'A')
+                   || setweight(to_tsvector(%s::regconfig,
+                        coalesce(d.description, '') || ' ' || coalesce(string_agg(c.text, ' '), '')), 'B')
+            FROM defects_defect d
+            LEFT JOIN defects_comment c ON c.defect_id = d.id
+            WHERE d.id = ANY(%s)
+            GROUP BY d.id
+            ON CONFLICT (defect_id) DO UPDATE SET document = EXCLUDED.document
+            """,
+            [TS_CONFIG, TS_CONFIG, chunk],
+        )
+
+
+# ----------------------  ПОИСК  ----------------------
+
+def build_query(terms, connection=None):
+    """
+    Строка запроса для MATCH / to_tsquery из поисковых слов: все слова обязательны,
+    последнее можно не дописывать (префиксный поиск). None — если слов нет.
+    """
+    connection = connection or default_connection
+    tokens = [w for term in terms for w in words(term)][:MAX_TERMS]
+    if not tokens:
+        return None
+    if connection.vendor == "sqlite":
+        return " ".join(f'"{stem(w)}"*' for w in tokens)
+    return " & ".join(f"{w.lower()}:*" for w in tokens)
+
+
+def matching_sql(query, connection=None):
+    """(sql, params) — подзапрос с id подходящих дефектов, для .filter(pk__in=RawSQL(...))."""
+    connection = connection or default_connection
+    if connection.vendor == "sqlite":
+        return (
+            "SELECT s.defect_id FROM defects_defect_fts"
+            " JOIN defects_defect_search s ON s.id = defects_defect_fts.rowid"
+            " WHERE defects_defect_fts MATCH %s",
+            [query],
+        )
+    return (
+        "SELECT defect_id FROM defects_defect_search WHERE document @@ to_tsquery(%s::regconfig, %s)",
+        [TS_CONFIG, query],
+    )
+
+
+def ranked_ids(query, limit, connection=None):
+    """id лучших по релевантности дефектов (не больше limit), по убыванию релевантности."""
+    connection = connection or default_connection
+    with connection.cursor() as cur:
+        if connection.vendor == "sqlite":
+            cur.execute(
+                "SELECT s.defect_id FROM defects_defect_fts"
+                " JOIN defects_defect_search s ON s.id = defects_defect_fts.rowid"
+                " WHERE defects_defect_fts MATCH %s AND defects_defect_fts.rank MATCH %s"
+                # ORDER BY rank FTS5 отдаёт сам, без сортировки во временном B-tree
+                " ORDER BY defects_defect_fts.rank LIMIT %s",
+                [query, f"bm25({TITLE_WEIGHT}, 1.0)", limit],
+            )
+        else:
+            cur.execute(
+                "SELECT defect_id FROM defects_defect_search"
+                " WHERE document @@ to_tsquery(%s::regconfig, %s)"
+                " ORDER BY ts_rank(document, to_tsquery(%s::regconfig, %s)) DESC LIMIT %s",
+                [TS_CONFIG, query, TS_CONFIG, query, limit],
+            )
+        return [pk if isinstance(pk, uuid.UUID) else uuid.UUID(pk) for (pk,) in cur.fetchall()]
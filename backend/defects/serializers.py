@@ -1,6 +1,15 @@
 # backend/defects/serializers.py
 from rest_framework import serializers
-from .models import Defect, Comment, Attachment
+
+from accounts.models import User, Roles
+from . import representation, uploads
+from .models import (
+    Defect, DefectTransition, Comment, Attachment, UploadSession, Priority, Status, VariantStatus,
+)
+from .permissions import is_engineer_scoped
+
+# Верхняя граница на количество id в одном массовом запросе
+BULK_MAX_IDS = 5000
 
 
 class DefectSerializer(serializers.ModelSerializer):
@@ -8,6 +17,10 @@ class DefectSerializer(serializers.ModelSerializer):
     Сериализатор дефектов.
     created_by заполняется автоматически из request.user.
     В ответе приводим UUID-поля к строкам.
+    context["fields"] / context["expand"] — разреженный ответ и раскрытые связи
+    (?fields= / ?expand=, см. defects/representation.py).
+    context["embed"] — последние комментарии / вложения из Prefetch в latest_<имя>
+    (?embed=, DefectViewSet.retrieve).
     """
     class Meta:
         model = Defect
@@ -26,6 +39,13 @@ class DefectSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("created_by", "created_at", "updated_at")
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        only = self.context.get("fields")
+        if only is not None:
+            for name in set(self.fields) - set(only):
+                self.fields.pop(name)
+
     def create(self, validated_data):
         if "created_by" not in validated_data:
             req = self.context.get("request")
@@ -37,18 +57,15 @@ class DefectSerializer(serializers.ModelSerializer):
         data = super().to_representation(instance)
         # приводим UUID к строкам
         data["id"] = str(instance.id)
-        if instance.project_id:
-            data["project"] = str(instance.project_id)
-        else:
-            data["project"] = None
-        if instance.assignee_id:
-            data["assignee"] = str(instance.assignee_id)
-        else:
-            data["assignee"] = None
-        if instance.created_by_id:
-            data["created_by"] = str(instance.created_by_id)
-        else:
-            data["created_by"] = None
+        for name in representation.FK_FIELDS & data.keys():
+            pk = getattr(instance, f"{name}_id")
+            data[name] = str(pk) if pk else None
+        for name in self.context.get("expand", ()):
+            if name in data:
+                data[name] = representation.expand_instance(instance, name)
+        for name in self.context.get("embed", ()):
+            serializer_class = {"comments": CommentSerializer, "attachments": AttachmentSerializer}[name]
+            data[name] = serializer_class(getattr(instance, f"latest_{name}"), many=True, context=self.context).data
         return data
 
 
@@ -73,19 +90,145 @@ class CommentSerializer(serializers.ModelSerializer):
         return data
 
 
+class DefectCommentSerializer(CommentSerializer):
+    """Комментарий в ленте /defects/<id>/comments/: дефект берётся из URL."""
+    defect = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class DefectTransitionSerializer(serializers.ModelSerializer):
+    """Строка истории дефекта (history.py); пользователи — строкой UUID."""
+    assignee = serializers.UUIDField(read_only=True, source="assignee_id")
+    previous_assignee = serializers.UUIDField(read_only=True, source="previous_assignee_id")
+    changed_by = serializers.UUIDField(read_only=True, source="changed_by_id")
+
+    class Meta:
+        model = DefectTransition
+        fields = ("id", "changed_at", "changed_by", "previous_status", "status", "previous_priority", "priority",
+                  "previous_assignee", "assignee", "status_seconds")
+
+
 class AttachmentSerializer(serializers.ModelSerializer):
     """
     Вложения к дефекту.
     """
     defect = serializers.PrimaryKeyRelatedField(queryset=Defect.objects.all())
+    sha256 = serializers.CharField(source="blob_id", read_only=True)
+    # превью для фото (media.py); null, пока не готовы или если это не изображение
+    thumbnail = serializers.SerializerMethodField()
+    preview = serializers.SerializerMethodField()
 
     class Meta:
         model = Attachment
-        fields = ("id", "defect", "file", "filename", "size_bytes", "uploaded_at")
+        fields = ("id", "defect", "file", "filename", "size_bytes", "sha256",
+                  "thumbnail", "preview", "uploaded_at")
         read_only_fields = ("uploaded_at",)
 
+    def get_thumbnail(self, obj):
+        return self._variant_url(obj, "thumbnail")
+
+    def get_preview(self, obj):
+        return self._variant_url(obj, "preview")
+
+    def _variant_url(self, obj, field):
+        blob = obj.blob
+        if blob is None or blob.variants_status != VariantStatus.READY:
+            return None
+        url = getattr(blob, field).url
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
         data["id"] = str(instance.id)
         data["defect"] = str(instance.defect_id)
         return data
+
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Сессия загрузки вложения по частям (uploads.py).
+    На входе: defect, filename, size_bytes, chunk_size (необязательно).
+    На выходе ещё received_bytes / next_chunk / chunk_count / crc32 (hex) — с чего продолжать.
+    """
+    defect = serializers.PrimaryKeyRelatedField(queryset=Defect.objects.all())
+    size_bytes = serializers.IntegerField(min_value=0, max_value=uploads.MAX_FILE_SIZE)
+    chunk_size = serializers.IntegerField(default=uploads.DEFAULT_CHUNK_SIZE)
+    chunk_count = serializers.SerializerMethodField()
+    crc32 = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ("id", "defect", "filename", "size_bytes", "chunk_size",
+                  "received_bytes", "next_chunk", "chunk_count", "crc32", "created_at", "updated_at")
+        read_only_fields = ("received_bytes", "next_chunk", "created_at", "updated_at")
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # инженер загружает только в свои дефекты — как видимость в DefectViewSet.get_queryset
+        request = self.context.get("request")
+        if request is not None and is_engineer_scoped(request.user):
+            fields["defect"].queryset = Defect.objects.filter(assignee=request.user)
+        return fields
+
+    def validate_chunk_size(self, value):
+        if not uploads.MIN_CHUNK_SIZE <= value <= uploads.MAX_CHUNK_SIZE:
+            raise serializers.ValidationError(
+                f"Допустимо от {uploads.MIN_CHUNK_SIZE} до {uploads.MAX_CHUNK_SIZE} байт."
+            )
+        return value
+
+    def get_chunk_count(self, obj):
+        return uploads.chunk_count(obj)
+
+    def get_crc32(self, obj):
+        return f"{obj.crc32:08x}"
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data["id"] = str(instance.id)
+        data["defect"] = str(instance.defect_id)
+        return data
+
+class _DefectChangesSerializer(serializers.Serializer):
+    """Поля, которые можно менять массово."""
+    status = serializers.ChoiceField(choices=Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Priority.choices, required=False)
+    assignee = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(role=Roles.ENGINEER), allow_null=True, required=False,
+    )
+    due_date = serializers.DateField(allow_null=True, required=False)
+
+
+class DefectBulkUpdateSerializer(serializers.Serializer):
+    """
+    Массовое изменение дефектов: PATCH /api/defects/bulk/
+
+    {
+      "ids": ["<uuid>", ...],            # либо список id,
+      "filter": {"project": "<uuid>", "status": "new"},   # либо фильтр
+      "changes": {"status": "resolved", "priority": "high",
+                  "assignee": "<uuid>|null", "due_date": "YYYY-MM-DD|null"}
+    }
+    """
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, allow_empty=False, max_length=BULK_MAX_IDS,
+    )
+    filter = serializers.DictField(required=False, allow_empty=False)
+    changes = serializers.DictField(allow_empty=False)
+
+    def validate_changes(self, value):
+        changes = _DefectChangesSerializer(data=value)
+        changes.is_valid(raise_exception=True)
+        unknown = set(value) - set(changes.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Недопустимые поля: {', '.join(sorted(unknown))}"
+            )
+        return changes.validated_data
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Нужно передать либо ids, либо filter.")
+        return attrs
+
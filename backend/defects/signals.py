@@ -0,0 +1,145 @@
+# backend/defects/signals.py
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import User
+from projects.models import Project
+
+from . import blobs, events, history, media, reports, rollups, search, sync
+from .models import Defect, Comment, Attachment, ChangeKind, VariantStatus, CLOSED_STATUSES
+
+# поля, которые входят в ключ rollup-бакета
+ROLLUP_FIELDS = {"project", "project_id", "status", "priority", "assignee", "assignee_id"}
+# поля, которые попадают в полнотекстовый индекс
+SEARCH_FIELDS = {"title", "description"}
+
+
+def sync_closed_at(instance):
+    """
+    closed_at ставится при переходе в закрытый статус и сбрасывается при переоткрытии.
+    Возвращает True, если значение поменялось.
+    """
+    before = instance.closed_at
+    if instance.status not in CLOSED_STATUSES:
+        instance.closed_at = None
+    elif instance.closed_at is None:
+        instance.closed_at = timezone.now()
+    return instance.closed_at != before
+
+
+@receiver(pre_save, sender=Defect)
+def defect_remember_old(sender, instance, update_fields=None, **kwargs):
+    # запоминаем ключ бакета до сохранения, чтобы потом перенести счётчик
+    instance._rollup_old_key = None
+    # save(update_fields=[...]) не запишет closed_at — допишем его в post_save
+    instance._closed_at_pending = sync_closed_at(instance) and update_fields is not None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not ROLLUP_FIELDS & set(update_fields):
+        return
+    old = (
+        Defect.objects
+        .filter(pk=instance.pk)
+        .values("project_id", "created_at", "status", "priority", "assignee_id")
+        .first()
+    )
+    if old:
+        instance._rollup_old_key = rollups.bucket_key(**old)
+
+
+@receiver(post_save, sender=Defect)
+def defect_saved(sender, instance, created, update_fields=None, **kwargs):
+    new_key = rollups.key_for(instance)
+    old_key = None if created else getattr(instance, "_rollup_old_key", None)
+    if getattr(instance, "_closed_at_pending", False):
+        Defect.objects.filter(pk=instance.pk).update(closed_at=instance.closed_at)
+    if created:
+        rollups.apply_deltas({new_key: 1})
+        history.record_created([instance])
+    elif old_key and old_key != new_key:
+        rollups.apply_deltas({old_key: -1, new_key: 1})
+        # ключ бакета включает статус, приоритет и исполнителя — их и пишет история
+        changed_by = getattr(instance, "_changed_by", None)
+        history.record_change(instance, dict(zip(history.TRACKED, old_key[2:])),
+                              changed_by.pk if changed_by else None)
+    if created or update_fields is None or SEARCH_FIELDS & set(update_fields):
+        search.index_defects([instance.pk])
+    # журнал синхронизации; без старого ключа исполнитель не менялся
+    sync.record_defect(instance, None if created else old_key[4] if old_key else instance.assignee_id)
+    # кеш отчётов сбрасываем только после успешного коммита
+    transaction.on_commit(reports.invalidate)
+    # в потоке изменений — и прежние проект / исполнитель (ключ бакета до правки)
+    event = events.defect_event(
+        "created" if created else "updated", instance,
+        old_project=old_key[0] if old_key else None, old_assignee=old_key[4] if old_key else None,
+    )
+    events.publish_on_commit(lambda: event)
+
+
+@receiver(post_delete, sender=Defect)
+def defect_deleted(sender, instance, **kwargs):
+    search.remove_defects([instance.pk])
+    rollups.apply_deltas({rollups.key_for(instance): -1})
+    sync.record_defect(instance, instance.assignee_id, deleted=True)
+    transaction.on_commit(reports.invalidate)
+    event = events.defect_event("deleted", instance)
+    events.publish_on_commit(lambda: event)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=User)
+def related_saved(sender, instance, update_fields=None, **kwargs):
+    # имя проекта / пользователя входит в ?expand= дефектов — новое поколение, новые ETag;
+    # вход в систему (update_fields={"last_login"}) ничего видимого не меняет
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    transaction.on_commit(reports.invalidate)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    # до SET_NULL: его бакеты rollup'а сливаем с бакетами без исполнителя
+    rollups.release_assignee(instance.pk)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed(sender, instance, created=None, **kwargs):
+    # created is None — удаление (post_delete его не передаёт)
+    sync.record_project(instance, deleted=created is None)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, created=None, **kwargs):
+    # текст комментариев входит в документ дефекта
+    search.index_defects([instance.defect_id])
+    sync.record_child(ChangeKind.COMMENT, instance, deleted=created is None)
+    if created is False:
+        return  # правка текста — не событие ленты
+    kind = "comment.created" if created else "comment.deleted"
+    pk, defect_id, author_id = instance.pk, instance.defect_id, instance.author_id
+    events.publish_on_commit(lambda: events.child_event(kind, pk, defect_id, author=str(author_id)))
+
+
+@receiver(post_save, sender=Attachment)
+def attachment_saved(sender, instance, created, **kwargs):
+    # превью строятся в фоне после коммита (media.py), один раз на содержимое
+    if created and instance.blob_id and instance.blob.variants_status == VariantStatus.PENDING:
+        media.schedule(instance.blob_id)
+    sync.record_child(ChangeKind.ATTACHMENT, instance)
+    if created:
+        pk, defect_id = instance.pk, instance.defect_id
+        events.publish_on_commit(lambda: events.child_event("attachment.created", pk, defect_id))
+
+
+@receiver(post_delete, sender=Attachment)
+def attachment_deleted(sender, instance, **kwargs):
+    # и через AttachmentViewSet.destroy, и каскадом при удалении дефекта
+    if instance.blob_id:
+        blobs.release(instance.blob_id)
+    sync.record_child(ChangeKind.ATTACHMENT, instance, deleted=True)
+    pk, defect_id = instance.pk, instance.defect_id
+    events.publish_on_commit(lambda: events.child_event("attachment.deleted", pk, defect_id))
@@ -0,0 +1,179 @@
+# backend/defects/stream.py
+"""
+ASGI-каналы потока изменений (события — defects/events.py). Подключаются в core/asgi.py
+поверх Django-приложения; под WSGI (runserver / gunicorn sync) их нет.
+
+    GET /api/stream/?token=<access>[&project=<uuid>...]           — Server-Sent Events
+        id: <seq> / event: <тип> / data: <json>; раз в STREAM_HEARTBEAT секунд — «: ping»;
+        Last-Event-ID (или ?last_event_id=) — дочитать пропущенное, иначе первым будет reset.
+    WS  /ws/stream/?token=<access>[&project=<uuid>...]            — WebSocket
+        от сервера — JSON события; от клиента — {"projects": ["<uuid>", ...]} сменить фильтр.
+
+Токен — тот же access JWT (EventSource не умеет заголовки, поэтому и ?token=; Authorization
+тоже принимается). Соединение — это корутина и очередь, без потока на клиента: тысячи
+простаивающих подключений на воркер стоят память, а не CPU.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+
+from accounts.authentication import CachedJWTAuthentication
+
+from . import events
+from .permissions import is_engineer_scoped
+
+SSE_PATH = "/api/stream/"
+WS_PATH = "/ws/stream/"
+DEFAULT_HEARTBEAT = 20
+# WebSocket: закрытие при отказе в доступе (4000–4999 — коды приложения)
+WS_UNAUTHORIZED = 4401
+
+
+def _params(scope):
+    query = parse_qs(scope.get("query_string", b"").decode())
+    headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+    token = (query.get("token") or [""])[0]
+    auth = headers.get("authorization", "")
+    if not token and auth.lower().startswith("bearer "):
+        token = auth[7:].strip()
+    last = (query.get("last_event_id") or [headers.get("last-event-id", "")])[0]
+    return {
+        "token": token,
+        "projects": query.get("project", []),
+        "last_seq": int(last) if last.isdigit() else None,
+    }
+
+
+def _authenticate(token):
+    """(user, scoped) или None. Синхронно: пользователь может прийти из БД."""
+    if not token:
+        return None
+    auth = CachedJWTAuthentication()
+    try:
+        user = auth.get_user(auth.get_validated_token(token))
+    except AuthenticationFailed:  # InvalidToken — его подкласс
+        return None
+    return user, is_engineer_scoped(user)
+
+
+async def _subscribe(params):
+    found = await sync_to_async(_authenticate)(params["token"])
+    if found is None:
+        return None
+    user, scoped = found
+    return events.broadcaster.subscribe(
+        asyncio.get_running_loop(), user.pk, scoped, params["projects"], params["last_seq"],
+    )
+
+
+async def sse(scope, receive, send):
+    params = _params(scope)
+    sub = await _subscribe(params)
+    if sub is None:
+        await send({"type": "http.response.start", "status": 401,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'{"detail": "Not authenticated."}'})
+        return
+
+    async def watch():
+        # ждём отключения клиента, а пока ждём — раз в heartbeat кладём в очередь PING;
+        # так цикл отправки ниже — просто queue.get() без таймаута на каждое событие
+        heartbeat = getattr(settings, "STREAM_HEARTBEAT", DEFAULT_HEARTBEAT)
+        pending = asyncio.ensure_future(receive())
+        try:
+            while True:
+                done, _ = await asyncio.wait({pending}, timeout=heartbeat)
+                if not done:
+                    sub.put(events.PING)
+                    continue
+                if pending.result()["type"] == "http.disconnect":
+                    sub.close()
+                    return
+                pending = asyncio.ensure_future(receive())
+        finally:
+            pending.cancel()
+
+    watcher = asyncio.create_task(watch())
+    try:
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),  # nginx: не буферизовать поток
+        ]})
+        await send({"type": "http.response.body", "body": b"retry: 3000\n\n", "more_body": True})
+        while True:
+            item = await sub.queue.get()
+            if item is events.PING:
+                await send({"type": "http.response.body", "body": b": ping\n\n", "more_body": True})
+                continue
+            if item is events.CLOSE:
+                return  # клиент ушёл — отвечать уже некому
+            if item is events.RESET or item is events.OVERFLOW:
+                await send({"type": "http.response.body", "body": f"event: {item}\ndata: {{}}\n\n".encode(),
+                            "more_body": item is events.RESET})
+                if item is events.OVERFLOW:
+                    return
+                continue
+            await send({"type": "http.response.body", "body": item.sse, "more_body": True})
+    finally:
+        events.broadcaster.unsubscribe(sub)
+        watcher.cancel()
+
+
+async def websocket(scope, receive, send):
+    if (await receive())["type"] != "websocket.connect":
+        return
+    params = _params(scope)
+    sub = await _subscribe(params)
+    if sub is None:
+        await send({"type": "websocket.close", "code": WS_UNAUTHORIZED})
+        return
+    await send({"type": "websocket.accept"})
+
+    async def read():
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                sub.close()
+                return
+            try:
+                projects = json.loads(message.get("text") or "{}").get("projects")
+            except (ValueError, AttributeError):
+                continue
+            if isinstance(projects, list):
+                sub.projects = frozenset(str(p) for p in projects)
+
+    reader = asyncio.create_task(read())
+    try:
+        while True:
+            item = await sub.queue.get()
+            if item is events.CLOSE:
+                return
+            if item is events.RESET or item is events.OVERFLOW:
+                await send({"type": "websocket.send", "text": json.dumps({"type": item})})
+                if item is events.OVERFLOW:
+                    await send({"type": "websocket.close", "code": 1013})  # try again later
+                    return
+                continue
+            await send({"type": "websocket.send", "text": item.json})
+    finally:
+        events.broadcaster.unsubscribe(sub)
+        reader.cancel()
+
+
+def router(django_app):
+    """ASGI-приложение: поток изменений по своим путям, всё остальное — Django."""
+    async def app(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == SSE_PATH:
+            return await sse(scope, receive, send)
+        if scope["type"] == "websocket" and scope["path"] == WS_PATH:
+            return await websocket(scope, receive, send)
+        if scope["type"] == "websocket":
+            await receive()
+            return await send({"type": "websocket.close", "code": 1000})
+        return await django_app(scope, receive, send)
+    return app
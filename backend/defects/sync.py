@@ -0,0 +1,251 @@
+# backend/defects/sync.py
+"""
+Дельта-синхронизация для полевых клиентов: GET /api/sync/?since=<token>.
+
+Журнал — модель Change: строка на каждое создание, правку и удаление дефекта, комментария,
+вложения или проекта; id строки — монотонный номер изменения. Клиент хранит токен последней
+синхронизации и при переподключении получает только объекты, изменённые после него
+(в текущем состоянии), и tombstones удалённых — стоимость пропорциональна изменениям,
+а не объёму данных. Страница — не больше limit строк журнала по возрастанию номера.
+
+Пишется в той же транзакции, что и данные: signals.py (save / delete — API, админка,
+каскады), массовая правка (views.bulk) и импорт (importing.py) — они без сигналов.
+Существующие данные заведены в журнал миграцией, поэтому запрос без since — полная выгрузка.
+
+Видимость — как в DefectViewSet.get_queryset: инженер получает дефекты, назначенные на него,
+и их комментарии / вложения, проекты — все. У кого дефект забрали — tombstone дефекта
+(клиент удаляет и его ленты); кому назначили — дефект вместе с его лентами целиком.
+
+Токен — "<номер>.<unix-время выдачи>". Журнал сжимается (manage.py prune_sync_log): строки
+старше SYNC_RETENTION_DAYS, у которых есть более новые, и старые tombstones удаляются.
+Токену старше этого срока ответ {"reset": true}: клиенту нужна полная выгрузка (без since).
+Номер строки выдаётся при вставке, а видна она становится при коммите. На SQLite это один
+порядок (пишущие транзакции сериализованы). На других БД (PostgreSQL) транзакция с меньшим
+номером может закоммититься позже, и токен, выданный между коммитами, её бы перепрыгнул.
+Поэтому последняя страница не продвигает токен за строки моложе SYNC_SETTLE_SECONDS
+(по умолчанию 60 с вне SQLite): их клиент получит ещё раз (объекты в текущем состоянии —
+повтор безвреден), зато не пропустит поздний коммит. Пишущие транзакции должны быть короче окна.
+"""
+import re
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from projects.models import Project
+from projects.serializers import ProjectSerializer
+
+from . import representation
+from .models import Attachment, Change, ChangeKind, Comment, Defect
+from .permissions import is_engineer_scoped
+from .serializers import AttachmentSerializer, CommentSerializer
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_SETTLE_SECONDS = 60
+TOKEN_RE = re.compile(r"^(\d+)\.(\d+)$")
+
+# ключи ответа по видам объектов
+KEYS = {
+    ChangeKind.DEFECT: "defects",
+    ChangeKind.COMMENT: "comments",
+    ChangeKind.ATTACHMENT: "attachments",
+    ChangeKind.PROJECT: "projects",
+}
+
+
+# ---------- запись ----------
+
+def _change(kind, object_id, defect_id=None, project_id=None, assignee_id=None, previous=None,
+            deleted=False):
+    return Change(kind=kind, object_id=object_id, defect_id=defect_id, project_id=project_id,
+                  assignee_id=assignee_id, previous_assignee_id=previous, deleted=deleted)
+
+
+def record_defect(defect, previous_assignee=None, deleted=False):
+    _change(ChangeKind.DEFECT, defect.pk, defect.pk, defect.project_id, defect.assignee_id,
+            previous_assignee, deleted).save()
+
+
+def record_defects(defects):
+    """Импорт: bulk_create без сигналов."""
+    Change.objects.bulk_create(
+        [_change(ChangeKind.DEFECT, d.pk, d.pk, d.project_id, d.assignee_id) for d in defects],
+        batch_size=500,
+    )
+
+
+def record_bulk(rows, changes):
+    """Массовая правка: rows — values() до update (id, project_id, assignee_id), changes — что записали."""
+    changes_assignee = "assignee" in changes
+    new_assignee = changes["assignee"].pk if changes.get("assignee") else None
+    Change.objects.bulk_create([
+        _change(ChangeKind.DEFECT, row["id"], row["id"], row["project_id"],
+                new_assignee if changes_assignee else row["assignee_id"], row["assignee_id"])
+        for row in rows
+    ], batch_size=500)
+
+
+def record_child(kind, instance, deleted=False):
+    """Комментарий / вложение: проект и исполнитель — их дефекта (при каскаде дефект ещё в БД)."""
+    project_id, assignee_id = (
+        Defect.objects.filter(pk=instance.defect_id).values_list("project_id", "assignee_id").first()
+        or (None, None)
+    )
+    _change(kind, instance.pk, instance.defect_id, project_id, assignee_id, assignee_id, deleted).save()
+
+
+def record_blob_attachments(sha256):
+    """Готовы превью blob'а — у всех его вложений поменялись thumbnail / preview."""
+    rows = (
+        Attachment.objects.filter(blob_id=sha256)
+        .values_list("id", "defect_id", "defect__project_id", "defect__assignee_id")
+    )
+    Change.objects.bulk_create([
+        _change(ChangeKind.ATTACHMENT, pk, defect_id, project_id, assignee_id, assignee_id)
+        for pk, defect_id, project_id, assignee_id in rows
+    ])
+
+
+def record_project(project, deleted=False):
+    _change(ChangeKind.PROJECT, project.pk, project_id=project.pk, deleted=deleted).save()
+
+
+def retention():
+    return timedelta(days=getattr(settings, "SYNC_RETENTION_DAYS", DEFAULT_RETENTION_DAYS))
+
+
+def prune(now=None):
+    """
+    Сжать журнал: удалить строки старше срока хранения, у которых есть более новая строка
+    того же объекта, затем старые tombstones. Возвращает число удалённых строк.
+    """
+    old = Change.objects.filter(changed_at__lt=(now or timezone.now()) - retention())
+    newer = Change.objects.filter(object_id=OuterRef("object_id"), kind=OuterRef("kind"), id__gt=OuterRef("id"))
+    superseded, _ = old.filter(Exists(newer)).delete()
+    tombstones, _ = old.filter(deleted=True).delete()
+    return superseded + tombstones
+
+
+def settle_seconds():
+    value = getattr(settings, "SYNC_SETTLE_SECONDS", None)
+    if value is None:
+        return 0 if connection.vendor == "sqlite" else DEFAULT_SETTLE_SECONDS
+    return value
+
+
+def settled_seq(now=None):
+    """
+    Номер, до которого журнал заведомо закоммичен: последняя строка старше окна
+    (по индексу changed_at). Всё с меньшими номерами выдано раньше и уже видно.
+    """
+    cutoff = (now or timezone.now()) - timedelta(seconds=settle_seconds())
+    return (
+        Change.objects.filter(changed_at__lte=cutoff).order_by("-changed_at", "-id")
+        .values_list("id", flat=True).first()
+    ) or 0
+
+
+# ---------- чтение ----------
+
+def parse_token(value):
+    """'' -> (0, None) — полная выгрузка; '<номер>.<время выдачи>' -> (номер, время)."""
+    if not value:
+        return 0, None
+    match = TOKEN_RE.match(value)
+    if not match:
+        raise ValidationError({"since": ["Неверный токен синхронизации."]})
+    return int(match[1]), int(match[2])
+
+
+def make_token(seq, issued):
+    return f"{seq}.{issued}"
+
+
+def page(request, since="", limit=DEFAULT_PAGE_SIZE):
+    """
+    {"next": токен, "has_more": bool, "defects": [...], "comments": [...], "attachments": [...],
+     "projects": [...], "deleted": {"defects": [id, ...], ...}} или {"reset": true}.
+    Объекты — в формате их API (DefectSerializer и т.д.), в текущем состоянии.
+    """
+    seq, issued = parse_token(since)
+    now = int(time.time())
+    if issued is not None and issued < now - retention().total_seconds():
+        return {"reset": True}
+
+    user = request.user
+    scoped = is_engineer_scoped(user)
+    changes = Change.objects.filter(id__gt=seq).order_by("id")
+    if scoped:
+        changes = changes.filter(
+            Q(kind=ChangeKind.PROJECT) | Q(assignee_id=user.pk) | Q(previous_assignee_id=user.pk)
+        )
+    rows = list(changes.values("id", "kind", "object_id", "assignee_id", "previous_assignee_id", "deleted")
+                [:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # последняя строка по объекту решает: жив (отдать текущее состояние) или удалён
+    latest = {}
+    handed_over = set()  # дефекты, назначенные на инженера в этой пачке — отдать и их ленты
+    for row in rows:
+        latest[(row["kind"], row["object_id"])] = row
+        if (scoped and row["kind"] == ChangeKind.DEFECT and not row["deleted"]
+                and row["assignee_id"] == user.pk and row["previous_assignee_id"] != user.pk):
+            handed_over.add(row["object_id"])
+    live = {kind: set() for kind in KEYS}
+    deleted = {kind: set() for kind in KEYS}
+    for (kind, pk), row in latest.items():
+        (deleted if row["deleted"] else live)[kind].add(pk)
+
+    data = _objects(request, live, handed_over, scoped)
+    # не нашли (удалён позже, чем эта пачка, или уже не виден) — тоже tombstone
+    for kind, found in data.items():
+        ids = {item["id"] for item in found}
+        deleted[kind] |= {pk for pk in live[kind] if str(pk) not in ids}
+
+    last = rows[-1]["id"] if rows else seq
+    if not has_more and settle_seconds():
+        # свежие строки отдали, но токен оставляем до них: вдруг ниже ещё не закоммичено
+        last = min(last, settled_seq())
+    return {
+        # пока страницы не кончились — время первого токена: журнал после него ещё не прочитан
+        "next": make_token(last, (issued or now) if has_more else now),
+        "has_more": has_more,
+        **{KEYS[kind]: items for kind, items in data.items()},
+        "deleted": {KEYS[kind]: sorted(str(pk) for pk in pks) for kind, pks in deleted.items()},
+    }
+
+
+def _objects(request, live, handed_over, scoped):
+    """Текущее состояние живых объектов (с видимостью пользователя), id — строкой."""
+    user = request.user
+    context = {"request": request}
+    defects = Defect.objects.filter(pk__in=live[ChangeKind.DEFECT]).order_by()
+    comments = Comment.objects.filter(Q(pk__in=live[ChangeKind.COMMENT]) | Q(defect_id__in=handed_over))
+    attachments = (
+        Attachment.objects.select_related("blob")
+        .filter(Q(pk__in=live[ChangeKind.ATTACHMENT]) | Q(defect_id__in=handed_over))
+    )
+    if scoped:
+        defects = defects.filter(assignee=user)
+        comments = comments.filter(defect__assignee=user)
+        attachments = attachments.filter(defect__assignee=user)
+    projects = Project.objects.filter(pk__in=live[ChangeKind.PROJECT]).order_by()
+
+    # видов, которых нет в пачке, в БД не запрашиваем
+    return {
+        ChangeKind.DEFECT: representation.to_dicts(representation.values(defects))
+        if live[ChangeKind.DEFECT] else [],
+        ChangeKind.COMMENT: CommentSerializer(comments.order_by(), many=True, context=context).data
+        if live[ChangeKind.COMMENT] or handed_over else [],
+        ChangeKind.ATTACHMENT: AttachmentSerializer(attachments.order_by(), many=True, context=context).data
+        if live[ChangeKind.ATTACHMENT] or handed_over else [],
+        ChangeKind.PROJECT: ProjectSerializer(projects, many=True, context=context).data
+        if live[ChangeKind.PROJECT] else [],
+    }
@@ -0,0 +1,132 @@
+# backend/defects/uploads.py
+"""
+Возобновляемая загрузка вложений по частям (UploadSession).
+
+Протокол (см. UploadSessionViewSet):
+  1. POST   /api/attachment-uploads/                    {defect, filename, size_bytes[, chunk_size]}
+  2. PUT    /api/attachment-uploads/<id>/chunks/<n>/     тело — байты части n (application/octet-stream)
+  3. POST   /api/attachment-uploads/<id>/finalize/       [{"crc32": "<hex>"}] -> Attachment
+  GET /api/attachment-uploads/<id>/ — сколько уже принято (для продолжения после обрыва),
+  DELETE — отменить загрузку.
+
+Части принимаются строго по порядку и пишутся прямо во временный файл в MEDIA_ROOT
+кусками по READ_BLOCK, без буферизации всего файла. Перед записью файл обрезается
+до received_bytes — остаток оборванной части отбрасывается, её можно просто отправить заново.
+Контрольная сумма — CRC32 нарастающим итогом: его состояние — одно число, и оно хранится
+в сессии между запросами. Повторная отправка уже принятой части ничего не меняет.
+"""
+import os
+import zlib
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from . import blobs
+from .models import Attachment, UploadSession
+
+UPLOAD_DIR = "uploads"
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+MAX_FILE_SIZE = 4 * 1024 * 1024 * 1024
+READ_BLOCK = 64 * 1024
+
+
+class UploadError(ValueError):
+    """Часть или финализация не принята; status — HTTP-код ответа."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def part_path(session):
+    return default_storage.path(f"{UPLOAD_DIR}/{session.pk}.part")
+
+
+def chunk_count(session):
+    return max(1, -(-session.size_bytes // session.chunk_size))
+
+
+def expected_chunk_length(session, index):
+    if index == chunk_count(session) - 1:
+        return session.size_bytes - index * session.chunk_size
+    return session.chunk_size
+
+
+def start(session):
+    """Создать пустой временный файл для новой сессии."""
+    path = part_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+
+
+def write_chunk(session_id, index, stream):
+    """
+    Принять часть index из потока stream (read(n)). Возвращает обновлённую сессию.
+    Сессия блокируется на время записи — параллельные PUT одной загрузки идут по очереди.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id)
+        if index < session.next_chunk:
+            return session  # часть уже принята (повтор после обрыва ответа)
+        if index != session.next_chunk or index >= chunk_count(session):
+            raise UploadError(f"Ожидается часть {session.next_chunk}.", status=409)
+
+        expected = expected_chunk_length(session, index)
+        crc, written = session.crc32, 0
+        with open(part_path(session), "r+b") as f:
+            f.truncate(session.received_bytes)
+            f.seek(session.received_bytes)
+            while True:
+                block = stream.read(READ_BLOCK)
+                if not block:
+                    break
+                written += len(block)
+                if written > expected:
+                    break
+                f.write(block)
+                crc = zlib.crc32(block, crc)
+        if written != expected:
+            raise UploadError(f"Размер части {index} должен быть {expected} байт.")
+
+        session.received_bytes += written
+        session.next_chunk += 1
+        session.crc32 = crc
+        session.save(update_fields=["received_bytes", "next_chunk", "crc32", "updated_at"])
+        return session
+
+
+def finalize(session_id, crc32=None):
+    """
+    Завершить загрузку: проверить размер (и CRC32, если передан), отдать файл в хранилище
+    по содержимому (blobs.py) и создать Attachment в одной транзакции с удалением сессии.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id)
+        if session.received_bytes != session.size_bytes:
+            raise UploadError(
+                f"Принято {session.received_bytes} из {session.size_bytes} байт.", status=409,
+            )
+        if crc32 is not None and crc32 != session.crc32:
+            raise UploadError("Контрольная сумма не совпадает.")
+
+        blob, _ = blobs.store_path(part_path(session), session.filename)
+        attachment = Attachment.objects.create(
+            defect_id=session.defect_id,
+            file=blob.file.name,
+            blob=blob,
+            filename=session.filename,
+            size_bytes=session.size_bytes,
+        )
+        session.delete()
+    return attachment
+
+
+def discard(session):
+    """Отменить загрузку: удалить временный файл и сессию."""
+    try:
+        os.remove(part_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
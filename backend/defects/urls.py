@@ -1,14 +1,34 @@
 # backend/defects/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DefectViewSet, CommentViewSet, AttachmentViewSet, ReportsSummaryView
+from .views import (
+    DefectViewSet,
+    CommentViewSet,
+    AttachmentViewSet,
+    DefectCommentViewSet,
+    DefectAttachmentViewSet,
+    UploadSessionViewSet,
+    SyncView,
+    ReportsSummaryView,
+    ReportsTimeseriesView,
+    ReportsCycleTimeView,
+    ReportsTimeInStatusView,
+)
 
 router = DefaultRouter()
 router.register(r"defects", DefectViewSet, basename="defect")
+router.register(r"defects/(?P<defect_pk>[^/.]+)/comments", DefectCommentViewSet, basename="defect-comment")
+router.register(r"defects/(?P<defect_pk>[^/.]+)/attachments", DefectAttachmentViewSet,
+                basename="defect-attachment")
 router.register(r"comments", CommentViewSet, basename="comment")
 router.register(r"attachments", AttachmentViewSet, basename="attachment")
+router.register(r"attachment-uploads", UploadSessionViewSet, basename="attachment-upload")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("sync/", SyncView.as_view(), name="sync"),
     path("reports/summary/", ReportsSummaryView.as_view(), name="reports-summary"),
+    path("reports/timeseries/", ReportsTimeseriesView.as_view(), name="reports-timeseries"),
+    path("reports/cycle-time/", ReportsCycleTimeView.as_view(), name="reports-cycle-time"),
+    path("reports/time-in-status/", ReportsTimeInStatusView.as_view(), name="reports-time-in-status"),
 ]
@@ -1,30 +1,74 @@
 # backend/defects/views.py
-from datetime import datetime
+import io
 import logging
 
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import F, Prefetch, Value
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from accounts.models import User, Roles  # роли и User
-
-from .models import Defect, Comment, Attachment, Status
-from .serializers import DefectSerializer, CommentSerializer, AttachmentSerializer
-from .permissions import DefectPermission
+from core.conditional import ConditionalGetMixin
+
+from . import blobs, downloads, events, history, reports, representation, rollups, sync, uploads
+from .export import CSVStreamRenderer, NDJSONStreamRenderer, stream_csv, stream_ndjson
+from .importing import DefectImporter, ImportFormatError, read_rows
+from .models import (
+    Defect, Comment, Attachment, UploadSession, Status, CLOSED_STATUSES, PRIORITY_RANK, URGENCY_ORDERING,
+    open_literal,
+)
+from .serializers import (
+    DefectSerializer,
+    DefectBulkUpdateSerializer,
+    CommentSerializer,
+    DefectCommentSerializer,
+    DefectTransitionSerializer,
+    AttachmentSerializer,
+    UploadSessionSerializer,
+)
+from .filters import DefectOrderingFilter, DefectSearchFilter
+from .pagination import DefectPagination, ThreadPagination, AttachmentThreadPagination
+from .permissions import DefectPermission, is_engineer_scoped
 
 logger = logging.getLogger(__name__)
 
+# Размер пачки id в одном UPDATE ... WHERE id IN (...)
+BULK_UPDATE_CHUNK = 500
+
+# /defects/queue/: сколько дефектов по умолчанию и не больше скольких
+QUEUE_DEFAULT_LIMIT = 20
+QUEUE_MAX_LIMIT = 100
+
+# ?embed= в карточке дефекта: последние записи ленты, порядок — как в ThreadPagination
+EMBED_QUERYSETS = {
+    "comments": lambda: Comment.objects.order_by("-created_at", "-id"),
+    "attachments": lambda: Attachment.objects.select_related("blob").order_by("-uploaded_at", "-id"),
+}
+
 
-class DefectViewSet(viewsets.ModelViewSet):
+class DefectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
-    CRUD по дефектам + /defects/resolved/ + /defects/<id>/assign/
+    CRUD по дефектам + /defects/resolved/ + /defects/queue/ + /defects/<id>/assign/
+    + /defects/bulk/ + /defects/export/ + /defects/import/
 
     Инженер видит только дефекты, назначенные на него.
     Менеджер/Лид/Админ видят все.
+    list / retrieve отдают ETag и отвечают 304 на If-None-Match (core/conditional.py).
+    list / resolved читают values()-строки без моделей (defects/representation.py),
+    JSON тот же, что у DefectSerializer.
+    GET list / resolved / retrieve: ?fields=id,title,... — только эти поля (лишние колонки
+    не читаются), ?expand=assignee,project,created_by — связи объектами.
+    GET retrieve: ?embed=comments,attachments — последние записи лент (Prefetch со срезом).
     """
     queryset = (
         Defect.objects
@@ -32,9 +76,79 @@ class DefectViewSet(viewsets.ModelViewSet):
     )
     serializer_class = DefectSerializer
     permission_classes = [IsAuthenticated, DefectPermission]
+    pagination_class = DefectPagination  # ?pagination=cursor — keyset-режим
+    filter_backends = [DjangoFilterBackend, DefectSearchFilter, DefectOrderingFilter]
     filterset_fields = ["project", "priority", "status", "assignee"]
-    search_fields = ["title", "description"]
-    ordering_fields = ["created_at", "priority", "due_date"]
+    search_fields = ["title", "description"]  # ?search= — полнотекстовый индекс (filters.py)
+    # priority — по рангу, urgency — по срочности (DefectOrderingFilter)
+    ordering_fields = ["created_at", "priority", "due_date", "urgency"]
+
+    conditional_list_from_page = True
+
+    def get_page_validators(self, rows):
+        """
+        ETag списка — по выбранной странице, без запроса по всему набору (в режиме курсора
+        COUNT не считается и здесь): (id, updated_at) её строк ловят правки (массовые — тоже,
+        bulk ставит updated_at), count и ссылки next/previous — вставки и удаления вокруг неё.
+        Только из данных, без состояния процесса: ответ любого воркера совпадает. С ?expand=
+        добавляется поколение данных (reports.generation) — имя проекта / пользователя
+        меняется без updated_at дефекта.
+        """
+        last = max((row["updated_at"] for row in rows), default=None)
+        parts = [(row["id"], row["updated_at"]) for row in rows]
+        parts += self.paginator.page_state()
+        if self.get_fieldset()[1]:
+            parts.append(reports.generation())
+        return last, parts
+
+    def get_object_validators(self, instance):
+        last, parts = super().get_object_validators(instance)
+        if self.get_fieldset()[1]:
+            # имя проекта / пользователя меняется без updated_at дефекта — ловим поколением
+            parts.append(reports.generation())
+        # новые комментарии / вложения не трогают updated_at — в ETag то, что уже встроено
+        for name in self.get_embed():
+            parts += [
+                (row.pk, getattr(row.blob, "variants_status", None) if name == "attachments" else None)
+                for row in getattr(instance, f"latest_{name}")
+            ]
+        return last, parts
+
+    def get_embed(self):
+        if not hasattr(self, "_embed"):
+            retrieve = self.action == "retrieve" and self.request.method in ("GET", "HEAD")
+            self._embed = representation.parse_embed(self.request.query_params) if retrieve else ()
+        return self._embed
+
+    def get_fieldset(self):
+        """(fields, expand) из ?fields= / ?expand= для GET; на запись — полный ответ."""
+        if not hasattr(self, "_fieldset"):
+            if self.request.method in ("GET", "HEAD"):
+                self._fieldset = representation.parse_params(self.request.query_params)
+            else:
+                self._fieldset = (representation.DEFECT_FIELDS, ())
+        return self._fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fields, expand = self.get_fieldset()
+        if fields != representation.DEFECT_FIELDS:
+            context["fields"] = fields
+        if expand:
+            context["expand"] = expand
+        if self.get_embed():
+            context["embed"] = self.get_embed()
+        return context
+
+    def get_list_rows(self, queryset):
+        fields, expand = self.get_fieldset()
+        # id и поля сортировки курсора нужны для ссылок next/previous, updated_at — для ETag,
+        # даже если их нет в ?fields=
+        extra = (*self.paginator.cursor_columns(), "updated_at")
+        return representation.values(queryset, fields, expand, extra=extra)
+
+    def get_list_data(self, rows):
+        return representation.to_dicts(rows, *self.get_fieldset())
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -42,21 +156,181 @@ class DefectViewSet(viewsets.ModelViewSet):
         if not user or not user.is_authenticated:
             return qs.none()
 
+        if self.action == "retrieve" and self.request.method in ("GET", "HEAD"):
+            qs = representation.restrict(qs, *self.get_fieldset())
+            qs = qs.prefetch_related(*[
+                Prefetch(name, queryset=EMBED_QUERYSETS[name]()[:representation.EMBED_LIMIT],
+                         to_attr=f"latest_{name}")
+                for name in self.get_embed()
+            ])
+
         # Инженеру — только свои дефекты
-        if getattr(user, "role", None) == Roles.ENGINEER and not user.is_staff and not user.is_superuser:
+        if is_engineer_scoped(user):
             return qs.filter(assignee=user)
         return qs
 
+    def perform_update(self, serializer):
+        serializer.instance._changed_by = self.request.user  # для истории (history.py)
+        serializer.save()
+
     @action(detail=False, methods=["get"])
     def resolved(self, request):
         qs = self.filter_queryset(self.get_queryset().filter(status=Status.RESOLVED))
-        page = self.paginate_queryset(qs)
-        ser = self.get_serializer(page or qs, many=True)
-        return (
-            self.get_paginated_response(ser.data)
-            if page is not None
-            else Response(ser.data)
+        return self.list_response(qs)
+
+    @action(detail=False, methods=["get"])
+    def queue(self, request):
+        """
+        GET /api/defects/queue/[?limit=20] — «моя очередь»: открытые дефекты, назначенные
+        на текущего пользователя, самые срочные первыми (models.URGENCY_ORDERING),
+        не больше QUEUE_MAX_LIMIT. ?fields= / ?expand= — как в списке.
+
+        Сначала top-N id — только из индекса defect_queue_idx, без чтения таблицы;
+        затем строки этих N дефектов по первичному ключу.
+        """
+        try:
+            limit = int(request.query_params.get("limit") or QUEUE_DEFAULT_LIMIT)
+        except ValueError:
+            raise ValidationError({"limit": ["Ожидается целое число."]})
+        limit = min(max(limit, 1), QUEUE_MAX_LIMIT)
+        ids = list(
+            Defect.objects.filter(open_literal(), assignee=request.user)
+            .order_by(*URGENCY_ORDERING).values_list("id", flat=True)[:limit]
         )
+        fields, expand = self.get_fieldset()
+        rows = representation.values(Defect.objects.filter(pk__in=ids).order_by(), fields, expand)
+        by_id = {row["id"]: row for row in rows}
+        return Response(self.get_list_data([by_id[pk] for pk in ids if pk in by_id]))
+
+    @action(detail=False, methods=["get"], url_path="export",
+            renderer_classes=[CSVStreamRenderer, NDJSONStreamRenderer])
+    def export(self, request):
+        """
+        GET /api/defects/export/?format=csv|ndjson  (+ все фильтры, search и ordering списка)
+
+        Отдаётся потоком (StreamingHttpResponse), без пагинации; память не зависит от объёма.
+        """
+        qs = self.filter_queryset(self.get_queryset())
+        fmt = request.accepted_renderer.format
+        stream = stream_csv(qs) if fmt == "csv" else stream_ndjson(qs)
+        response = StreamingHttpResponse(stream, content_type=f"{request.accepted_renderer.media_type}; charset=utf-8")
+        filename = f"defects-{timezone.localdate():%Y%m%d}.{fmt}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=["post"], url_path="import",
+            parser_classes=[MultiPartParser, FormParser])
+    def import_file(self, request):
+        """
+        POST /api/defects/import/  (multipart: file=<.csv|.xlsx>, dry_run=1 — только проверка)
+
+        Доступ: менеджер / руководитель (lead) / админ.
+        Файл разбирается пачками (см. importing.py); строки с ошибками пропускаются.
+        Ответ: {"rows": N, "created": M, "error_count": K, "errors": [{"row": 5, "errors": {...}}], "dry_run": false}
+        """
+        role = getattr(request.user, "role", None)
+        if role not in {Roles.MANAGER, Roles.LEAD, Roles.ADMIN}:
+            return Response({"detail": "Недостаточно прав."}, status=status.HTTP_403_FORBIDDEN)
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"file": ["Файл не передан."]}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get("dry_run", "")).lower() in {"1", "true"}
+
+        importer = DefectImporter(request.user, dry_run=dry_run)
+        try:
+            result = importer.run(read_rows(upload, upload.name))
+        except (ImportFormatError, UnicodeDecodeError) as exc:
+            return Response({"file": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info("User %s imported %d/%d defects from %s (dry_run=%s)",
+                    request.user.id, result["created"], result["rows"], upload.name, dry_run)
+        return Response(result)
+
+    @action(detail=False, methods=["patch"], url_path="bulk")
+    def bulk(self, request):
+        """
+        PATCH /api/defects/bulk/
+        Тело: {"ids": [...]} или {"filter": {...}} + {"changes": {...}}
+        (см. DefectBulkUpdateSerializer).
+
+        Всё валидируется заранее, затем изменения применяются set-based UPDATE'ами
+        в одной транзакции. Видимость — как в get_queryset (инженер меняет только свои).
+        Ответ: {"updated": N, "results": [{"id": "...", "result": "updated|not_found"}, ...]}
+        """
+        ser = DefectBulkUpdateSerializer(data=request.data, context={"request": request})
+        ser.is_valid(raise_exception=True)
+        changes = dict(ser.validated_data["changes"])
+
+        # переназначать может только менеджер / руководитель / админ — как в assign
+        role = getattr(request.user, "role", None)
+        if "assignee" in changes and role not in {Roles.MANAGER, Roles.LEAD, Roles.ADMIN}:
+            return Response({"detail": "Недостаточно прав."}, status=status.HTTP_403_FORBIDDEN)
+
+        qs = self.get_queryset()
+        requested = None
+        if "ids" in ser.validated_data:
+            requested = list(dict.fromkeys(ser.validated_data["ids"]))
+            qs = qs.filter(id__in=requested)
+        else:
+            qs = self._filter_for_bulk(qs, ser.validated_data["filter"])
+
+        changes["updated_at"] = timezone.now()
+        if "priority" in changes:
+            changes["priority_rank"] = PRIORITY_RANK[changes["priority"]]
+        if "status" in changes:
+            # closed_at: ставим при закрытии (если ещё не стоял), сбрасываем при переоткрытии
+            closed = changes["status"] in CLOSED_STATUSES
+            changes["closed_at"] = Coalesce(F("closed_at"), Value(changes["updated_at"])) if closed else None
+        with transaction.atomic():
+            rows = list(
+                qs.select_for_update().order_by()
+                  .values("id", "project_id", "created_at", "status", "priority", "assignee_id")
+            )
+            matched = [row["id"] for row in rows]
+            for i in range(0, len(matched), BULK_UPDATE_CHUNK):
+                Defect.objects.filter(id__in=matched[i:i + BULK_UPDATE_CHUNK]).update(**changes)
+            # update() не шлёт post_save — rollup, историю, журнал синхронизации,
+            # кеш отчётов и поток изменений обновляем сами
+            rollups.bulk_change(rows, changes)
+            history.record_bulk(rows, changes, request.user.pk)
+            sync.record_bulk(rows, changes)
+            transaction.on_commit(reports.invalidate)
+            events.publish_on_commit(lambda: [events.defect_row_event("updated", row, changes) for row in rows])
+
+        logger.info("User %s bulk-updated %d defects: %s",
+                    request.user.id, len(matched), sorted(ser.validated_data["changes"]))
+
+        if requested is None:
+            results = [{"id": str(pk), "result": "updated"} for pk in matched]
+        else:
+            found = set(matched)
+            results = [
+                {"id": str(pk), "result": "updated" if pk in found else "not_found"}
+                for pk in requested
+            ]
+        return Response({"updated": len(matched), "results": results})
+
+    def _filter_for_bulk(self, qs, params):
+        """Фильтр для bulk — те же поля, что и filterset_fields у списка."""
+        unknown = set(params) - set(self.filterset_fields)
+        if unknown:
+            raise ValidationError({"filter": [f"Недопустимые поля: {', '.join(sorted(unknown))}"]})
+        filterset_class = DjangoFilterBackend().get_filterset_class(self, qs)
+        filterset = filterset_class(data=params, queryset=qs, request=self.request)
+        if not filterset.is_valid():
+            raise ValidationError({"filter": filterset.errors})
+        return filterset.qs
+
+    @action(detail=True, methods=["get"])
+    def history(self, request, pk=None):
+        """
+        GET /api/defects/<id>/history/ — смены статуса, приоритета и исполнителя (history.py),
+        от создания по порядку. Видимость — как у карточки дефекта.
+        """
+        defect = self.get_object()
+        rows = defect.transitions.order_by("changed_at", "id")
+        return Response(DefectTransitionSerializer(rows, many=True).data)
 
     @action(detail=True, methods=["patch"], url_path="assign")
     def assign(self, request, pk=None):
@@ -67,6 +341,7 @@ class DefectViewSet(viewsets.ModelViewSet):
         Доступ: менеджер / руководитель (lead) / админ.
         """
         defect = self.get_object()
+        defect._changed_by = request.user  # для истории (history.py)
 
         role = getattr(request.user, "role", None)
         if role not in {Roles.MANAGER, Roles.LEAD, Roles.ADMIN}:
@@ -77,7 +352,7 @@ class DefectViewSet(viewsets.ModelViewSet):
         if not assignee_id:
             prev = defect.assignee_id
             defect.assignee = None
-            defect.save(update_fields=["assignee"])
+            defect.save(update_fields=["assignee", "updated_at"])
             logger.info("User %s unassigned engineer from defect %s (prev=%s)",
                         request.user.id, defect.id, prev)
             return Response(DefectSerializer(defect, context={"request": request}).data)
@@ -88,7 +363,7 @@ class DefectViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Инженер не найден."}, status=status.HTTP_400_BAD_REQUEST)
 
         defect.assignee = engineer
-        defect.save(update_fields=["assignee"])
+        defect.save(update_fields=["assignee", "updated_at"])
 
         logger.info("User %s assigned engineer %s to defect %s",
                     request.user.id, engineer.id, defect.id)
@@ -110,37 +385,202 @@ class CommentViewSet(mixins.CreateModelMixin,
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if is_engineer_scoped(self.request.user):
+            return qs.filter(defect__assignee=self.request.user)
+        return qs
+
     def perform_create(self, serializer):
         # автором делаем текущего пользователя
         serializer.save(author=self.request.user)
 
 
+class DefectThreadMixin:
+    """
+    Вложенные ленты /defects/<defect_pk>/comments|attachments/: только записи одного дефекта,
+    дефект — с той же видимостью, что в DefectViewSet (чужой или несуществующий — 404).
+    """
+    def get_defect(self):
+        if not hasattr(self, "_defect"):
+            defects = Defect.objects.only("id")
+            if is_engineer_scoped(self.request.user):
+                defects = defects.filter(assignee=self.request.user)
+            self._defect = get_object_or_404(defects, pk=self.kwargs["defect_pk"])
+        return self._defect
+
+    def get_queryset(self):
+        return super().get_queryset().filter(defect=self.get_defect())
+
+
+class DefectCommentViewSet(DefectThreadMixin,
+                           mixins.CreateModelMixin,
+                           mixins.ListModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    GET / POST /api/defects/<id>/comments/ — лента комментариев дефекта.
+    Курсор (ThreadPagination), новые сверху; ?ordering=created_at — в хронологическом порядке.
+    """
+    queryset = Comment.objects.all()
+    serializer_class = DefectCommentSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ThreadPagination
+
+    def perform_create(self, serializer):
+        serializer.save(defect=self.get_defect(), author=self.request.user)
+
+
+class DefectAttachmentViewSet(DefectThreadMixin,
+                              mixins.ListModelMixin,
+                              viewsets.GenericViewSet):
+    """
+    GET /api/defects/<id>/attachments/ — вложения дефекта, курсор по uploaded_at, новые сверху.
+    Загрузка — через /attachments/ и /attachment-uploads/.
+    """
+    queryset = Attachment.objects.select_related("blob")
+    serializer_class = AttachmentSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = AttachmentThreadPagination
+
+
 class AttachmentViewSet(mixins.CreateModelMixin,
                         mixins.DestroyModelMixin,
                         mixins.ListModelMixin,
                         viewsets.GenericViewSet):
     """
-    Файлы/фото к дефектам
+    Файлы/фото к дефектам + /attachments/<id>/download/.
+    Инженер видит только вложения своих дефектов — как в DefectViewSet.
+    Удаление вложения освобождает ссылку на blob; файл удаляется вместе с последней (signals.py).
     """
     queryset = (
         Attachment.objects
-        .select_related("defect")
+        .select_related("defect", "blob")
         .order_by("-uploaded_at")
     )
     serializer_class = AttachmentSerializer
     parser_classes = [MultiPartParser, FormParser]
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if is_engineer_scoped(self.request.user):
+            return qs.filter(defect__assignee=self.request.user)
+        return qs
+
+    @action(detail=True, methods=["get"], content_negotiation_class=downloads.IgnoreAcceptNegotiation)
+    def download(self, request, pk=None):
+        """
+        GET /api/attachments/<id>/download/[?inline=1]
+
+        Range (206), ETag / If-None-Match (304), X-Accel-Redirect / X-Sendfile — см. downloads.py.
+        """
+        attachment = self.get_object()
+        try:
+            return downloads.serve(request, attachment,
+                                   as_attachment=request.query_params.get("inline") not in {"1", "true"})
+        except (FileNotFoundError, ValueError):
+            raise NotFound("Файл вложения не найден.")
+
     def perform_create(self, serializer):
+        # содержимое — в хранилище по SHA-256 (blobs.py): одинаковые файлы хранятся один раз;
         # uploaded_at ставится автоматически в модели
-        serializer.save()
+        upload = serializer.validated_data.pop("file")
+        with transaction.atomic():
+            blob, _ = blobs.store_upload(upload)
+            serializer.save(
+                file=blob.file.name,
+                blob=blob,
+                filename=serializer.validated_data.get("filename") or upload.name,
+                size_bytes=blob.size_bytes,
+            )
+
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    Возобновляемая загрузка вложений по частям (протокол — в uploads.py):
+    POST /attachment-uploads/, PUT /attachment-uploads/<id>/chunks/<n>/,
+    POST /attachment-uploads/<id>/finalize/, GET — состояние, DELETE — отмена.
+
+    Сессии видит только тот, кто их создал; инженер — пока дефект назначен на него
+    (забрали дефект — дописать и завершить загрузку уже нельзя).
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        qs = UploadSession.objects.filter(created_by=self.request.user)
+        if is_engineer_scoped(self.request.user):
+            qs = qs.filter(defect__assignee=self.request.user)
+        return qs
+
+    def perform_create(self, serializer):
+        session = serializer.save(created_by=self.request.user)
+        uploads.start(session)
+
+    def perform_destroy(self, instance):
+        uploads.discard(instance)
+
+    @action(detail=True, methods=["put"], url_path=r"chunks/(?P<index>\d+)")
+    def chunk(self, request, pk=None, index=None):
+        """Тело запроса — сырые байты части (request.data не трогаем: поток пишется сразу в файл)."""
+        session = self.get_object()
+        try:
+            session = uploads.write_chunk(session.pk, int(index), request.stream or io.BytesIO())
+        except uploads.UploadError as exc:
+            return Response({"detail": str(exc)}, status=exc.status)
+        return Response(self.get_serializer(session).data)
+
+    @action(detail=True, methods=["post"])
+    def finalize(self, request, pk=None):
+        session = self.get_object()
+        crc32 = request.data.get("crc32")
+        try:
+            crc32 = int(crc32, 16) if crc32 else None
+        except (TypeError, ValueError):
+            return Response({"crc32": ["Ожидается hex-строка."]}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            attachment = uploads.finalize(session.pk, crc32)
+        except uploads.UploadError as exc:
+            return Response({"detail": str(exc)}, status=exc.status)
+        logger.info("User %s uploaded attachment %s (%d bytes) to defect %s",
+                    request.user.id, attachment.id, attachment.size_bytes, attachment.defect_id)
+        return Response(AttachmentSerializer(attachment, context={"request": request}).data,
+                        status=status.HTTP_201_CREATED)
+
+# ----------------------  СИНХРОНИЗАЦИЯ  ----------------------
+
+class SyncView(APIView):
+    """
+    GET /api/sync/[?since=<token>][&limit=500]
+
+    Что изменилось после токена (defects/sync.py): дефекты, комментарии, вложения и проекты
+    в текущем состоянии + tombstones удалённых. Без since — полная выгрузка.
+    Ответ: {"next": "<token>", "has_more": false, "defects": [...], "comments": [...],
+            "attachments": [...], "projects": [...], "deleted": {"defects": ["<id>"], ...}}
+    has_more — повторить с next сразу; {"reset": true} — токен устарел, выгрузить всё заново.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit") or sync.DEFAULT_PAGE_SIZE)
+        except ValueError:
+            raise ValidationError({"limit": ["Ожидается целое число."]})
+        limit = min(max(limit, 1), sync.MAX_PAGE_SIZE)
+        return Response(sync.page(request, request.query_params.get("since", ""), limit))
 
 
 # ----------------------  ОТЧЁТЫ  ----------------------
 
 class ReportsSummaryView(APIView):
     """
-    GET /api/reports/summary/?project=<id>&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+    GET /api/reports/summary/?project=<id>&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD[&source=live]
+
+    По умолчанию считается по rollup-таблице (DefectRollup), ?source=live — по самим дефектам.
 
     Ответ:
     {
@@ -153,46 +593,113 @@ class ReportsSummaryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        qs = Defect.objects.all()
-
-        project_id = request.query_params.get("project")
-        if project_id:
-            qs = qs.filter(project_id=project_id)
-
-        def parse_date(s):
-            try:
-                return datetime.strptime(s, "%Y-%m-%d").date()
-            except Exception:
-                return None
-
-        date_from = parse_date(request.query_params.get("date_from", ""))
-        date_to = parse_date(request.query_params.get("date_to", ""))
-
-        if date_from:
-            qs = qs.filter(created_at__date__gte=date_from)
-        if date_to:
-            qs = qs.filter(created_at__date__lte=date_to)
-
-        total = qs.count()
-        by_status = list(qs.values("status").annotate(count=Count("id")).order_by("status"))
-        by_priority = list(qs.values("priority").annotate(count=Count("id")).order_by("priority"))
-        by_project_raw = list(
-            qs.values("project__id", "project__name")
-              .annotate(count=Count("id"))
-              .order_by("project__name")
+        data = reports.summary(
+            project_id=request.query_params.get("project") or None,
+            date_from=reports.parse_date(request.query_params.get("date_from", "")),
+            date_to=reports.parse_date(request.query_params.get("date_to", "")),
+            source=request.query_params.get("source") or reports.SOURCE_ROLLUP,
+        )
+        return Response(data)
+
+
+class ReportsTimeseriesView(APIView):
+    """
+    GET /api/reports/timeseries/?project=<id>&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD&bucket=day|week|month
+
+    Ответ:
+    {
+      "bucket": "week", "date_from": "2025-09-01", "date_to": "2025-09-30",
+      "series": [{"period":"2025-09-01","created":4,"resolved":1,"closed":2,"backlog":17}, ...]
+    }
+    Ряд плотный: периоды без событий тоже присутствуют (с нулями).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        bucket = request.query_params.get("bucket") or "day"
+        if bucket not in reports.BUCKETS:
+            return Response({"bucket": [f"Допустимо: {', '.join(reports.BUCKETS)}"]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        date_to = reports.parse_date(request.query_params.get("date_to", "")) or timezone.localdate()
+        date_from = (
+            reports.parse_date(request.query_params.get("date_from", ""))
+            or reports.default_date_from(date_to, bucket)
+        )
+        if date_from > date_to:
+            return Response({"date_from": ["date_from позже date_to."]}, status=status.HTTP_400_BAD_REQUEST)
+        if len(reports.bucket_periods(date_from, date_to, bucket)) > reports.MAX_BUCKETS:
+            return Response({"detail": f"Слишком много периодов (максимум {reports.MAX_BUCKETS})."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        data = reports.timeseries(
+            project_id=request.query_params.get("project") or None,
+            date_from=date_from,
+            date_to=date_to,
+            bucket=bucket,
+            source=request.query_params.get("source") or reports.SOURCE_ROLLUP,
         )
-        by_project = [
-            {
-                "project_id": r["project__id"],
-                "project_name": r["project__name"],
-                "count": r["count"],
-            }
-            for r in by_project_raw
-        ]
-
-        return Response({
-            "total": total,
-            "by_status": by_status,
-            "by_priority": by_priority,
-            "by_project": by_project,
-        })
+        return Response(data)
+
+
+class ReportsCycleTimeView(APIView):
+    """
+    GET /api/reports/cycle-time/?group_by=project|assignee&project=<id>&date_from=...&date_to=...
+
+    Время от создания до закрытия (resolved) по проектам или исполнителям и доля нарушений SLA
+    (целевые часы по приоритету — settings.DEFECT_SLA_HOURS); период — по дате закрытия.
+    {
+      "group_by": "project", "sla_hours": {"critical": 24, ...},
+      "results": [{"project": {"id": "...", "name": "..."}, "resolved": 12, "avg_hours": 50.2,
+                   "p50_hours": 30.0, "p90_hours": 120.5, "p95_hours": 160.0,
+                   "sla_breached": 3, "sla_breach_rate": 0.25}, ...]
+    }
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        group_by = request.query_params.get("group_by") or "project"
+        if group_by not in reports.CYCLE_GROUPS:
+            return Response({"group_by": [f"Допустимо: {', '.join(reports.CYCLE_GROUPS)}"]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        date_from, date_to, error = _report_period(request)
+        if error:
+            return error
+        return Response(reports.cycle_time(
+            group_by=group_by,
+            project_id=request.query_params.get("project") or None,
+            date_from=date_from,
+            date_to=date_to,
+        ))
+
+
+class ReportsTimeInStatusView(APIView):
+    """
+    GET /api/reports/time-in-status/?project=<id>&assignee=<id>&date_from=...&date_to=...
+
+    Сколько дефекты проводят в каждом статусе (закончившиеся пребывания, период — по выходу):
+    {"statuses": [{"status": "new", "count": 40, "avg_hours": 5.1, "p50_hours": 2.0,
+                   "p90_hours": 12.4, "p95_hours": 20.0}, ...]}
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        date_from, date_to, error = _report_period(request)
+        if error:
+            return error
+        return Response(reports.time_in_status(
+            project_id=request.query_params.get("project") or None,
+            assignee_id=request.query_params.get("assignee") or None,
+            date_from=date_from,
+            date_to=date_to,
+        ))
+
+
+def _report_period(request):
+    """(date_from, date_to, None) или (None, None, ответ 400); обе даты необязательны."""
+    date_from = reports.parse_date(request.query_params.get("date_from", ""))
+    date_to = reports.parse_date(request.query_params.get("date_to", ""))
+    if date_from and date_to and date_from > date_to:
+        return None, None, Response({"date_from": ["date_from позже date_to."]},
+                                    status=status.HTTP_400_BAD_REQUEST)
+    return date_from, date_to, None
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:05
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated_at(apps, schema_editor):
+    # истории изменений нет — считаем, что проект не менялся с создания
+    Project = apps.get_model("projects", "Project")
+    Project.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,29 @@
 from rest_framework import serializers
+from defects.models import Priority, Status
 from .models import Project
 
 class ProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
         fields = ("id","name","customer","description","created_at")
+
+
+class ProjectWithStatsSerializer(ProjectSerializer):
+    """
+    Проект + статистика по дефектам.
+    Ожидает атрибуты stats_* (см. attach_defect_stats в views.py).
+    """
+    stats = serializers.SerializerMethodField()
+
+    class Meta(ProjectSerializer.Meta):
+        fields = ProjectSerializer.Meta.fields + ("stats",)
+
+    def get_stats(self, obj):
+        last_activity = obj.stats_last_activity
+        return {
+            "total": obj.stats_total,
+            "by_status": {value: getattr(obj, f"stats_status_{value}") for value in Status.values},
+            "by_priority": {value: getattr(obj, f"stats_priority_{value}") for value in Priority.values},
+            "overdue": obj.stats_overdue,
+            "last_activity": serializers.DateTimeField().to_representation(last_activity) if last_activity else None,
+        }
@@ -1,9 +1,92 @@
+from django.db.models import Count, Max, Q
+from django.utils import timezone
 from rest_framework import viewsets
+
+from core.conditional import ConditionalGetMixin
+from defects.models import Defect, Priority, Status, open_literal
+from defects.permissions import is_engineer_scoped
 from .models import Project
-from .serializers import ProjectSerializer
+from .serializers import ProjectSerializer, ProjectWithStatsSerializer
+
+
+def attach_defect_stats(projects, user):
+    """
+    Статистика по дефектам проектов — атрибуты stats_* на каждом из projects.
+    Один группирующий запрос по дефектам только этих проектов (условные Count(filter=Q(...)),
+    поиск по defect_project_created_idx), без JOIN со всем списком проектов.
+    Инженер видит только свои дефекты — считаем так же.
+    """
+    qs = Defect.objects.filter(project_id__in=[project.pk for project in projects])
+    if is_engineer_scoped(user):
+        qs = qs.filter(assignee=user)
+
+    annotations = {
+        "stats_total": Count("id"),
+        "stats_overdue": Count("id", filter=Q(due_date__lt=timezone.localdate()) & open_literal()),
+        "stats_last_activity": Max("updated_at"),
+    }
+    for value in Status.values:
+        annotations[f"stats_status_{value}"] = Count("id", filter=Q(status=value))
+    for value in Priority.values:
+        annotations[f"stats_priority_{value}"] = Count("id", filter=Q(priority=value))
+
+    rows = {row.pop("project_id"): row for row in qs.order_by().values("project_id").annotate(**annotations)}
+    for project in projects:
+        row = rows.get(project.pk, {})
+        for name in annotations:
+            setattr(project, name, row.get(name, None if name == "stats_last_activity" else 0))
+    return projects
+
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    """
+    CRUD по проектам.
+    ?with_stats=1 — добавить к каждому проекту статистику по дефектам
+    (один запрос на страницу, без N+1).
+    list / retrieve отдают ETag и отвечают 304 на If-None-Match (core/conditional.py);
+    со статистикой ETag списка строится по странице (conditional_list_from_page)
+    и включает статистику её проектов.
+    """
     queryset = Project.objects.all().order_by("-created_at")
     serializer_class = ProjectSerializer
     filterset_fields = ["name","customer"]
     search_fields = ["name","customer","description"]
+
+    def _with_stats(self):
+        return self.request.query_params.get("with_stats") in {"1", "true", "True"}
+
+    @property
+    def conditional_list_from_page(self):
+        return self._with_stats()
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.request.method == "GET" and self._with_stats():
+            attach_defect_stats([instance], self.request.user)
+        return instance
+
+    def get_page_validators(self, rows):
+        attach_defect_stats(rows, self.request.user)
+        stamps = [value for project in rows for value in (project.updated_at, project.stats_last_activity) if value]
+        parts = [
+            (project.pk, project.updated_at, project.stats_total, project.stats_last_activity) for project in rows
+        ]
+        page = getattr(self.paginator, "page", None)
+        if page is not None:
+            # удаление/добавление проекта на других страницах меняет count и ссылки
+            parts += [page.paginator.count, self.paginator.get_next_link(), self.paginator.get_previous_link()]
+        # overdue зависит от текущей даты
+        return max(stamps, default=None), parts + [timezone.localdate()]
+
+    def get_object_validators(self, instance):
+        last, parts = super().get_object_validators(instance)
+        if not self._with_stats():
+            return last, parts
+        if instance.stats_last_activity and instance.stats_last_activity > last:
+            last = instance.stats_last_activity
+        return last, parts + [instance.stats_last_activity, instance.stats_total, timezone.localdate()]
+
+    def get_serializer_class(self):
+        if self.request.method == "GET" and self._with_stats():
+            return ProjectWithStatsSerializer
+        return ProjectSerializer
@@ -1,17 +1,29 @@
 # backend/tests/conftest.py
 import pytest
 from datetime import timedelta
+from django.core.cache import cache
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import AccessToken
 
+from accounts.authentication import user_cache
 from projects.models import Project
 from defects.models import Defect, Status, Priority
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кеш (отчёты, пользователи JWT и т.п.) не должен переживать тест: on_commit в тестах не срабатывает."""
+    cache.clear()
+    user_cache.clear()
+    yield
+    cache.clear()
+    user_cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -0,0 +1,96 @@
+# backend/tests/test_attachment_blobs.py
+import errno
+import io
+import os
+import stat
+from unittest import mock
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework import status
+
+from defects.models import Attachment, AttachmentBlob
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def _upload(client, defect, content, name):
+    return client.post("/api/attachments/", {
+        "defect": str(defect.id), "file": SimpleUploadedFile(name, content),
+    }, format="multipart")
+
+
+@pytest.mark.django_db
+def test_identical_uploads_share_blob_until_last_reference(api_client, media_root, defect_new,
+                                                           defect_in_progress, user_manager, auth_headers,
+                                                           django_capture_on_commit_callbacks):
+    client = auth_headers(api_client, user_manager)
+    first = _upload(client, defect_new, b"%PDF-1.4 drawing", "План этажа.PDF")
+    second = _upload(client, defect_in_progress, b"%PDF-1.4 drawing", "plan-copy.pdf")
+    assert first.status_code == second.status_code == status.HTTP_201_CREATED
+    assert first.data["sha256"] == second.data["sha256"]
+    assert first.data["filename"] == "План этажа.PDF" and second.data["filename"] == "plan-copy.pdf"
+
+    blob = AttachmentBlob.objects.get()
+    assert blob.ref_count == 2 and blob.file.name.endswith(".pdf")
+    path = blob.file.path
+    assert os.path.exists(path)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert client.delete(f"/api/attachments/{first.data['id']}/").status_code == status.HTTP_204_NO_CONTENT
+    assert AttachmentBlob.objects.get().ref_count == 1 and os.path.exists(path)
+
+    # последняя ссылка уходит каскадом вместе с дефектом
+    with django_capture_on_commit_callbacks(execute=True):
+        defect_in_progress.delete()
+    assert not AttachmentBlob.objects.exists()
+    assert not os.path.exists(path)
+
+
+@pytest.mark.django_db
+def test_dedupe_command_collapses_legacy_files(media_root, defect_new):
+    photo = b"\xff\xd8\xff" + b"x" * 1000
+    legacy = [
+        Attachment.objects.create(defect=defect_new, file=ContentFile(photo, name="photo.jpg")),
+        Attachment.objects.create(defect=defect_new, file=ContentFile(photo, name="photo.jpg")),
+        Attachment.objects.create(defect=defect_new, file=ContentFile(b"other", name="note.txt")),
+    ]
+    assert len(os.listdir(media_root / "attachments")) == 3
+
+    out = io.StringIO()
+    call_command("dedupe_attachments", stdout=out)
+    assert "дубликатов: 1" in out.getvalue() and f"освобождено: {len(photo)} байт" in out.getvalue()
+
+    assert os.listdir(media_root / "attachments") == []
+    assert AttachmentBlob.objects.count() == 2
+    refreshed = [Attachment.objects.get(pk=a.pk) for a in legacy]
+    assert refreshed[0].blob_id == refreshed[1].blob_id and refreshed[0].blob.ref_count == 2
+    with refreshed[1].file.open("rb") as f:
+        assert f.read() == photo
+
+
+@pytest.mark.django_db
+def test_large_upload_moves_across_devices_with_upload_permissions(api_client, media_root, defect_new,
+                                                                  user_manager, auth_headers, settings, tmp_path):
+    # большой файл — TemporaryUploadedFile в FILE_UPLOAD_TEMP_DIR; rename на другой том -> EXDEV
+    settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 0
+    settings.FILE_UPLOAD_TEMP_DIR = str(tmp_path / "upload-tmp")
+    settings.FILE_UPLOAD_PERMISSIONS = 0o644
+    os.makedirs(settings.FILE_UPLOAD_TEMP_DIR)
+    client = auth_headers(api_client, user_manager)
+    exdev = OSError(errno.EXDEV, "Invalid cross-device link")
+    with mock.patch("os.rename", side_effect=exdev), mock.patch("os.replace", side_effect=exdev):
+        resp = _upload(client, defect_new, b"%PDF-1.4 big drawing", "big.pdf")
+    assert resp.status_code == status.HTTP_201_CREATED, resp.data
+
+    path = AttachmentBlob.objects.get().file.path
+    with open(path, "rb") as f:
+        assert f.read() == b"%PDF-1.4 big drawing"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert os.listdir(settings.FILE_UPLOAD_TEMP_DIR) == []
@@ -0,0 +1,103 @@
+# backend/tests/test_attachment_download.py
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+
+from defects.downloads import parse_range
+from defects.models import Attachment
+
+CONTENT = b"0123456789" * 100  # 1000 байт
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.ATTACHMENT_SENDFILE = ""
+    return tmp_path
+
+
+@pytest.fixture
+def attachment(api_client, media_root, defect_in_progress, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    resp = client.post("/api/attachments/", {
+        "defect": str(defect_in_progress.id), "file": SimpleUploadedFile("обход объекта.mp4", CONTENT),
+    }, format="multipart")
+    assert resp.status_code == status.HTTP_201_CREATED
+    return resp.data
+
+
+def _body(resp):
+    return b"".join(resp.streaming_content)
+
+
+@pytest.mark.django_db
+def test_download_full_range_and_conditional(api_client, attachment, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    url = f"/api/attachments/{attachment['id']}/download/"
+
+    resp = client.get(url, HTTP_ACCEPT="video/*")
+    assert resp.status_code == status.HTTP_200_OK
+    assert _body(resp) == CONTENT
+    assert resp["Content-Type"] == "video/mp4" and resp["Accept-Ranges"] == "bytes"
+    assert "attachment" in resp["Content-Disposition"] and "utf-8''" in resp["Content-Disposition"]
+    etag = resp["ETag"]
+    assert attachment["sha256"] in etag
+
+    resp = client.get(url, HTTP_RANGE="bytes=10-19")
+    assert resp.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert _body(resp) == CONTENT[10:20] and resp["Content-Range"] == "bytes 10-19/1000"
+
+    resp = client.get(url, HTTP_RANGE="bytes=-5")
+    assert _body(resp) == CONTENT[-5:] and resp["Content-Range"] == "bytes 995-999/1000"
+
+    resp = client.get(url, HTTP_RANGE="bytes=990-", HTTP_IF_RANGE=etag)
+    assert resp.status_code == status.HTTP_206_PARTIAL_CONTENT and _body(resp) == CONTENT[990:]
+    # If-Range от старой версии файла — отдаём целиком
+    assert client.get(url, HTTP_RANGE="bytes=990-", HTTP_IF_RANGE='"old"').status_code == status.HTTP_200_OK
+
+    # недействительный диапазон (конец раньше начала) игнорируется — файл целиком
+    resp = client.get(url, HTTP_RANGE="bytes=5-3")
+    assert resp.status_code == status.HTTP_200_OK and _body(resp) == CONTENT
+
+    resp = client.get(url, HTTP_RANGE="bytes=5000-")
+    assert resp.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+    assert resp["Content-Range"] == "bytes */1000"
+
+    resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED and resp["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_download_sendfile_mode_and_scope(api_client, settings, media_root, attachment, defect_in_progress,
+                                          user_engineer, user_engineer_2, auth_headers):
+    settings.ATTACHMENT_SENDFILE = "x-accel-redirect"
+    client = auth_headers(api_client, user_engineer)  # дефект назначен на него
+    resp = client.get(f"/api/attachments/{attachment['id']}/download/", {"inline": "1"})
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.content == b""
+    assert resp["X-Accel-Redirect"].startswith("/protected-media/blobs/")
+    assert resp["Content-Disposition"].startswith("inline")
+
+    # старое вложение вне blob-хранилища: имя в URI прокси — percent-encoded
+    (media_root / "attachments").mkdir()
+    (media_root / "attachments" / "обход #1?.mp4").write_bytes(b"x")
+    legacy = Attachment.objects.create(defect=defect_in_progress, file="attachments/обход #1?.mp4", size_bytes=1)
+    resp = client.get(f"/api/attachments/{legacy.id}/download/")
+    assert resp["X-Accel-Redirect"] == "/protected-media/attachments/%D0%BE%D0%B1%D1%85%D0%BE%D0%B4%20%231%3F.mp4"
+
+    other = auth_headers(api_client.__class__(), user_engineer_2)
+    assert other.get(f"/api/attachments/{attachment['id']}/download/").status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_parse_range_on_empty_file():
+    # у пустого файла нет ни одного байта — любой диапазон неудовлетворим
+    assert parse_range("bytes=-5", 0) is False
+    assert parse_range("bytes=0-", 0) is False
+    assert parse_range("bytes=-5", 3) == (0, 2)
+
+
+def test_parse_range_ignores_reversed_range():
+    # last-pos < first-pos — синтаксически неверный диапазон, а не неудовлетворимый
+    assert parse_range("bytes=5-3", 1000) is None
+    assert parse_range("bytes=5-3", 0) is None
+    assert parse_range("bytes=5-5", 1000) == (5, 5)
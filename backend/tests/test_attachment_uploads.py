@@ -0,0 +1,107 @@
+# backend/tests/test_attachment_uploads.py
+import os
+import zlib
+
+import pytest
+from rest_framework import status
+
+from defects import uploads
+from defects.models import Attachment, UploadSession
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(uploads, "MIN_CHUNK_SIZE", 4)
+
+
+def _put(client, session_id, index, data):
+    return client.put(f"/api/attachment-uploads/{session_id}/chunks/{index}/", data=data,
+                      content_type="application/octet-stream")
+
+
+@pytest.mark.django_db
+def test_chunked_upload_resume_and_finalize(api_client, media_root, small_chunks, defect_new,
+                                            user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    payload = b"0123456789abcdefghij-tail"  # 25 байт -> части по 10: 10 + 10 + 5
+    resp = client.post("/api/attachment-uploads/", {
+        "defect": str(defect_new.id), "filename": "видео объекта.mp4",
+        "size_bytes": len(payload), "chunk_size": 10,
+    }, format="json")
+    assert resp.status_code == status.HTTP_201_CREATED, resp.data
+    assert resp.data["chunk_size"] == 10
+    sid = resp.data["id"]
+    assert resp.data["chunk_count"] == 3 and resp.data["next_chunk"] == 0
+
+    assert _put(client, sid, 0, payload[:10]).status_code == status.HTTP_200_OK
+    # пропуск части и часть неверного размера не принимаются
+    assert _put(client, sid, 2, payload[20:]).status_code == status.HTTP_409_CONFLICT
+    assert _put(client, sid, 1, payload[10:15]).status_code == status.HTTP_400_BAD_REQUEST
+    # повтор уже принятой части (ответ потерялся) — без изменений
+    assert _put(client, sid, 0, payload[:10]).data["received_bytes"] == 10
+    # рано финализировать
+    assert client.post(f"/api/attachment-uploads/{sid}/finalize/").status_code == status.HTTP_409_CONFLICT
+
+    # продолжение после обрыва: спрашиваем состояние и досылаем
+    state = client.get(f"/api/attachment-uploads/{sid}/").data
+    assert state["next_chunk"] == 1 and state["received_bytes"] == 10
+    _put(client, sid, 1, payload[10:20])
+    resp = _put(client, sid, 2, payload[20:])
+    assert resp.data["crc32"] == f"{zlib.crc32(payload):08x}"
+
+    resp = client.post(f"/api/attachment-uploads/{sid}/finalize/", {"crc32": resp.data["crc32"]}, format="json")
+    assert resp.status_code == status.HTTP_201_CREATED, resp.data
+    attachment = Attachment.objects.get(pk=resp.data["id"])
+    assert attachment.filename == "видео объекта.mp4" and attachment.size_bytes == len(payload)
+    with attachment.file.open("rb") as f:
+        assert f.read() == payload
+    assert not UploadSession.objects.exists()
+    assert os.listdir(media_root / uploads.UPLOAD_DIR) == []
+
+
+@pytest.mark.django_db
+def test_upload_checksum_mismatch_owner_scope_and_abort(api_client, media_root, defect_new,
+                                                        user_manager, user_engineer, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    sid = client.post("/api/attachment-uploads/", {
+        "defect": str(defect_new.id), "filename": "a.txt", "size_bytes": 3,
+    }, format="json").data["id"]
+    _put(client, sid, 0, b"abc")
+    resp = client.post(f"/api/attachment-uploads/{sid}/finalize/", {"crc32": "deadbeef"}, format="json")
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Attachment.objects.exists()
+
+    other = auth_headers(api_client.__class__(), user_engineer)
+    assert other.get(f"/api/attachment-uploads/{sid}/").status_code == status.HTTP_404_NOT_FOUND
+
+    assert client.delete(f"/api/attachment-uploads/{sid}/").status_code == status.HTTP_204_NO_CONTENT
+    assert not UploadSession.objects.exists()
+    assert os.listdir(media_root / uploads.UPLOAD_DIR) == []
+
+
+@pytest.mark.django_db
+def test_engineer_uploads_only_to_own_defects(api_client, media_root, defect_in_progress, defect_other_engineer,
+                                              user_engineer, user_engineer_2, auth_headers):
+    client = auth_headers(api_client, user_engineer)
+
+    def start(defect):
+        return client.post("/api/attachment-uploads/", {
+            "defect": str(defect.id), "filename": "фото.jpg", "size_bytes": 3,
+        }, format="json")
+
+    resp = start(defect_other_engineer)
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST and "defect" in resp.data
+
+    sid = start(defect_in_progress).data["id"]
+    _put(client, sid, 0, b"abc")
+    # дефект забрали до завершения — сессия инженеру больше не видна
+    defect_in_progress.assignee = user_engineer_2
+    defect_in_progress.save()
+    assert client.post(f"/api/attachment-uploads/{sid}/finalize/").status_code == status.HTTP_404_NOT_FOUND
+    assert not Attachment.objects.exists()
@@ -0,0 +1,78 @@
+# backend/tests/test_attachment_variants.py
+import io
+import os
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework import status
+
+from defects.models import AttachmentBlob, VariantStatus
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.ATTACHMENT_VARIANTS_ASYNC = False
+    return tmp_path
+
+
+def _jpeg(size=(2400, 1800), exif=True):
+    img = Image.new("RGB", size, (200, 120, 40))
+    buf = io.BytesIO()
+    info = Image.Exif()
+    info[0x0112] = 6  # Orientation: повернуть на 90°
+    info[0x010F] = "PhoneMaker"
+    img.save(buf, "JPEG", exif=info.tobytes() if exif else b"")
+    return buf.getvalue()
+
+
+@pytest.mark.django_db
+def test_upload_builds_variants_without_exif(api_client, media_root, defect_new, user_manager, auth_headers,
+                                             django_capture_on_commit_callbacks):
+    client = auth_headers(api_client, user_manager)
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = client.post("/api/attachments/", {
+            "defect": str(defect_new.id), "file": SimpleUploadedFile("IMG_0001.JPG", _jpeg()),
+        }, format="multipart")
+    assert resp.status_code == status.HTTP_201_CREATED
+
+    blob = AttachmentBlob.objects.get()
+    assert blob.variants_status == VariantStatus.READY
+    with Image.open(blob.preview.path) as preview:
+        assert preview.format == "WEBP"
+        assert preview.size == (1200, 1600)  # ориентация из EXIF применена
+        assert not preview.getexif()
+    with Image.open(blob.thumbnail.path) as thumb:
+        assert max(thumb.size) == 320
+
+    row = client.get("/api/attachments/").data["results"][0]
+    assert row["thumbnail"].endswith(".thumb.webp") and row["preview"].endswith(".preview.webp")
+
+    # не изображение — без превью
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = client.post("/api/attachments/", {
+            "defect": str(defect_new.id), "file": SimpleUploadedFile("act.pdf", b"%PDF-1.4"),
+        }, format="multipart")
+    assert resp.data["thumbnail"] is None
+    assert AttachmentBlob.objects.get(pk=resp.data["sha256"]).variants_status == VariantStatus.SKIPPED
+
+
+@pytest.mark.django_db
+def test_backfill_command_builds_pending_variants(media_root):
+    for i, name in enumerate(["a.jpg", "b.png", "broken.jpg"]):
+        content = b"not an image" if name == "broken.jpg" else _jpeg((800 + i, 600), exif=False)
+        stored = default_storage.save(f"blobs/{name}", ContentFile(content))
+        AttachmentBlob.objects.create(sha256=f"{i:064x}", file=stored, size_bytes=len(content), ref_count=1)
+
+    out = io.StringIO()
+    call_command("build_attachment_variants", workers=2, stdout=out)
+    assert "Готово: 2, ошибок: 1" in out.getvalue()
+
+    statuses = dict(AttachmentBlob.objects.values_list("file", "variants_status"))
+    assert statuses == {"blobs/a.jpg": "ready", "blobs/b.png": "ready", "blobs/broken.jpg": "failed"}
+    assert os.path.exists(default_storage.path("blobs/b.thumb.webp"))
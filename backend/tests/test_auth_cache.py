@@ -0,0 +1,76 @@
+# backend/tests/test_auth_cache.py
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.authentication import CachedJWTAuthentication, UserCache, user_cache
+from accounts.models import Roles
+
+
+def _user_selects(ctx):
+    return [q for q in ctx.captured_queries if 'FROM "accounts_user"' in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_hot_requests_skip_user_lookup(api_client, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    with CaptureQueriesContext(connection) as ctx:
+        for _ in range(5):
+            assert client.get("/api/auth/me/").status_code == status.HTTP_200_OK
+    assert len(_user_selects(ctx)) == 1
+
+    # правка пользователя сбрасывает запись — новая роль видна сразу
+    user_manager.role = Roles.ENGINEER
+    user_manager.save()
+    assert client.get("/api/auth/me/").data["role"] == Roles.ENGINEER
+    # роль для POST /api/auth/users/ тоже берётся из кеша (уже обновлённого)
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.post("/api/auth/users/", {"email": "x@example.com", "password": "pass12345"}, format="json")
+    assert resp.status_code == status.HTTP_403_FORBIDDEN and not _user_selects(ctx)
+
+    user_manager.is_active = False
+    user_manager.save()
+    assert client.get("/api/auth/me/").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_request_gets_a_copy_and_ttl_zero_disables(api_client, settings, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    client.get("/api/auth/me/")
+    cached = user_cache.get(str(user_manager.pk), None)
+    assert cached is not None and cached.email == user_manager.email
+
+    user_cache.clear()
+    settings.AUTH_USER_CACHE_TTL = 0
+    client.get("/api/auth/me/")
+    assert len(user_cache) == 0
+
+
+@pytest.mark.django_db
+def test_request_user_changes_do_not_leak_into_next_request(user_manager):
+    token = AccessToken.for_user(user_manager)
+    auth = CachedJWTAuthentication()
+    first = auth.get_user(token)
+    first.role = Roles.ENGINEER
+    first._state.fields_cache["marker"] = object()
+
+    with CaptureQueriesContext(connection) as ctx:
+        second = auth.get_user(token)
+    assert not _user_selects(ctx)  # из кеша, но не тот же объект
+    assert second.role == Roles.MANAGER
+    assert second._state is not first._state and "marker" not in second._state.fields_cache
+    assert not second._state.adding and second.pk == user_manager.pk
+
+
+def test_cache_is_size_bounded_lru():
+    cache = UserCache()
+    for i in range(3):
+        cache.set(str(i), None, f"user{i}", ttl=60, size=2)
+    assert cache.get("0", None) is None
+    assert cache.get("1", None) == "user1"
+    cache.set("3", None, "user3", ttl=60, size=2)  # вытесняет «2», к «1» только что обращались
+    assert cache.get("2", None) is None and cache.get("1", None) == "user1"
+    # другая версия токена (сменили пароль) — промах
+    assert cache.get("1", "other-hash") is None
@@ -0,0 +1,78 @@
+# backend/tests/test_conditional_get.py
+import pytest
+from rest_framework import status
+
+from defects.models import Status
+
+
+@pytest.mark.django_db
+def test_defect_detail_etag_changes_on_write(api_client, defect_new, user_engineer, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    url = f"/api/defects/{defect_new.id}/"
+    resp = client.get(url)
+    assert resp.status_code == status.HTTP_200_OK
+    etag = resp["ETag"]
+    assert resp["Last-Modified"] and resp["Cache-Control"] == "private, no-cache"
+
+    resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED and resp["ETag"] == etag
+
+    # assign пишет через update_fields — updated_at тоже должен сдвинуться
+    client.patch(f"/api/defects/{defect_new.id}/assign/", {"assignee": str(user_engineer.id)}, format="json")
+    resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK and resp["ETag"] != etag
+    assert resp.data["assignee"] == str(user_engineer.id)
+
+
+@pytest.mark.django_db
+def test_defect_list_304_skips_serialization(api_client, defect_new, defect_in_progress, user_manager,
+                                             auth_headers, django_assert_num_queries):
+    client = auth_headers(api_client, user_manager)
+    etag = client.get("/api/defects/")["ETag"]
+
+    # ETag — по самой странице: COUNT пагинации и её строки, без сериализации;
+    # пользователь — из кеша JWT
+    with django_assert_num_queries(2):
+        resp = client.get("/api/defects/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # в режиме курсора COUNT нет — только строки страницы, без агрегата по всему набору
+    cursor_etag = client.get("/api/defects/", {"pagination": "cursor"})["ETag"]
+    with django_assert_num_queries(1) as ctx:
+        resp = client.get("/api/defects/", {"pagination": "cursor"}, HTTP_IF_NONE_MATCH=cursor_etag)
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+    assert "LIMIT" in ctx.captured_queries[0]["sql"]
+
+    # другой фильтр — другой ETag
+    assert client.get("/api/defects/", {"status": Status.NEW})["ETag"] != etag
+
+    # удаление меняет строки и count страницы; on_commit здесь не выполняется —
+    # как если бы удалял другой воркер, чей сброс кеша до нашего процесса не доходит
+    defect_new.delete()
+    resp = client.get("/api/defects/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK and resp.data["count"] == 1
+
+    # массовая правка — тоже без сигналов и сброса кеша в этом процессе
+    etag = resp["ETag"]
+    client.patch("/api/defects/bulk/", {"ids": [str(defect_in_progress.id)], "changes": {"status": Status.VERIFY}},
+                 format="json")
+    resp = client.get("/api/defects/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK and resp.data["results"][0]["status"] == Status.VERIFY
+
+
+@pytest.mark.django_db
+def test_project_list_with_stats_revalidates_on_defect_change(api_client, project, defect_new, user_manager,
+                                                               auth_headers):
+    client = auth_headers(api_client, user_manager)
+    etag = client.get("/api/projects/", {"with_stats": 1})["ETag"]
+    resp = client.get("/api/projects/", {"with_stats": 1}, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    client.patch(f"/api/defects/{defect_new.id}/", {"status": Status.RESOLVED}, format="json")
+    resp = client.get("/api/projects/", {"with_stats": 1}, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["results"][0]["stats"]["by_status"]["resolved"] == 1
+
+    detail = client.get(f"/api/projects/{project.id}/")
+    client.patch(f"/api/projects/{project.id}/", {"customer": "ООО Новый заказчик"}, format="json")
+    assert client.get(f"/api/projects/{project.id}/", HTTP_IF_NONE_MATCH=detail["ETag"]).status_code == 200
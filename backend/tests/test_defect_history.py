@@ -0,0 +1,123 @@
+# backend/tests/test_defect_history.py
+import math
+from datetime import timedelta
+from importlib import import_module
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+
+from defects import reports
+from defects.models import Defect, DefectTransition, Priority, Status
+
+
+def _statuses(defect):
+    return list(defect.transitions.order_by("changed_at", "id").values_list("previous_status", "status"))
+
+
+@pytest.mark.django_db
+def test_api_assign_and_bulk_write_history(api_client, auth_headers, user_manager, user_engineer, defect_new):
+    client = auth_headers(api_client, user_manager)
+    assert _statuses(defect_new) == [(None, Status.NEW)]
+
+    client.patch(f"/api/defects/{defect_new.id}/", {"status": Status.IN_PROGRESS}, format="json")
+    client.patch(f"/api/defects/{defect_new.id}/", {"title": "Только текст"}, format="json")  # не переход
+    client.patch(f"/api/defects/{defect_new.id}/assign/", {"assignee": str(user_engineer.id)}, format="json")
+    client.patch("/api/defects/bulk/", {"ids": [str(defect_new.id)], "changes": {"status": Status.RESOLVED}},
+                 format="json")
+
+    rows = client.get(f"/api/defects/{defect_new.id}/history/").data
+    assert [(r["previous_status"], r["status"]) for r in rows] == [
+        (None, Status.NEW), (Status.NEW, Status.IN_PROGRESS),
+        (Status.IN_PROGRESS, Status.IN_PROGRESS), (Status.IN_PROGRESS, Status.RESOLVED),
+    ]
+    assert rows[2]["assignee"] == str(user_engineer.id) and rows[2]["previous_assignee"] is None
+    assert {r["changed_by"] for r in rows} == {str(user_manager.id)}
+    # смена исполнителя не закрывает статус: in_progress считается от перехода в него
+    assert rows[2]["status_seconds"] is None and rows[3]["status_seconds"] is not None
+
+    transitions = list(defect_new.transitions.order_by("changed_at", "id"))
+    assert transitions[3].status_since == transitions[3].changed_at
+    assert transitions[2].status_since == transitions[1].changed_at
+
+    # инженер видит историю только своих дефектов
+    engineer = auth_headers(type(api_client)(), user_engineer)
+    assert engineer.get(f"/api/defects/{defect_new.id}/history/").status_code == status.HTTP_200_OK
+    defect_new.assignee = None
+    defect_new.save()
+    assert engineer.get(f"/api/defects/{defect_new.id}/history/").status_code == status.HTTP_404_NOT_FOUND
+
+
+def _resolved(defect, hours, priority, assignee=None):
+    """Строка истории «закрыт через hours часов после создания»."""
+    now = timezone.now()
+    return DefectTransition(
+        defect=defect, project_id=defect.project_id, status=Status.RESOLVED, priority=priority,
+        assignee=assignee, previous_status=Status.IN_PROGRESS, previous_priority=priority,
+        changed_at=now, status_since=now, status_seconds=int(hours * 1800), age_seconds=int(hours * 3600),
+    )
+
+
+def _nearest_rank(values, p):
+    values = sorted(values)
+    return values[math.ceil(len(values) * p / 100) - 1]
+
+
+@pytest.mark.django_db
+def test_cycle_time_percentiles_and_sla(api_client, auth_headers, user_manager, user_engineer, project,
+                                        another_project, defect_new, defect_in_progress):
+    hours = [1, 5, 10, 20, 30, 50, 80, 100, 200, 400]
+    DefectTransition.objects.bulk_create(
+        [_resolved(defect_new, h, Priority.HIGH, user_engineer) for h in hours]
+        + [_resolved(defect_in_progress, 30, Priority.CRITICAL)]
+    )
+    client = auth_headers(api_client, user_manager)
+    data = client.get("/api/reports/cycle-time/", {"project": str(project.id)}).data
+    [row] = data["results"]
+    assert row["project"]["name"] == project.name and row["resolved"] == 11
+    all_hours = hours + [30]
+    for p in reports.PERCENTILES:
+        assert row[f"p{p}_hours"] == _nearest_rank(all_hours, p)
+    assert row["avg_hours"] == round(sum(all_hours) / 11, 1)
+    # SLA: high — 72 ч (80, 100, 200, 400), critical — 24 ч (30)
+    assert row["sla_breached"] == 5 and row["sla_breach_rate"] == round(5 / 11, 3)
+
+    by_engineer = client.get("/api/reports/cycle-time/", {"group_by": "assignee"}).data["results"]
+    assert [(r["assignee"] and r["assignee"]["id"], r["resolved"]) for r in by_engineer] == [
+        (str(user_engineer.id), 10), (None, 1),
+    ]
+    assert client.get("/api/reports/cycle-time/", {"group_by": "status"}).status_code == 400
+
+    tis = client.get("/api/reports/time-in-status/").data["statuses"]
+    in_progress = next(s for s in tis if s["status"] == Status.IN_PROGRESS)
+    assert in_progress["count"] == 11
+    assert in_progress["p50_hours"] == _nearest_rank([h / 2 for h in all_hours], 50)
+
+
+@pytest.mark.django_db
+def test_backfill_starts_history_from_current_state(defect_in_progress):
+    from django.apps import apps
+
+    DefectTransition.objects.all().delete()
+    Defect.objects.filter(pk=defect_in_progress.pk).update(
+        status=Status.RESOLVED, closed_at=timezone.now() - timedelta(days=1),
+    )
+    import_module("defects.migrations.0012_defect_transition").fill_history(apps, None)
+    [row] = DefectTransition.objects.all()
+    assert row.previous_status is None and row.status == Status.RESOLVED
+    assert row.changed_at == Defect.objects.get(pk=defect_in_progress.pk).closed_at
+    # начальная строка — не закрытие: в отчёт о цикле не попадает
+    assert reports.compute_cycle_time()["results"] == []
+
+
+@pytest.mark.django_db
+def test_admin_save_records_who_changed(rf, admin_user, defect_new):
+    from django.contrib import admin
+
+    request = rf.post("/admin/")
+    request.user = admin_user
+    defect_new.priority = Priority.CRITICAL
+    admin.site._registry[Defect].save_model(request, defect_new, form=None, change=True)
+    row = defect_new.transitions.latest("id")
+    assert row.changed_by == admin_user
+    assert (row.previous_priority, row.priority) == (Priority.MEDIUM, Priority.CRITICAL)
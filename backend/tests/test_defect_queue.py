@@ -0,0 +1,95 @@
+# backend/tests/test_defect_queue.py
+from datetime import timedelta
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.utils import timezone
+from rest_framework import status
+
+from defects.models import URGENCY_ORDERING, Defect, Priority, Status, open_literal
+
+
+@pytest.fixture
+def queue(project, user_manager, user_engineer, user_engineer_2):
+    today = timezone.localdate()
+
+    def make(title, priority, due=None, assignee=user_engineer, state=Status.NEW):
+        return Defect.objects.create(
+            project=project, title=title, created_by=user_manager, assignee=assignee, status=state,
+            priority=priority, due_date=today + timedelta(days=due) if due is not None else None,
+        )
+
+    # порядок создания = порядок created_at
+    make("medium, без срока", Priority.MEDIUM)
+    make("critical, без срока", Priority.CRITICAL)
+    make("high, +5", Priority.HIGH, 5)
+    make("high, +1", Priority.HIGH, 1)
+    make("critical, +3", Priority.CRITICAL, 3)
+    make("high, без срока", Priority.HIGH)
+    make("закрытый critical", Priority.CRITICAL, 0, state=Status.RESOLVED)
+    make("чужой critical", Priority.CRITICAL, 0, assignee=user_engineer_2)
+    return ["critical, +3", "critical, без срока", "high, +1", "high, +5", "high, без срока", "medium, без срока"]
+
+
+@pytest.mark.django_db
+def test_queue_returns_own_open_defects_by_urgency(api_client, auth_headers, user_engineer, queue):
+    client = auth_headers(api_client, user_engineer)
+    resp = client.get("/api/defects/queue/")
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+    assert [d["title"] for d in resp.data] == queue
+    assert resp.data[0].keys() == client.get(f"/api/defects/{resp.data[0]['id']}/").data.keys()
+
+    top = client.get("/api/defects/queue/", {"limit": 2, "fields": "title"})
+    assert top.data == [{"id": top.data[0]["id"], "title": queue[0]}, {"id": top.data[1]["id"], "title": queue[1]}]
+    assert client.get("/api/defects/queue/", {"limit": "x"}).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_orders_by_urgency_and_priority_rank(api_client, auth_headers, user_engineer, queue):
+    client = auth_headers(api_client, user_engineer)
+    titles = [d["title"] for d in client.get("/api/defects/", {"ordering": "urgency"}).data["results"]]
+    # в списке — и закрытые: срок сегодня, поэтому раньше «critical, +3»
+    assert titles == ["закрытый critical", *queue]
+    backwards = [d["title"] for d in client.get("/api/defects/", {"ordering": "-urgency"}).data["results"]]
+    assert backwards == titles[::-1]
+
+    # priority — по рангу, а не по алфавиту; в режиме курсора тоже
+    for params in ({"ordering": "-priority"}, {"ordering": "-priority", "pagination": "cursor"}):
+        priorities = [d["priority"] for d in client.get("/api/defects/", params).data["results"]]
+        assert priorities == sorted(priorities, key=["low", "medium", "high", "critical"].index, reverse=True)
+
+
+@pytest.mark.django_db
+def test_priority_rank_follows_priority(api_client, auth_headers, user_manager, defect_new):
+    assert Defect.objects.get(pk=defect_new.pk).priority_rank == 2
+    defect_new.priority = Priority.CRITICAL
+    defect_new.save(update_fields=["priority"])
+    assert Defect.objects.get(pk=defect_new.pk).priority_rank == 4
+
+    client = auth_headers(api_client, user_manager)
+    client.patch("/api/defects/bulk/", {"ids": [str(defect_new.id)], "changes": {"priority": Priority.LOW}},
+                 format="json")
+    assert Defect.objects.get(pk=defect_new.pk).priority_rank == 1
+
+    # строки до миграции — дозаполняются пачками
+    Defect.objects.update(priority_rank=None)
+    migration = import_module("defects.migrations.0013_priority_rank")
+    migration.fill_priority_rank(apps, None)
+    assert Defect.objects.get(pk=defect_new.pk).priority_rank == 1
+
+
+@pytest.mark.django_db
+def test_queue_ids_come_from_covering_index(user_engineer, queue):
+    if connection.vendor != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN — только SQLite")
+    qs = (
+        Defect.objects.filter(open_literal(), assignee=user_engineer)
+        .order_by(*URGENCY_ORDERING).values_list("id", flat=True)[:20]
+    )
+    sql, params = qs.query.sql_with_params()
+    with connection.cursor() as cur:
+        cur.execute("EXPLAIN QUERY PLAN " + sql, params)
+        plan = [row[-1] for row in cur.fetchall()]
+    assert plan == ["SEARCH defects_defect USING COVERING INDEX defect_queue_idx (assignee_id=?)"], plan
@@ -0,0 +1,154 @@
+# backend/tests/test_defect_stream.py
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.asgi import application
+from defects import events
+from defects.models import Comment, Defect, Priority, Status
+
+
+@pytest.fixture(autouse=True)
+def clean_broadcaster():
+    events.broadcaster.reset()
+    yield
+    events.broadcaster.reset()
+
+
+def _event(project="p1", assignee=None, old_assignee=None):
+    return events.Event({"type": "defect.updated", "project": project}, {project}, {assignee, old_assignee})
+
+
+def test_broadcaster_filters_replays_and_overflows():
+    loop = asyncio.new_event_loop()
+    b = events.broadcaster
+    manager = b.subscribe(loop, "m", scoped=False)
+    engineer = b.subscribe(loop, "e", scoped=True)
+    other_project = b.subscribe(loop, "m2", scoped=False, projects=["p2"])
+
+    b.publish(_event(assignee="e"))
+    b.publish(_event(assignee=None, old_assignee="e"))  # дефект забрали — инженер должен узнать
+    b.publish(_event(assignee="x"))
+    loop.run_until_complete(asyncio.sleep(0))
+    assert manager.queue.qsize() == 3 and engineer.queue.qsize() == 2 and other_project.queue.empty()
+
+    # переподключение: Last-Event-ID из буфера — дочитываем, чужой/старый — reset
+    again = b.subscribe(loop, "m", scoped=False, last_seq=1)
+    assert [e.seq for e in again.queue._queue] == [2, 3]
+    assert b.subscribe(loop, "m", scoped=False, last_seq=99).queue.get_nowait() is events.RESET
+
+    slow = b.subscribe(loop, "s", scoped=False, queue_size=2)
+    for _ in range(3):
+        b.publish(_event())
+    loop.run_until_complete(asyncio.sleep(0))
+    assert slow.queue.get_nowait() is events.OVERFLOW and slow.closed
+    loop.close()
+
+
+class _Client:
+    """ASGI-клиент потока: собирает то, что отправил сервер, отключается по команде."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.sent = []
+        self.gone = asyncio.Event()
+        self.inbox = asyncio.Queue()
+        self.task = None
+
+    async def receive(self):
+        if not self.inbox.empty():
+            return self.inbox.get_nowait()
+        await self.gone.wait()
+        return {"type": "http.disconnect" if self.scope["type"] == "http" else "websocket.disconnect"}
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    def start(self):
+        self.task = asyncio.create_task(application(self.scope, self.receive, self.send))
+        return self
+
+    async def wait_for(self, needle, timeout=3):
+        async def poll():
+            while needle not in self.text():
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(poll(), timeout)
+
+    def text(self):
+        return "".join(
+            (m.get("body") or b"").decode() + (m.get("text") or "") for m in self.sent
+        )
+
+    async def close(self):
+        self.gone.set()
+        await asyncio.wait_for(self.task, 3)
+
+
+def _scope(kind, path, token, query=""):
+    return {"type": kind, "path": path, "headers": [],
+            "query_string": f"token={token}{query}".encode() if token else query.encode()}
+
+
+async def _until_subscribed(n):
+    while len(events.broadcaster) < n:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sse_and_websocket_streams_respect_visibility(project, user_manager, user_engineer):
+    manager_token = str(AccessToken.for_user(user_manager))
+    engineer_token = str(AccessToken.for_user(user_engineer))
+
+    def create_defect(assignee):
+        return Defect.objects.create(project=project, title="Трещина", created_by=user_manager,
+                                     status=Status.NEW, priority=Priority.HIGH, assignee=assignee)
+
+    async def scenario():
+        denied = _Client(_scope("http", "/api/stream/", "")).start()
+        await denied.task
+        assert denied.sent[0]["status"] == 401
+
+        manager = _Client(_scope("http", "/api/stream/", manager_token, f"&project={project.id}")).start()
+        engineer = _Client(_scope("websocket", "/ws/stream/", engineer_token))
+        engineer.inbox.put_nowait({"type": "websocket.connect"})
+        engineer.start()
+        await _until_subscribed(2)
+
+        unassigned = await sync_to_async(create_defect)(None)
+        await manager.wait_for(f'"defect":"{unassigned.id}"')
+        assert "event: defect.created" in manager.text()
+
+        mine = await sync_to_async(create_defect)(user_engineer)
+        await sync_to_async(Comment.objects.create)(defect=mine, author=user_manager, text="Проверьте")
+        await engineer.wait_for('"type":"comment.created"')
+        assert str(mine.id) in engineer.text() and str(unassigned.id) not in engineer.text()
+        assert engineer.sent[0]["type"] == "websocket.accept"
+
+        await manager.close()
+        await engineer.close()
+        assert len(events.broadcaster) == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_is_streamed(api_client, auth_headers, defect_new, user_manager):
+    token = str(AccessToken.for_user(user_manager))
+    client = auth_headers(api_client, user_manager)
+
+    async def scenario():
+        manager = _Client(_scope("http", "/api/stream/", token)).start()
+        await _until_subscribed(1)
+        await sync_to_async(client.patch)(
+            "/api/defects/bulk/", {"ids": [str(defect_new.id)], "changes": {"status": Status.RESOLVED}},
+            format="json",
+        )
+        await manager.wait_for('"status":"resolved"')
+        await manager.close()
+        body = manager.text().split("data: ")[-1].strip()
+        assert json.loads(body)["defect"] == str(defect_new.id)
+
+    asyncio.run(scenario())
@@ -0,0 +1,80 @@
+# backend/tests/test_defect_threads.py
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+
+from defects.models import Attachment, Comment
+
+
+@pytest.fixture
+def thread(defect_in_progress, user_manager):
+    """25 комментариев с разным временем: c0 — самый старый."""
+    comments = Comment.objects.bulk_create([
+        Comment(defect=defect_in_progress, author=user_manager, text=f"c{i}") for i in range(25)
+    ])
+    start = timezone.now() - timedelta(days=1)
+    for i, c in enumerate(comments):
+        c.created_at = start + timedelta(minutes=i)
+    Comment.objects.bulk_update(comments, ["created_at"])
+    return comments
+
+
+@pytest.mark.django_db
+def test_comment_thread_cursor_and_post(api_client, defect_in_progress, thread, user_engineer, user_engineer_2,
+                                        auth_headers):
+    client = auth_headers(api_client, user_engineer)  # дефект назначен на него
+    url = f"/api/defects/{defect_in_progress.id}/comments/"
+
+    first = client.get(url)
+    assert first.status_code == status.HTTP_200_OK
+    assert [c["text"] for c in first.data["results"]][:3] == ["c24", "c23", "c22"]
+    assert len(first.data["results"]) == 20 and first.data["previous"] is None
+    rest = client.get(first.data["next"])
+    assert [c["text"] for c in rest.data["results"]] == ["c4", "c3", "c2", "c1", "c0"]
+    assert rest.data["next"] is None
+
+    chrono = client.get(url, {"ordering": "created_at"})
+    assert chrono.data["results"][0]["text"] == "c0"
+
+    resp = client.post(url, {"text": "Принято в работу"}, format="json")
+    assert resp.status_code == status.HTTP_201_CREATED
+    assert resp.data["defect"] == str(defect_in_progress.id) and resp.data["author"] == str(user_engineer.id)
+    assert client.get(url).data["results"][0]["text"] == "Принято в работу"
+
+    # чужой дефект и мусор в URL — 404, как в DefectViewSet
+    other = auth_headers(api_client.__class__(), user_engineer_2)
+    assert other.get(url).status_code == status.HTTP_404_NOT_FOUND
+    assert other.post(url, {"text": "x"}, format="json").status_code == status.HTTP_404_NOT_FOUND
+    assert other.get("/api/defects/not-a-uuid/comments/").status_code == status.HTTP_404_NOT_FOUND
+    # и в общем списке комментариев инженер чужих не видит
+    assert other.get("/api/comments/").data["count"] == 0
+
+
+@pytest.mark.django_db
+def test_detail_embeds_latest_items(api_client, defect_in_progress, thread, user_manager, auth_headers,
+                                    django_assert_num_queries):
+    Attachment.objects.bulk_create([
+        Attachment(defect=defect_in_progress, file=f"attachments/{i}.pdf", filename=f"{i}.pdf") for i in range(3)
+    ])
+    client = auth_headers(api_client, user_manager)
+    url = f"/api/defects/{defect_in_progress.id}/"
+    params = {"embed": "comments,attachments"}
+
+    with django_assert_num_queries(4):  # пользователь, дефект, комментарии, вложения
+        resp = client.get(url, params)
+    assert [c["text"] for c in resp.data["comments"]] == ["c24", "c23", "c22", "c21", "c20"]
+    assert len(resp.data["attachments"]) == 3
+    assert "comments" not in client.get(url).data
+
+    feed = client.get(f"/api/defects/{defect_in_progress.id}/attachments/")
+    assert [a["id"] for a in feed.data["results"]] == [a["id"] for a in resp.data["attachments"]]
+
+    # новый комментарий не трогает updated_at дефекта, но ETag карточки со встраиванием меняется
+    etag = resp["ETag"]
+    client.post(f"/api/defects/{defect_in_progress.id}/comments/", {"text": "новый"}, format="json")
+    resp = client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK and resp.data["comments"][0]["text"] == "новый"
+
+    assert client.get(url, {"embed": "history"}).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,73 @@
+# backend/tests/test_defects_bulk.py
+import uuid
+
+import pytest
+from rest_framework import status
+
+from defects.models import Defect, Status
+
+
+@pytest.mark.django_db
+def test_bulk_status_by_ids(api_client, defect_new, defect_in_progress, user_manager, auth_headers):
+    """
+    Менеджер меняет статус у нескольких дефектов одним запросом,
+    на неизвестный id приходит not_found.
+    """
+    client = auth_headers(api_client, user_manager)
+    missing = uuid.uuid4()
+
+    resp = client.patch(
+        "/api/defects/bulk/",
+        {
+            "ids": [str(defect_new.id), str(defect_in_progress.id), str(missing)],
+            "changes": {"status": Status.RESOLVED},
+        },
+        format="json",
+    )
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+    assert resp.data["updated"] == 2
+    results = {row["id"]: row["result"] for row in resp.data["results"]}
+    assert results[str(defect_new.id)] == "updated"
+    assert results[str(missing)] == "not_found"
+
+    assert set(Defect.objects.values_list("status", flat=True)) == {Status.RESOLVED}
+    assert not Defect.objects.filter(closed_at__isnull=True).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_respects_engineer_scope(api_client, defect_in_progress, defect_other_engineer,
+                                      user_engineer, auth_headers):
+    """
+    Инженер не может массово изменить чужой дефект — он для него not_found.
+    """
+    client = auth_headers(api_client, user_engineer)
+    resp = client.patch(
+        "/api/defects/bulk/",
+        {
+            "filter": {"status": Status.IN_PROGRESS},
+            "changes": {"status": Status.VERIFY},
+        },
+        format="json",
+    )
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+    assert [row["id"] for row in resp.data["results"]] == [str(defect_in_progress.id)]
+
+    defect_other_engineer.refresh_from_db()
+    assert defect_other_engineer.status == Status.IN_PROGRESS
+
+
+@pytest.mark.django_db
+def test_bulk_validates_before_writing(api_client, defect_new, user_manager, auth_headers):
+    """
+    Ошибка в changes — ничего не меняем.
+    """
+    client = auth_headers(api_client, user_manager)
+    resp = client.patch(
+        "/api/defects/bulk/",
+        {"ids": [str(defect_new.id)], "changes": {"status": "done", "title": "x"}},
+        format="json",
+    )
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    defect_new.refresh_from_db()
+    assert defect_new.status == Status.NEW
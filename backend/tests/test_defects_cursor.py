@@ -0,0 +1,70 @@
+# backend/tests/test_defects_cursor.py
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+
+from defects.models import Defect, Priority, Status
+
+
+def _walk(client, url, params):
+    """Проходим все страницы по ссылкам next, возвращаем id в порядке выдачи."""
+    seen, resp = [], client.get(url, params)
+    while True:
+        assert resp.status_code == status.HTTP_200_OK, resp.data
+        seen += [row["id"] for row in resp.data["results"]]
+        if not resp.data["next"]:
+            return seen, resp
+        resp = client.get(resp.data["next"])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", ["-created_at", "created_at", "due_date", "-due_date", "priority"])
+def test_cursor_walks_all_rows_once(api_client, project, user_manager, auth_headers, ordering):
+    today = timezone.localdate()
+    Defect.objects.bulk_create([
+        Defect(
+            project=project, title=f"D{i}", created_by=user_manager, status=Status.NEW,
+            priority=[Priority.LOW, Priority.HIGH][i % 2],
+            # одинаковые сроки и NULL — проверяем тай-брейкер по id
+            due_date=None if i % 5 == 0 else today + timedelta(days=i % 3),
+        )
+        for i in range(47)
+    ])
+    client = auth_headers(api_client, user_manager)
+
+    seen, last = _walk(client, "/api/defects/", {"pagination": "cursor", "ordering": ordering})
+    assert len(seen) == 47
+    assert len(set(seen)) == 47
+    assert "count" not in last.data
+
+    # назад по previous — та же последовательность
+    back, resp = [], last
+    while True:
+        back = [row["id"] for row in resp.data["results"]] + back
+        if not resp.data["previous"]:
+            break
+        resp = client.get(resp.data["previous"])
+    assert back == seen
+
+
+@pytest.mark.django_db
+def test_cursor_resolved_with_count(api_client, project, user_manager, auth_headers):
+    Defect.objects.bulk_create([
+        Defect(project=project, title=f"R{i}", created_by=user_manager, status=Status.RESOLVED)
+        for i in range(25)
+    ])
+    client = auth_headers(api_client, user_manager)
+    resp = client.get("/api/defects/resolved/", {"pagination": "cursor", "with_count": 1})
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+    assert resp.data["count"] == 25
+    assert len(resp.data["results"]) == 20
+    assert resp.data["previous"] is None
+
+
+@pytest.mark.django_db
+def test_cursor_rejects_unsupported_ordering(api_client, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    resp = client.get("/api/defects/", {"pagination": "cursor", "ordering": "title"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
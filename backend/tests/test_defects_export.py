@@ -0,0 +1,40 @@
+# backend/tests/test_defects_export.py
+import csv
+import io
+import json
+
+import pytest
+from rest_framework import status
+
+from defects.models import Status
+
+
+def _body(resp):
+    return b"".join(resp.streaming_content).decode("utf-8")
+
+
+@pytest.mark.django_db
+def test_export_csv_respects_filters(api_client, defect_new, defect_in_progress, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    resp = client.get("/api/defects/export/", {"format": "csv", "status": Status.IN_PROGRESS})
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp["Content-Type"].startswith("text/csv")
+    assert "attachment" in resp["Content-Disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(_body(resp).lstrip("\ufeff")), delimiter=";"))
+    assert [r["id"] for r in rows] == [str(defect_in_progress.id)]
+    assert rows[0]["title"] == defect_in_progress.title
+    assert rows[0]["assignee"] == str(defect_in_progress.assignee_id)
+
+
+@pytest.mark.django_db
+def test_export_ndjson_matches_api_and_scope(api_client, defect_in_progress, defect_other_engineer,
+                                             user_engineer, auth_headers):
+    client = auth_headers(api_client, user_engineer)
+    resp = client.get("/api/defects/export/", {"format": "ndjson"})
+    assert resp.status_code == status.HTTP_200_OK
+    lines = [json.loads(line) for line in _body(resp).splitlines()]
+    # инженер выгружает только свои дефекты, поля — как в API
+    api_row = client.get(f"/api/defects/{defect_in_progress.id}/").data
+    assert lines == [{k: api_row[k] for k in lines[0]}]
+    assert set(lines[0]) == set(api_row)
@@ -0,0 +1,58 @@
+# backend/tests/test_defects_fast_list.py
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from defects.models import Defect, Status
+from defects.pagination import DefectPagination
+from defects.serializers import DefectSerializer
+
+
+def _expected(resp, order_ids):
+    """Тот же ответ, но results — через DefectSerializer (старый путь)."""
+    by_id = {str(d.id): d for d in Defect.objects.filter(id__in=order_ids)}
+    results = DefectSerializer([by_id[i] for i in order_ids], many=True).data
+    return JSONRenderer().render({**resp.data, "results": results})
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("tz", ["Europe/Moscow", "UTC"])
+def test_list_json_is_byte_identical_to_serializer(api_client, settings, tz, defect_new, defect_in_progress,
+                                                    defect_other_engineer, user_manager, auth_headers):
+    settings.TIME_ZONE = tz  # для UTC DRF пишет «Z», а не «+00:00»
+    Defect.objects.filter(pk=defect_new.pk).update(due_date=None)
+    client = auth_headers(api_client, user_manager)
+
+    for params in ({}, {"pagination": "cursor"}, {"search": "окна"}, {"ordering": "due_date"}):
+        resp = client.get("/api/defects/", params)
+        assert resp.status_code == 200
+        ids = [row["id"] for row in resp.data["results"]]
+        assert ids
+        assert resp.content == _expected(resp, ids)
+
+    if tz == "UTC":
+        assert resp.data["results"][0]["created_at"].endswith("Z")
+
+
+@pytest.mark.django_db
+def test_cursor_links_and_resolved_use_fast_rows(api_client, monkeypatch, defect_new, defect_in_progress,
+                                                 defect_other_engineer, user_manager, auth_headers):
+    monkeypatch.setattr(DefectPagination, "page_size", 2)
+    client = auth_headers(api_client, user_manager)
+    resp = client.get("/api/defects/", {"pagination": "cursor", "ordering": "due_date"})
+    seen = [row["id"] for row in resp.data["results"]]
+    resp = client.get(resp.data["next"])
+    seen += [row["id"] for row in resp.data["results"]]
+    assert resp.data["next"] is None
+    # due_date по возрастанию: 3, 7, 10 дней
+    assert seen == [str(d.id) for d in (defect_in_progress, defect_new, defect_other_engineer)]
+    prev = client.get(resp.data["previous"])
+    assert [row["id"] for row in prev.data["results"]] == seen[:2]
+
+    Defect.objects.filter(pk=defect_in_progress.pk).update(status=Status.RESOLVED)
+    resp = client.get("/api/defects/resolved/")
+    assert [row["id"] for row in resp.data["results"]] == [str(defect_in_progress.id)]
+    assert resp.content == _expected(resp, [str(defect_in_progress.id)])
+
+    # пустая страница — пустой список, а не вся выборка
+    resp = client.get("/api/defects/resolved/", {"project": str(defect_new.project_id), "status": Status.NEW})
+    assert resp.data["results"] == []
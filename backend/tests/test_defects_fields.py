@@ -0,0 +1,79 @@
+# backend/tests/test_defects_fields.py
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from defects.pagination import DefectPagination
+
+
+def _selects(ctx):
+    return [q["sql"] for q in ctx.captured_queries if "defects_defect" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_fields_are_pushed_into_sql(api_client, defect_new, defect_in_progress, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get("/api/defects/", {"fields": "title,status,due_date"})
+    assert resp.status_code == status.HTTP_200_OK
+    assert list(resp.data["results"][0]) == ["id", "title", "status", "due_date"]
+    assert not any('"description"' in sql for sql in _selects(ctx))
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(f"/api/defects/{defect_new.id}/", {"fields": "title"})
+    assert resp.data == {"id": str(defect_new.id), "title": defect_new.title}
+    assert not any('"description"' in sql for sql in _selects(ctx))
+
+    resp = client.get("/api/defects/", {"fields": "title,secret", "expand": "comments"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert set(resp.data) == {"fields", "expand"}
+
+
+@pytest.mark.django_db
+def test_expand_embeds_related_in_same_query(api_client, defect_new, defect_in_progress, project, user_engineer,
+                                             user_manager, auth_headers, django_assert_num_queries):
+    client = auth_headers(api_client, user_manager)
+    client.get("/api/defects/")  # прогрев: пользователь в кеше
+    # COUNT пагинации, строки, поколение (для ?expand=)
+    with django_assert_num_queries(3):
+        resp = client.get("/api/defects/", {"expand": "assignee,project", "fields": "title"})
+    rows = {row["id"]: row for row in resp.data["results"]}
+
+    row = rows[str(defect_in_progress.id)]
+    assert list(row) == ["id", "project", "title", "assignee"]
+    assert row["project"] == {"id": str(project.id), "name": project.name, "customer": project.customer}
+    assert row["assignee"] == {
+        "id": str(user_engineer.id), "email": user_engineer.email, "name": user_engineer.name,
+        "full_name": user_engineer.name, "role": user_engineer.role,
+    }
+    assert rows[str(defect_new.id)]["assignee"] is None
+
+    # карточка с теми же параметрами — тот же объект, что строка списка
+    detail = client.get(f"/api/defects/{defect_in_progress.id}/", {"expand": "assignee,project", "fields": "title"})
+    assert json.loads(detail.content) == row
+
+
+@pytest.mark.django_db
+def test_cursor_and_etag_with_fields(api_client, monkeypatch, defect_new, defect_in_progress, project,
+                                     user_manager, auth_headers, django_capture_on_commit_callbacks):
+    monkeypatch.setattr(DefectPagination, "page_size", 1)
+    client = auth_headers(api_client, user_manager)
+    params = {"pagination": "cursor", "ordering": "due_date", "fields": "title", "expand": "project"}
+    first = client.get("/api/defects/", params)
+    second = client.get(first.data["next"])
+    assert [r["id"] for r in first.data["results"] + second.data["results"]] == [
+        str(defect_in_progress.id), str(defect_new.id),
+    ]
+
+    etag = first["ETag"]
+    assert client.get("/api/defects/", params, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+    # переименование проекта меняет раскрытый объект — ETag должен смениться
+    with django_capture_on_commit_callbacks(execute=True):
+        project.name = "Новое имя"
+        project.save()
+    resp = client.get("/api/defects/", params, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["results"][0]["project"]["name"] == "Новое имя"
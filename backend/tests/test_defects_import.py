@@ -0,0 +1,111 @@
+# backend/tests/test_defects_import.py
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework import status
+
+from accounts.models import User
+from defects import rollups, search
+from defects.models import Defect, DefectRollup, Priority, Status
+from projects.models import Project
+
+
+def _csv(text, name="punch.csv"):
+    return SimpleUploadedFile(name, ("﻿" + text).encode("utf-8"), content_type="text/csv")
+
+
+@pytest.mark.django_db
+def test_import_csv_creates_defects_and_reports_row_errors(api_client, project, user_engineer,
+                                                           user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    body = (
+        "Название;Проект;Приоритет;Статус;Исполнитель;Срок\n"
+        f"Трещина в стяжке;{project.name};high;new;{user_engineer.email.upper()};01.10.2025\n"
+        f"Скол откоса;{project.id};Низкий;Закрыта;;\n"
+        ";Нет такого;urgent;new;nobody@example.com;31.31.2025\n"
+    )
+    resp = client.post("/api/defects/import/", {"file": _csv(body)}, format="multipart")
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["rows"] == 3 and resp.data["created"] == 2 and resp.data["error_count"] == 1
+    assert resp.data["errors"][0]["row"] == 4
+    assert set(resp.data["errors"][0]["errors"]) == {"title", "project", "priority", "assignee", "due_date"}
+
+    crack = Defect.objects.get(title="Трещина в стяжке")
+    assert crack.assignee == user_engineer and crack.priority == Priority.HIGH
+    assert crack.due_date.isoformat() == "2025-10-01" and crack.created_by == user_manager
+    chip = Defect.objects.get(title="Скол откоса")
+    assert chip.status == Status.RESOLVED and chip.closed_at is not None
+
+    # bulk_create без сигналов — rollup и поисковый индекс должны быть в порядке
+    assert rollups.drift(Defect, DefectRollup) == {}
+    assert sum(DefectRollup.objects.values_list("defect_count", flat=True)) == 2
+    if search.supported():
+        resp = client.get("/api/defects/", {"search": "стяжка"})
+        assert [d["id"] for d in resp.data["results"]] == [str(crack.id)]
+
+
+@pytest.mark.django_db
+def test_import_dry_run_and_permissions(api_client, project, user_engineer, user_manager, auth_headers):
+    body = f"title,project\nОтслоение обоев,{project.name}\n"
+
+    client = auth_headers(api_client, user_engineer)
+    resp = client.post("/api/defects/import/", {"file": _csv(body)}, format="multipart")
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+    client = auth_headers(api_client, user_manager)
+    resp = client.post("/api/defects/import/", {"file": _csv(body), "dry_run": "1"}, format="multipart")
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["created"] == 0 and resp.data["error_count"] == 0 and resp.data["dry_run"]
+    assert not Defect.objects.exists()
+
+    resp = client.post("/api/defects/import/", {"file": _csv("a;b\n1;2\n")}, format="multipart")
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_import_rejects_corrupt_xlsx(api_client, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    garbage = SimpleUploadedFile(
+        "punch.xlsx", b"PK\x03\x04 not really a workbook",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+    resp = client.post("/api/defects/import/", {"file": garbage}, format="multipart")
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.data["file"]
+    assert not Defect.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_command_round_trips_export(api_client, tmp_path, defect_new, defect_in_progress,
+                                           user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    resp = client.get("/api/defects/export/", {"format": "csv"})
+    path = tmp_path / "defects.csv"
+    path.write_bytes(b"".join(resp.streaming_content))
+
+    call_command("import_defects", str(path), user=user_manager.email, chunk_size=1)
+    copies = Defect.objects.filter(title=defect_in_progress.title).order_by("created_at")
+    assert copies.count() == 2
+    assert copies[1].assignee_id == defect_in_progress.assignee_id
+    assert copies[1].due_date == defect_in_progress.due_date
+    assert Defect.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_import_matches_mixed_case_email_and_rejects_ambiguous_project(api_client, project, user_engineer,
+                                                                       user_manager, auth_headers):
+    User.objects.filter(pk=user_engineer.pk).update(email="Eng.One@Example.com")
+    Project.objects.create(name="Склад")
+    twin = Project.objects.create(name="Склад")
+    client = auth_headers(api_client, user_manager)
+    body = (
+        "Название;Проект;Исполнитель\n"
+        f"Протечка кровли;{project.name};eng.one@example.COM\n"
+        "Трещина пола;Склад;\n"
+        f"Сломан замок;{twin.id};\n"
+    )
+    resp = client.post("/api/defects/import/", {"file": _csv(body)}, format="multipart")
+    assert resp.data["created"] == 2 and resp.data["error_count"] == 1
+    assert resp.data["errors"][0]["row"] == 3 and set(resp.data["errors"][0]["errors"]) == {"project"}
+    assert Defect.objects.get(title="Протечка кровли").assignee_id == user_engineer.pk
+    assert Defect.objects.get(title="Сломан замок").project_id == twin.pk
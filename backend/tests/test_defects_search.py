@@ -0,0 +1,79 @@
+# backend/tests/test_defects_search.py
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from rest_framework import status
+
+from defects import search
+from defects.models import Comment, Defect
+
+
+def _search(client, text, **params):
+    resp = client.get("/api/defects/", {"search": text, **params})
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+    return [row["title"] for row in resp.data["results"]]
+
+
+def test_stem_russian_forms():
+    assert search.stem("трещина") == search.stem("трещины") == search.stem("трещину")
+    assert search.stem("Окна") == search.stem("окно")
+
+
+@pytest.mark.django_db
+def test_fulltext_search_stemming_and_ranking(api_client, project, user_manager, auth_headers):
+    Defect.objects.create(project=project, title="Прочее", description="Трещина в углу у окна",
+                          created_by=user_manager)
+    Defect.objects.create(project=project, title="Трещины штукатурки", created_by=user_manager)
+    Defect.objects.create(project=project, title="Скол плитки", created_by=user_manager)
+    client = auth_headers(api_client, user_manager)
+
+    # другая форма слова находит обе; совпадение в заголовке — выше
+    assert _search(client, "трещину") == ["Трещины штукатурки", "Прочее"]
+    # префикс при наборе
+    assert _search(client, "штукат") == ["Трещины штукатурки"]
+    # все слова обязательны
+    assert _search(client, "трещина плитки") == []
+
+
+@pytest.mark.django_db
+def test_search_index_follows_writes(api_client, defect, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    assert _search(client, "герметик") == []
+
+    comment = Comment.objects.create(defect=defect, author=user_manager, text="Нужен новый герметик")
+    assert _search(client, "герметика") == [defect.title]
+
+    comment.delete()
+    assert _search(client, "герметик") == []
+
+    defect.title = "Протечка кровли"
+    defect.save()
+    assert _search(client, "кровля") == ["Протечка кровли"]
+
+    defect.delete()
+    assert _search(client, "кровля") == []
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index(api_client, defect, user_manager, auth_headers):
+    call_command("rebuild_search_index")
+    client = auth_headers(api_client, user_manager)
+    assert _search(client, "стеклопакет", ordering="-created_at") == [defect.title]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_builds_index_for_existing_defects(api_client, defect, user_manager, auth_headers):
+    if not search.supported():
+        pytest.skip("полнотекстовый индекс — только SQLite / PostgreSQL")
+    Comment.objects.create(defect=defect, author=user_manager, text="Нужен новый герметик")
+    migration = import_module("defects.migrations.0004_defect_search")
+    with connection.schema_editor() as editor:
+        migration.drop_index(apps, editor)
+        migration.create_index(apps, editor)
+
+    client = auth_headers(api_client, user_manager)
+    assert _search(client, "герметика") == _search(client, "стеклопакет") == [defect.title]
+    defect.delete()  # transaction=True: индекс вне таблиц Django, за собой не оставляем
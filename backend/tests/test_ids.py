@@ -0,0 +1,39 @@
+# backend/tests/test_ids.py
+import time
+import uuid
+from unittest import mock
+
+import pytest
+
+from core import ids
+from defects.models import Comment, Defect
+
+
+def test_uuid7_layout_and_order():
+    before = time.time_ns() // 1_000_000
+    values = [ids.uuid7() for _ in range(5000)]
+    after = time.time_ns() // 1_000_000
+
+    assert all(v.version == 7 and v.variant == uuid.RFC_4122 for v in values)
+    assert before <= ids.uuid7_millis(values[0]) <= ids.uuid7_millis(values[-1]) <= after + 1
+    # строго по возрастанию — и как UUID, и строкой (как их видит API и хранит SQLite)
+    assert values == sorted(set(values))
+    assert [str(v) for v in values] == sorted(str(v) for v in values)
+
+
+def test_uuid7_stays_monotonic_when_clock_stalls_or_goes_back():
+    first = ids.uuid7()
+    with mock.patch.object(ids.time, "time_ns", return_value=(ids.uuid7_millis(first) - 1000) * 1_000_000):
+        stalled = [ids.uuid7() for _ in range(ids.COUNTER_MAX + 10)]
+    # счётчик переполнился — ушли в следующую миллисекунду, порядок не нарушен
+    assert [first, *stalled] == sorted([first, *stalled])
+    assert ids.uuid7_millis(stalled[-1]) > ids.uuid7_millis(first)
+
+
+@pytest.mark.django_db
+def test_new_rows_get_uuid7(defect_new, user_manager, project):
+    comment = Comment.objects.create(defect=defect_new, author=user_manager, text="к")
+    later = Defect.objects.create(project=project, title="Позже", created_by=user_manager)
+    for obj in (defect_new, comment, later, project, user_manager):
+        assert obj.pk.version == 7
+    assert later.pk > defect_new.pk
@@ -0,0 +1,57 @@
+# backend/tests/test_projects_stats.py
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+
+from defects.models import Defect, Priority, Status
+from projects.models import Project
+
+
+@pytest.mark.django_db
+def test_projects_with_stats(api_client, project, another_project, defect_new, defect_in_progress,
+                             user_manager, auth_headers):
+    Defect.objects.create(
+        project=project, title="Просрочен", priority=Priority.CRITICAL, status=Status.NEW,
+        due_date=timezone.localdate() - timedelta(days=1), created_by=user_manager,
+    )
+    Defect.objects.create(
+        project=project, title="Закрыт", priority=Priority.LOW, status=Status.RESOLVED,
+        due_date=timezone.localdate() - timedelta(days=1), created_by=user_manager,
+    )
+
+    client = auth_headers(api_client, user_manager)
+    resp = client.get("/api/projects/", {"with_stats": 1})
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+
+    rows = {row["id"]: row["stats"] for row in resp.data["results"]}
+    stats = rows[str(project.id)]
+    assert stats["total"] == 4
+    assert stats["by_status"]["new"] == 2
+    assert stats["by_status"]["resolved"] == 1
+    assert stats["by_priority"]["critical"] == 1
+    assert stats["overdue"] == 1
+    assert stats["last_activity"] is not None
+
+    assert rows[str(another_project.id)]["total"] == 0
+    assert rows[str(another_project.id)]["last_activity"] is None
+
+
+@pytest.mark.django_db
+def test_projects_with_stats_is_one_query(api_client, user_manager, auth_headers, django_assert_max_num_queries):
+    """
+    Кол-во запросов не зависит от числа проектов (COUNT пагинации + страница + статистика страницы + auth).
+    """
+    Project.objects.bulk_create([Project(name=f"Объект {i}") for i in range(15)])
+    client = auth_headers(api_client, user_manager)
+    with django_assert_max_num_queries(4):
+        resp = client.get("/api/projects/", {"with_stats": 1})
+    assert resp.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_projects_without_stats_unchanged(api_client, project, user_manager, auth_headers):
+    client = auth_headers(api_client, user_manager)
+    resp = client.get("/api/projects/")
+    assert "stats" not in resp.data["results"][0]
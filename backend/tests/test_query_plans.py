@@ -0,0 +1,181 @@
+# backend/tests/test_query_plans.py
+"""
+Регрессия планов запросов: для горячих эндпоинтов прогоняем EXPLAIN по каждому
+запросу к таблицам дефектов / комментариев / вложений и падаем, если БД
+читает таблицу целиком, обходит индекс целиком без LIMIT или сортирует во временном
+B-tree вместо индекса (ORDER BY, DISTINCT). Группировка во временном B-tree допустима.
+
+SQLite — EXPLAIN QUERY PLAN; PostgreSQL — EXPLAIN с enable_seqscan/enable_sort = off
+(на маленьких тестовых таблицах иначе планировщик честно выбирает seq scan).
+"""
+import json
+import re
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from defects import search
+from defects.models import Attachment, Comment, Defect, Priority, Status
+
+HOT_TABLES = ("defects_defect", "defects_comment", "defects_attachment", "defects_change",
+              "defects_defecttransition")
+
+PAGE_COUNT_SQL = 'SELECT COUNT(*) AS "__count"'
+
+
+@contextmanager
+def recorded_selects():
+    queries = []
+
+    def wrapper(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith("SELECT") and any(t in sql for t in HOT_TABLES):
+            queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield queries
+
+
+def plan_problems(sql, params):
+    # обход по индексу допустим только с LIMIT; COUNT(*) постраничной пагинации
+    # по всей таблице — цена режима page (курсорный режим его не делает)
+    limited = re.search(r"\bLIMIT\b", sql) or sql.startswith(PAGE_COUNT_SQL)
+    # сортировка допустима только там, где без неё никак и она не по всей таблице:
+    # перцентили (ROW_NUMBER() OVER) по выбранному диапазону и совпадения полнотекстового
+    # поиска — строки для них приходят поиском (SEARCH / MATCH), а полный обход ловится отдельно
+    sorted_subset = re.search(r" OVER \(| MATCH | @@ ", sql)
+    with connection.cursor() as cur:
+        if connection.vendor == "sqlite":
+            cur.execute("EXPLAIN QUERY PLAN " + sql, params)
+            details = [row[-1] for row in cur.fetchall()]
+            return [
+                d for d in details
+                if re.match(rf"SCAN ({'|'.join(HOT_TABLES)})$", d)
+                or (re.match(rf"SCAN ({'|'.join(HOT_TABLES)}) USING ", d) and not limited)
+                or (re.match(r"USE TEMP B-TREE FOR .*ORDER BY", d) and not sorted_subset)
+                or re.match(r"USE TEMP B-TREE FOR .*DISTINCT", d)
+            ]
+        cur.execute("SET LOCAL enable_seqscan = off")
+        cur.execute("SET LOCAL enable_sort = off")
+        cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = json.dumps(cur.fetchone()[0])
+        return re.findall(rf'"Node Type": "Seq Scan", [^}}]*"Relation Name": "(?:{"|".join(HOT_TABLES)})"', plan) \
+            + ([] if sorted_subset else re.findall(r'"Node Type": "Sort"', plan))
+
+
+def assert_indexed(client, url, params=None):
+    with recorded_selects() as queries:
+        resp = client.get(url, params or {})
+    assert resp.status_code == 200, resp.data
+    assert queries, f"{url}: нет запросов к {HOT_TABLES}"
+    for sql, sql_params in queries:
+        problems = plan_problems(sql, sql_params)
+        assert not problems, f"{url} {params or ''}\n{sql}\n{problems}"
+    return resp
+
+
+@pytest.fixture
+def dataset(project, another_project, user_manager, user_engineer, defect_in_progress):
+    today = timezone.localdate()
+    defects = Defect.objects.bulk_create([
+        Defect(
+            project=[project, another_project][i % 2], title=f"Течь {i}" if i % 3 == 0 else f"D{i}", created_by=user_manager,
+            status=[Status.NEW, Status.IN_PROGRESS, Status.RESOLVED][i % 3],
+            priority=Priority.MEDIUM, assignee=user_engineer if i % 4 == 0 else None,
+            due_date=today + timedelta(days=i - 10),
+        )
+        for i in range(90)
+    ])
+    Comment.objects.bulk_create([Comment(defect=d, author=user_manager, text="к") for d in defects[:5]])
+    Attachment.objects.bulk_create([Attachment(defect=d, file="attachments/x.jpg") for d in defects[:5]])
+    # bulk_create мимо сигналов — поисковый индекс строим сами
+    search.rebuild()
+    return defects
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url, params", [
+    ("/api/defects/", {}),
+    ("/api/defects/", {"project": "<project>"}),
+    ("/api/defects/", {"status": Status.NEW}),
+    ("/api/defects/", {"ordering": "created_at"}),
+    ("/api/defects/", {"ordering": "urgency"}),
+    ("/api/defects/queue/", {}),
+    ("/api/defects/resolved/", {}),
+    ("/api/defects/", {"pagination": "cursor"}),
+    ("/api/defects/", {"pagination": "cursor", "project": "<project>"}),
+    ("/api/comments/", {}),
+    ("/api/attachments/", {}),
+    ("/api/defects/<defect>/comments/", {}),
+    ("/api/defects/<defect>/comments/", {"ordering": "created_at"}),
+    ("/api/defects/<defect>/attachments/", {}),
+    ("/api/defects/<defect>/history/", {}),
+    ("/api/reports/summary/", {"source": "live", "date_from": "<today>"}),
+    ("/api/reports/timeseries/", {"source": "live", "date_from": "<week_ago>", "date_to": "<today>"}),
+    ("/api/reports/cycle-time/", {"date_from": "<week_ago>", "date_to": "<today>"}),
+    ("/api/reports/time-in-status/", {"date_from": "<week_ago>", "date_to": "<today>"}),
+    ("/api/auth/users/workload/", {}),
+    ("/api/projects/", {"with_stats": "1"}),
+    ("/api/defects/", {"search": "течь"}),
+    ("/api/defects/", {"search": "течь", "ordering": "-created_at"}),
+    ("/api/sync/", {}),
+])
+def test_manager_endpoints_use_indexes(api_client, auth_headers, user_manager, project, dataset, url, params):
+    params = {
+        k: {
+            "<project>": str(project.id),
+            "<today>": timezone.localdate().isoformat(),
+            "<week_ago>": (timezone.localdate() - timedelta(days=7)).isoformat(),
+        }.get(v, v)
+        for k, v in params.items()
+    }
+    url = url.replace("<defect>", str(dataset[0].id))
+    client = auth_headers(api_client, user_manager)
+    assert_indexed(client, url, params)
+
+
+@pytest.mark.django_db
+def test_engineer_list_and_next_page_use_indexes(api_client, auth_headers, user_engineer, dataset):
+    client = auth_headers(api_client, user_engineer)
+    assert_indexed(client, "/api/defects/")
+    first = assert_indexed(client, "/api/defects/", {"pagination": "cursor"})
+    assert first.data["next"]
+    assert_indexed(client, first.data["next"])
+    assert_indexed(client, "/api/defects/queue/")
+    # комментарии к дефектам dataset'а — в журнале синхронизации есть что отдать инженеру
+    Comment.objects.create(defect=dataset[0], author=dataset[0].created_by, text="к")
+    assert_indexed(client, "/api/sync/")
+
+
+def plan_indexes(sql, params):
+    """Имена индексов, по которым идёт запрос."""
+    with connection.cursor() as cur:
+        if connection.vendor == "sqlite":
+            cur.execute("EXPLAIN QUERY PLAN " + sql, params)
+            details = [row[-1] for row in cur.fetchall()]
+            return {m[1] for d in details if (m := re.search(r"USING (?:COVERING )?INDEX (\w+)", d))}
+        cur.execute("SET LOCAL enable_seqscan = off")
+        cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        return set(re.findall(r'"Index Name": "(\w+)"', json.dumps(cur.fetchone()[0])))
+
+
+@pytest.mark.django_db
+def test_workload_and_closed_ranges_use_their_indexes(api_client, auth_headers, user_manager, dataset):
+    client = auth_headers(api_client, user_manager)
+    today = timezone.localdate()
+    endpoints = {
+        # «открыт» — литералами (open_literal): с параметрами частичный индекс SQLite не возьмёт
+        "defect_queue_idx": ("/api/auth/users/workload/", {}),
+        "defect_closed_at_idx": ("/api/reports/timeseries/", {
+            "source": "live", "date_from": (today - timedelta(days=7)).isoformat(), "date_to": today.isoformat(),
+        }),
+    }
+    for index, (url, params) in endpoints.items():
+        with recorded_selects() as queries:
+            resp = client.get(url, params)
+        assert resp.status_code == 200, resp.data
+        used = set().union(*(plan_indexes(sql, sql_params) for sql, sql_params in queries))
+        assert index in used, f"{url}: {used}"
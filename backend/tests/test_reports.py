@@ -3,7 +3,15 @@
 from typing import Any
 auth_headers: Any  # for pylance
 client: Any        # если тоже ругается
-from defects.models import Defect, Priority, Status
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from defects.models import DataGeneration, Defect, Priority, Status
 
 def test_reports_summary_count(api_client, project, user_manager, user_engineer,auth_headers):
     # создадим 3 дефекта: 2 NEW, 1 RESOLVED
@@ -22,3 +30,55 @@ def test_reports_summary_count(api_client, project, user_manager, user_engineer,
     by_status = {row["status"]: row["count"] for row in resp.data["by_status"]}
     assert by_status["new"] == 2
     assert by_status["resolved"] == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reports_summary_cached_and_invalidated(api_client, project, user_manager, auth_headers):
+    Defect.objects.create(project=project, title="A", priority=Priority.HIGH, status=Status.NEW,
+                          created_by=user_manager)
+    client = auth_headers(api_client, user_manager)
+    params = {"project": str(project.id)}
+
+    first = client.get("/api/reports/summary/", params)
+    assert first.data["total"] == 1
+    assert first.data["by_priority"] == [{"priority": "high", "count": 1}]
+
+    # второй раз — из кеша, без запросов к дефектам
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/api/reports/summary/", params)
+    assert not [q for q in ctx.captured_queries if "defects_defect" in q["sql"]]
+
+    # запись дефекта сбрасывает кеш
+    Defect.objects.create(project=project, title="B", priority=Priority.LOW, status=Status.RESOLVED,
+                          created_by=user_manager)
+    assert client.get("/api/reports/summary/", params).data["total"] == 2
+
+
+@pytest.mark.django_db
+def test_reports_summary_date_range(api_client, project, user_manager, auth_headers):
+    old = Defect.objects.create(project=project, title="old", created_by=user_manager)
+    Defect.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=10))
+    Defect.objects.create(project=project, title="new", created_by=user_manager)
+
+    today = timezone.localdate()
+    client = auth_headers(api_client, user_manager)
+    # created_at сдвинут через update() мимо rollup'а — считаем по самим дефектам
+    resp = client.get("/api/reports/summary/", {
+        "date_from": today.isoformat(), "date_to": today.isoformat(), "source": "live",
+    })
+    assert resp.data["total"] == 1
+    assert resp.data["by_project"][0]["project_name"] == project.name
+
+
+@pytest.mark.django_db
+def test_reports_cache_generation_is_shared_through_db(api_client, project, user_manager, auth_headers):
+    Defect.objects.create(project=project, title="A", created_by=user_manager)
+    client = auth_headers(api_client, user_manager)
+    params = {"project": str(project.id), "source": "live"}
+    assert client.get("/api/reports/summary/", params).data["total"] == 1
+
+    # запись и сброс — в другом воркере: его кеш не наш, общая у нас только БД
+    Defect.objects.create(project=project, title="B", created_by=user_manager)
+    assert client.get("/api/reports/summary/", params).data["total"] == 1
+    DataGeneration.objects.update(value=F("value") + 1)
+    assert client.get("/api/reports/summary/", params).data["total"] == 2
@@ -0,0 +1,95 @@
+# backend/tests/test_reports_rollup.py
+from importlib import import_module
+from unittest import mock
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from rest_framework import status
+
+from defects import rollups
+from defects.models import Defect, DefectRollup, Priority, Status
+
+
+def _no_drift():
+    return rollups.drift(Defect, DefectRollup) == {}
+
+
+@pytest.mark.django_db
+def test_rollup_follows_defect_writes(api_client, project, user_manager, user_engineer, auth_headers):
+    d = Defect.objects.create(project=project, title="A", priority=Priority.LOW, created_by=user_manager)
+    assert _no_drift()
+
+    d.status = Status.IN_PROGRESS
+    d.save()
+    d.assignee = user_engineer
+    d.save(update_fields=["assignee"])
+    assert _no_drift()
+
+    client = auth_headers(api_client, user_manager)
+    resp = client.patch("/api/defects/bulk/", {"ids": [str(d.id)], "changes": {"priority": "high"}}, format="json")
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+    assert _no_drift()
+
+    d.refresh_from_db()  # после bulk объект в памяти устарел
+    d.delete()
+    assert _no_drift()
+    assert sum(DefectRollup.objects.values_list("defect_count", flat=True)) == 0
+
+
+@pytest.mark.django_db
+def test_summary_reads_rollup(api_client, project, user_manager, auth_headers):
+    Defect.objects.create(project=project, title="A", status=Status.NEW, created_by=user_manager)
+    Defect.objects.create(project=project, title="B", status=Status.RESOLVED, created_by=user_manager)
+    client = auth_headers(api_client, user_manager)
+
+    rollup = client.get("/api/reports/summary/").data
+    live = client.get("/api/reports/summary/", {"source": "live"}).data
+    assert rollup == live
+    assert rollup["total"] == 2
+
+
+@pytest.mark.django_db
+def test_rebuild_command_fixes_drift(project, user_manager):
+    Defect.objects.create(project=project, title="A", created_by=user_manager)
+    DefectRollup.objects.update(defect_count=5)
+
+    with pytest.raises(CommandError):
+        call_command("rebuild_defect_rollups", "--check")
+    call_command("rebuild_defect_rollups")
+    call_command("rebuild_defect_rollups", "--check")
+
+    # первичное заполнение в миграции — те же бакеты
+    DefectRollup.objects.all().delete()
+    import_module("defects.migrations.0002_defect_rollup").fill_rollup(apps, None)
+    assert _no_drift()
+
+
+@pytest.mark.django_db
+def test_rollup_bucket_is_unique_and_insert_race_adds_to_it(project, user_manager, user_engineer):
+    d = Defect.objects.create(project=project, title="A", assignee=user_engineer, created_by=user_manager)
+    key = rollups.key_for(d)
+    with pytest.raises(IntegrityError), transaction.atomic():
+        DefectRollup.objects.create(defect_count=1, **dict(zip(rollups.KEY_FIELDS, key)))
+
+    # гонка: update не увидел чужой ещё не закоммиченный бакет, вставка упёрлась в ограничение
+    real_update, calls = QuerySet.update, []
+
+    def stale_update(self, **kwargs):
+        calls.append(kwargs)
+        return 0 if len(calls) == 1 else real_update(self, **kwargs)
+
+    with mock.patch.object(QuerySet, "update", stale_update):
+        rollups.apply_deltas({key: 2})
+    assert len(calls) == 2
+    assert list(DefectRollup.objects.values_list("defect_count", flat=True)) == [3]
+
+    # удаление исполнителя: его бакеты сливаются с бакетами без исполнителя, без дублей
+    Defect.objects.create(project=project, title="B", created_by=user_manager)
+    DefectRollup.objects.filter(assignee=user_engineer).update(defect_count=1)
+    user_engineer.delete()
+    assert _no_drift()
+    assert DefectRollup.objects.count() == 1
@@ -0,0 +1,56 @@
+# backend/tests/test_reports_timeseries.py
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+
+from defects.models import Defect, Status
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("source", ["rollup", "live"])
+def test_timeseries_daily_dense(api_client, project, user_manager, auth_headers, source):
+    today = timezone.localdate()
+    Defect.objects.create(project=project, title="Открыт", created_by=user_manager)
+    closed = Defect.objects.create(project=project, title="Закрыт", created_by=user_manager)
+    closed.status = Status.RESOLVED
+    closed.save()
+    assert closed.closed_at is not None
+
+    client = auth_headers(api_client, user_manager)
+    resp = client.get("/api/reports/timeseries/", {
+        "project": str(project.id),
+        "date_from": (today - timedelta(days=6)).isoformat(),
+        "date_to": today.isoformat(),
+        "bucket": "day",
+        "source": source,
+    })
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+    series = resp.data["series"]
+    assert len(series) == 7
+    assert series[0] == {
+        "period": (today - timedelta(days=6)).isoformat(),
+        "created": 0, "resolved": 0, "closed": 0, "backlog": 0,
+    }
+    assert series[-1]["created"] == 2
+    assert series[-1]["resolved"] == 1
+    assert series[-1]["backlog"] == 1
+
+
+@pytest.mark.django_db
+def test_timeseries_weeks_and_reopen(api_client, project, user_manager, auth_headers):
+    d = Defect.objects.create(project=project, title="A", status=Status.CANCELED, created_by=user_manager)
+    assert d.closed_at is not None
+    d.status = Status.NEW
+    d.save(update_fields=["status"])
+    d.refresh_from_db()
+    assert d.closed_at is None
+
+    client = auth_headers(api_client, user_manager)
+    resp = client.get("/api/reports/timeseries/", {"bucket": "week"})
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+    assert len(resp.data["series"]) == 12
+    assert resp.data["series"][-1]["backlog"] == 1
+
+    assert client.get("/api/reports/timeseries/", {"bucket": "year"}).status_code == 400
@@ -0,0 +1,140 @@
+# backend/tests/test_sync.py
+from datetime import timedelta
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.utils import timezone
+from rest_framework import status
+
+from defects import sync
+from defects.models import Attachment, Change, Comment, Defect, Status
+
+
+def _sync(client, token=None, **params):
+    resp = client.get("/api/sync/", {"since": token, **params} if token else params)
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+    return resp.data
+
+
+def _ids(items):
+    return {item["id"] for item in items}
+
+
+@pytest.mark.django_db
+def test_manager_gets_only_changes_since_token(api_client, auth_headers, user_manager, project,
+                                               defect_new, defect_in_progress):
+    client = auth_headers(api_client, user_manager)
+    full = _sync(client)
+    assert _ids(full["defects"]) == {str(defect_new.id), str(defect_in_progress.id)}
+    assert _ids(full["projects"]) == {str(project.id)} and not full["has_more"]
+    assert full["defects"][0].keys() == client.get(f"/api/defects/{defect_new.id}/").data.keys()
+
+    # ничего не менялось — пусто, токен тот же по номеру
+    idle = _sync(client, full["next"])
+    assert not idle["defects"] and not any(idle["deleted"].values())
+    assert idle["next"].split(".")[0] == full["next"].split(".")[0]
+
+    comment = Comment.objects.create(defect=defect_in_progress, author=user_manager, text="Фото до/после")
+    client.patch("/api/defects/bulk/", {"ids": [str(defect_new.id)], "changes": {"status": Status.RESOLVED}},
+                 format="json")
+    delta = _sync(client, idle["next"])
+    assert [d["status"] for d in delta["defects"]] == [Status.RESOLVED]
+    assert _ids(delta["comments"]) == {str(comment.id)}
+
+    # удаление дефекта — tombstone и для него, и для его комментария (каскад)
+    defect_id = str(defect_in_progress.id)
+    defect_in_progress.delete()
+    gone = _sync(client, delta["next"])
+    assert gone["deleted"]["defects"] == [defect_id]
+    assert gone["deleted"]["comments"] == [str(comment.id)]
+    assert not gone["defects"] and not gone["comments"]
+
+
+@pytest.mark.django_db
+def test_engineer_scope_follows_reassignment(api_client, auth_headers, user_manager, user_engineer,
+                                             user_engineer_2, defect_in_progress, defect_other_engineer):
+    engineer = auth_headers(api_client, user_engineer)
+    full = _sync(engineer)
+    assert _ids(full["defects"]) == {str(defect_in_progress.id)}
+
+    manager = auth_headers(type(api_client)(), user_manager)
+    Comment.objects.create(defect=defect_other_engineer, author=user_manager, text="Уже было")
+    manager.patch(f"/api/defects/{defect_in_progress.id}/assign/", {"assignee": str(user_engineer_2.id)},
+                  format="json")
+    manager.patch(f"/api/defects/{defect_other_engineer.id}/assign/", {"assignee": str(user_engineer.id)},
+                  format="json")
+
+    delta = _sync(engineer, full["next"])
+    # забрали — tombstone; назначили — дефект вместе с лентой, написанной до назначения
+    assert delta["deleted"]["defects"] == [str(defect_in_progress.id)]
+    assert _ids(delta["defects"]) == {str(defect_other_engineer.id)}
+    assert [c["text"] for c in delta["comments"]] == ["Уже было"]
+
+
+@pytest.mark.django_db
+def test_pages_reset_and_bad_token(api_client, auth_headers, user_manager, project, user_engineer):
+    client = auth_headers(api_client, user_manager)
+    Defect.objects.bulk_create([Defect(project=project, title=f"D{i}", created_by=user_manager) for i in range(5)])
+    start = _sync(client)["next"]
+    for d in Defect.objects.all()[:5]:
+        d.save()
+
+    seen, token, pages = set(), start, 0
+    while True:
+        page = _sync(client, token, limit=2)
+        seen |= _ids(page["defects"])
+        token, pages = page["next"], pages + 1
+        if not page["has_more"]:
+            break
+    assert len(seen) == 5 and pages == 3
+
+    stale = sync.make_token(0, int((timezone.now() - timedelta(days=60)).timestamp()))
+    assert _sync(client, stale) == {"reset": True}
+    assert client.get("/api/sync/", {"since": "garbage"}).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_prune_keeps_latest_row_and_backfill(defect_new, user_manager):
+    comment = Comment.objects.create(defect=defect_new, author=user_manager, text="к")
+    comment_id = comment.id
+    defect_new.save()
+    comment.delete()
+    Change.objects.update(changed_at=timezone.now() - timedelta(days=60))
+    sync.prune()
+    # у дефекта — только последняя строка, старый tombstone комментария удалён
+    assert list(Change.objects.filter(kind="defect").values_list("object_id", flat=True)) == [defect_new.id]
+    assert not Change.objects.filter(object_id=comment_id).exists()
+
+    Attachment.objects.create(defect=defect_new, file="attachments/a.pdf", size_bytes=1)
+    Change.objects.all().delete()
+    import_module("defects.migrations.0011_change_log").fill_change_log(apps, None)
+    assert sorted(Change.objects.values_list("kind", flat=True)) == ["attachment", "defect", "project"]
+
+
+@pytest.mark.django_db
+def test_token_holds_back_behind_rows_that_may_commit_late(api_client, auth_headers, user_manager, project,
+                                                           settings):
+    settings.SYNC_SETTLE_SECONDS = 60
+    client = auth_headers(api_client, user_manager)
+    Change.objects.update(changed_at=timezone.now() - timedelta(minutes=5))
+    settled = _sync(client)["next"]
+
+    first = Defect.objects.create(project=project, title="Первый", created_by=user_manager)
+    second = Defect.objects.create(project=project, title="Второй", created_by=user_manager)
+    # строка первого ещё не закоммичена (PostgreSQL: номер взят, коммит позже) — её не видно
+    late = Change.objects.get(object_id=first.id)
+    late.delete()
+    delta = _sync(client, settled)
+    assert _ids(delta["defects"]) == {str(second.id)}
+    # токен не ушёл за свежие строки
+    assert delta["next"].split(".")[0] == settled.split(".")[0]
+
+    late.save(force_insert=True)  # коммит с меньшим номером
+    again = _sync(client, delta["next"])
+    assert _ids(again["defects"]) == {str(first.id), str(second.id)}
+
+    # строки отстоялись — токен идёт дальше, повторов нет
+    Change.objects.update(changed_at=timezone.now() - timedelta(minutes=5))
+    done = _sync(client, again["next"])
+    assert not _sync(client, done["next"])["defects"]
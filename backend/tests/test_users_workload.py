@@ -0,0 +1,35 @@
+# backend/tests/test_users_workload.py
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+
+from defects.models import Defect, Priority, Status
+
+
+@pytest.mark.django_db
+def test_workload_counts(api_client, project, another_project, defect_in_progress, defect_other_engineer,
+                         user_engineer, user_engineer_2, user_manager, auth_headers):
+    Defect.objects.create(
+        project=project, title="Просрочен", priority=Priority.HIGH, status=Status.VERIFY,
+        due_date=timezone.localdate() - timedelta(days=2), created_by=user_manager, assignee=user_engineer,
+    )
+    Defect.objects.create(
+        project=another_project, title="Закрыт", priority=Priority.LOW, status=Status.RESOLVED,
+        created_by=user_manager, assignee=user_engineer,
+    )
+
+    client = auth_headers(api_client, user_manager)
+    resp = client.get("/api/auth/users/workload/")
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+
+    rows = {row["id"]: row for row in resp.data["results"]}
+    eng1 = rows[str(user_engineer.id)]
+    assert (eng1["open"], eng1["in_progress"], eng1["verify"], eng1["overdue"]) == (2, 1, 1, 1)
+    assert rows[str(user_engineer_2.id)]["open"] == 1
+    assert str(user_manager.id) not in rows
+
+    resp = client.get("/api/auth/users/workload/", {"project": str(another_project.id)})
+    rows = {row["id"]: row for row in resp.data["results"]}
+    assert rows[str(user_engineer.id)]["open"] == 0
@@ -18,8 +18,9 @@ export default function AssignEngineerModal({ defect, show, onClose, onAssigned
       setLoading(true);
       setError("");
       try {
-        const { data } = await api.get("/auth/users/", {
-          params: { role: "engineer", search: q || undefined },
+        // инженеры сразу с нагрузкой (кол-во открытых дефектов)
+        const { data } = await api.get("/auth/users/workload/", {
+          params: { search: q || undefined },
         });
         if (!cancelled) {
           const list = data.results || data;
@@ -98,6 +99,8 @@ export default function AssignEngineerModal({ defect, show, onClose, onAssigned
                 {engineers.map((u) => (
                   <option key={u.id} value={u.id}>
                     {u.full_name || u.name || u.email}
+                    {u.open != null && ` — открыто: ${u.open}`}
+                    {u.overdue ? `, просрочено: ${u.overdue}` : ""}
                   </option>
                 ))}
               </select>
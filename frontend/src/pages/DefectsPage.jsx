@@ -68,6 +68,61 @@ const tryDecodeRole = () => {
 };
 
 /* ====== основной компонент ====== */
+/* ---------- загрузка вложений по частям (/attachment-uploads/) ---------- */
+const CRC32_TABLE = (() => {
+  const table = new Uint32Array(256);
+  for (let n = 0; n < 256; n++) {
+    let c = n;
+    for (let k = 0; k < 8; k++) c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+    table[n] = c >>> 0;
+  }
+  return table;
+})();
+
+// CRC-32 как zlib.crc32 на сервере: crc32(b, crc32(a)) === crc32(a + b)
+const crc32 = (bytes, crc = 0) => {
+  let c = ~crc;
+  for (let i = 0; i < bytes.length; i++) c = CRC32_TABLE[(c ^ bytes[i]) & 0xff] ^ (c >>> 8);
+  return ~c >>> 0;
+};
+
+// Часть, на которой оборвалась связь, отправляется заново; после повторных неудач
+// загрузку можно продолжить — сервер помнит, сколько уже принято.
+// CRC32 считаем сами по отправленным байтам, часть за частью: при finalize сервер сверяет
+// его со своим и не соберёт вложение, если какая-то часть дошла искажённой.
+async function uploadAttachment(file, defectId, retries = 3) {
+  const { data: session } = await api.post("/attachment-uploads/", {
+    defect: defectId,
+    filename: file.name,
+    size_bytes: file.size,
+  });
+  let state = session;
+  let crc = 0;
+  while (state.next_chunk < state.chunk_count) {
+    const index = state.next_chunk;
+    const blob = file.slice(index * state.chunk_size, (index + 1) * state.chunk_size);
+    const bytes = new Uint8Array(await blob.arrayBuffer());
+    for (let attempt = 1; ; attempt++) {
+      try {
+        ({ data: state } = await api.put(
+          `/attachment-uploads/${session.id}/chunks/${index}/`,
+          bytes,
+          { headers: { "Content-Type": "application/octet-stream" } }
+        ));
+        break;
+      } catch (e) {
+        if (attempt >= retries) throw e;
+        ({ data: state } = await api.get(`/attachment-uploads/${session.id}/`));
+        if (state.next_chunk > index) break;
+      }
+    }
+    crc = crc32(bytes, crc);
+  }
+  await api.post(`/attachment-uploads/${session.id}/finalize/`, {
+    crc32: crc.toString(16).padStart(8, "0"),
+  });
+}
+
 export default function DefectsPage() {
   const query = useQuery();
   const navigate = useNavigate();
@@ -124,6 +179,7 @@ export default function DefectsPage() {
     if (filters.ordering) qs.set("ordering", filters.ordering);
     if (filters.q) qs.set("search", filters.q);
     if (filters.page) qs.set("page", String(filters.page));
+    qs.set("expand", "project"); // имя объекта — в той же выборке, без запроса к /projects/
 
     const { data } = await api.get(`/defects/?${qs.toString()}`);
     const results = data.results || data;
@@ -183,7 +239,7 @@ export default function DefectsPage() {
 
   const openEdit = (d) => {
     setForm({
-      project: d.project_id || d.project,
+      project: d.project?.id || d.project,
       title: d.title,
       description: d.description || "",
       priority: d.priority,
@@ -218,13 +274,8 @@ export default function DefectsPage() {
     }
 
     // файлы
-    if (form.files?.length) {
-      const fd = new FormData();
-      [...form.files].forEach((f) => fd.append("file", f));
-      fd.append("defect", id);
-      await api.post("/attachments/", fd, {
-        headers: { "Content-Type": "multipart/form-data" },
-      });
+    for (const file of form.files || []) {
+      await uploadAttachment(file, id);
     }
 
     closeModal();
@@ -249,26 +300,21 @@ export default function DefectsPage() {
 
   async function bulkStatus(status) {
     if (!checked.size) return;
-    await Promise.all([...checked].map((id) => api.patch(`/defects/${id}/`, { status })));
+    await api.patch("/defects/bulk/", { ids: [...checked], changes: { status } });
     await load();
   }
 
-  /* ---------- экспорт CSV ---------- */
-  function exportCSV() {
-    const rows = [
-      ["Проект", "Название", "Приоритет", "Статус", "Срок", "Создан"],
-      ...items.map((d) => [
-        d.project_name || d.project || "",
-        d.title || "",
-        PRIORITY_LABEL[d.priority] || d.priority || "",
-        STATUS_LABEL[d.status] || d.status || "",
-        d.due_date || "",
-        new Date(d.created_at).toLocaleString(),
-      ]),
-    ];
-    const csv = rows.map((r) => r.map((c) => `"${String(c).replaceAll('"', '""')}"`).join(";")).join("\r\n");
-    const blob = new Blob([`\ufeff${csv}`], { type: "text/csv;charset=utf-8;" });
-    const url = URL.createObjectURL(blob);
+  /* ---------- экспорт CSV (все строки по текущим фильтрам, потоком с сервера) ---------- */
+  async function exportCSV() {
+    const params = { format: "csv" };
+    if (filters.project) params.project = filters.project;
+    if (filters.status) params.status = filters.status;
+    if (filters.priority) params.priority = filters.priority;
+    if (filters.ordering) params.ordering = filters.ordering;
+    if (filters.q) params.search = filters.q;
+
+    const { data } = await api.get("/defects/export/", { params, responseType: "blob" });
+    const url = URL.createObjectURL(data);
     const a = document.createElement("a");
     a.href = url;
     a.download = "defects.csv";
@@ -277,9 +323,14 @@ export default function DefectsPage() {
   }
 
   /* ---------- детали в правой панели ---------- */
-  function openDrawer(d) {
+  async function openDrawer(d) {
     setDrawer(d);
     setNewComment("");
+    // последние комментарии и вложения — одним запросом к карточке
+    const { data } = await api.get(`/defects/${d.id}/`, {
+      params: { expand: "project", embed: "comments,attachments" },
+    });
+    setDrawer((cur) => (cur && cur.id === d.id ? data : cur));
   }
   function closeDrawer() {
     setDrawer(null);
@@ -287,10 +338,9 @@ export default function DefectsPage() {
   }
   async function addComment() {
     if (!drawer || !newComment.trim()) return;
-    await api.post("/comments/", { defect: drawer.id, text: newComment.trim() });
-    // перезагрузим деталь
-    const { data } = await api.get(`/defects/${drawer.id}/`);
-    setDrawer(data);
+    const { data } = await api.post(`/defects/${drawer.id}/comments/`, { text: newComment.trim() });
+    // новый комментарий — сверху, карточку заново не запрашиваем
+    setDrawer((cur) => ({ ...cur, comments: [data, ...(cur.comments || [])] }));
     setNewComment("");
   }
 
@@ -470,7 +520,7 @@ export default function DefectsPage() {
                         onClick={(e) => e.stopPropagation()}
                       />
                     </td>
-                    <td className="text-truncate">{d.project_name || d.project || "—"}</td>
+                    <td className="text-truncate">{d.project?.name || d.project || "—"}</td>
                     <td>
                       <div className="fw-semibold">{d.title}</div>
                       {d.description && (
@@ -697,7 +747,7 @@ export default function DefectsPage() {
           </div>
 
           <div className="p-3" style={{ overflowY: "auto", height: "calc(100% - 56px)" }}>
-            <div className="mb-2 text-muted small">{drawer.project_name || drawer.project}</div>
+            <div className="mb-2 text-muted small">{drawer.project?.name || drawer.project}</div>
             <div className="fw-semibold">{drawer.title}</div>
             {drawer.description && <div className="mt-2">{drawer.description}</div>}
 
@@ -732,7 +782,7 @@ export default function DefectsPage() {
                       >
                         {isImg ? (
                           <img
-                            src={a.file}
+                            src={a.thumbnail || a.file}
                             alt={a.filename}
                             width={90}
                             height={90}
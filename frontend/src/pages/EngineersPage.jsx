@@ -26,8 +26,8 @@ export default function EngineersPage() {
   async function loadEngineers() {
     setLoading(true);
     try {
-      const { data } = await api.get("/auth/users/", {
-        params: { role: "engineer", search: q || undefined },
+      const { data } = await api.get("/auth/users/workload/", {
+        params: { search: q || undefined },
       });
       setEngineers(data.results || data);
     } catch (e) {
@@ -168,6 +168,10 @@ export default function EngineersPage() {
                     <th style={{ width: 220 }}>ID</th>
                     <th>Email</th>
                     <th>ФИО</th>
+                    <th>Открыто</th>
+                    <th>В работе</th>
+                    <th>На проверке</th>
+                    <th>Просрочено</th>
                   </tr>
                 </thead>
                 <tbody>
@@ -176,11 +180,15 @@ export default function EngineersPage() {
                       <td className="text-muted">{u.id}</td>
                       <td>{u.email}</td>
                       <td>{u.full_name || u.name || "—"}</td>
+                      <td>{u.open}</td>
+                      <td>{u.in_progress}</td>
+                      <td>{u.verify}</td>
+                      <td className={u.overdue ? "text-danger" : ""}>{u.overdue}</td>
                     </tr>
                   ))}
                   {engineers.length === 0 && (
                     <tr>
-                      <td colSpan={3} className="text-center text-muted py-3">
+                      <td colSpan={7} className="text-center text-muted py-3">
                         Ничего не найдено
                       </td>
                     </tr>
@@ -53,9 +53,16 @@ export default function ProjectsPage() {
   /* ---------- загрузка проектов ---------- */
   async function load() {
     setLoading(true);
-    const { data } = await api.get("/projects/");
+    const { data } = await api.get("/projects/", { params: { with_stats: 1 } });
     const list = data.results || data;
     setRaw(list);
+    // статистика приходит вместе со списком (?with_stats=1)
+    setStats(Object.fromEntries(
+      list.filter((p) => p.stats).map((p) => [
+        p.id,
+        { total: p.stats.total, resolved: p.stats.by_status.resolved },
+      ])
+    ));
     setLoading(false);
   }
 